@@ -0,0 +1,493 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Add src directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.models import HealthTask, Patient, PatientDatabase
+from src.edge_model import nearest_class, threshold_agreement
+from src.priority_calculator import PriorityCalculator
+from src.model_retrainer import ModelRetrainer
+from src.sensor_stream import SENSOR_COLUMNS, iter_csv_batches
+from src.sensor_wire import convert_csv, iter_binary_batches
+from src.workload_generator import WorkloadGenerator
+from config.settings import MODEL_SETTINGS, RETRAINING_SETTINGS
+
+BENCHMARKS = ('general_scoring', 'specific_scoring', 'repeated_scoring', 'batch_scoring', 'training', 'retraining',
+              'patient_lookup', 'ingest', 'simulation', 'startup')
+
+# Cold-start probes: (import statement, initialization) run in a fresh interpreter
+STARTUP_PROBES = {
+    'general_scoring': (
+        "from src.priority_calculator import PriorityCalculator",
+        "PriorityCalculator().calculate_general_priority_batch([72], [110], [95.0])"
+    ),
+    'simulation': (
+        "from src.simulation_manager import HealthcareEdgeSystem",
+        "HealthcareEdgeSystem()"
+    )
+}
+HEAVY_MODULES = ('pandas', 'sklearn', 'scipy', 'joblib', 'edge_sim_py', 'pyarrow')
+
+STARTUP_SCRIPT = '''
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    {init}
+initialized = time.perf_counter()
+print(json.dumps({{'import_s': imported - start, 'init_s': initialized - imported,
+                  'heavy_modules': sorted(name for name in {heavy!r} if name in sys.modules)}}))
+'''
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB"""
+    if resource is None:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def summarize(name: str, size: int, count: int, elapsed: float, latencies=None) -> dict:
+    """Throughput, latency percentiles and peak RSS for one benchmark run"""
+    result = {
+        'benchmark': name,
+        'size': size,
+        'readings': count,
+        'elapsed_s': elapsed,
+        'readings_per_s': count / elapsed if elapsed > 0 else 0.0,
+        'peak_rss_mb': peak_rss_mb()
+    }
+    if latencies is not None and len(latencies):
+        latencies = np.asarray(latencies) * 1000
+        result.update({
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+            'latency_p99_ms': float(np.percentile(latencies, 99))
+        })
+    return result
+
+
+def time_each(fn, items) -> tuple[float, list]:
+    """Call fn on every item, returning total time and per-call latencies"""
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        call_start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - call_start)
+    return time.perf_counter() - start, latencies
+
+
+def make_tasks(generator: WorkloadGenerator, size: int, task_type: str) -> list:
+    """Scored-task inputs drawn from the workload generator"""
+    patients = generator.generate_patients(1)
+    patients['type'] = task_type
+    patient_objects = {row[0]: Patient(*row) for row in patients.itertuples(index=False, name=None)}
+    readings = next(generator.iter_reading_batches(1, size, size))
+    return [
+        (HealthTask(patient_id, heart_rate, blood_pressure, float(glucose_level), task_type, timestamp=timestamp),
+         patient_objects[patient_id])
+        for patient_id, heart_rate, blood_pressure, glucose_level, timestamp in readings.itertuples(index=False, name=None)
+    ]
+
+
+def check_general_fast_path(calculator: PriorityCalculator, samples: int = 20000, seed: int = 0) -> int:
+    """Compare the lookup-table general priority against the formula; return the number of mismatches.
+    
+    Every parameter is swept over all integers from -50 to 500 and a set
+    of fractional values, then random (HR, BP, glucose) triples that include
+    capped readings and ties are checked for k and m.
+    """
+    rng = np.random.default_rng(seed)
+    sweep = np.concatenate([np.arange(-50, 501), rng.uniform(-50, 500, 1000), [np.nan, np.inf, -np.inf]])
+    mismatches = 0
+    for parameter, bounds in calculator.normal_ranges.items():
+        expected = np.array([calculator._calculate_parameter_urgency(value, *bounds) for value in sweep])
+        scalar = np.array([calculator._lookup_urgency(parameter, value) for value in sweep])
+        batch = calculator._lookup_urgency_array(parameter, sweep)
+        for actual in (scalar, batch):
+            mismatches += int(np.sum(~((actual == expected) | (np.isnan(actual) & np.isnan(expected)))))
+
+    heart_rate = rng.integers(20, 220, samples)
+    blood_pressure = rng.integers(50, 220, samples)
+    glucose_level = np.where(rng.random(samples) < 0.5, rng.integers(40, 400, samples), rng.uniform(40, 400, samples))
+    tasks = [HealthTask('P', int(hr), int(bp), float(gl), 'general')
+             for hr, bp, gl in zip(heart_rate, blood_pressure, glucose_level)]
+    expected = np.array([calculator.reference_general_priority(task) for task in tasks])
+    scalar = np.array([calculator.calculate_general_priority(task) for task in tasks])
+    k_values, m_values = calculator.calculate_general_priority_batch(heart_rate, blood_pressure, glucose_level)
+    mismatches += int(np.sum(np.any(scalar != expected, axis=1)))
+    mismatches += int(np.sum((k_values != expected[:, 0]) | (m_values != expected[:, 1])))
+    return mismatches
+
+
+def check_edge_model(calculator: PriorityCalculator, generator: WorkloadGenerator, samples: int = 5000) -> dict:
+    """Agreement of the distilled edge model with the forests on a generated specific-patient workload"""
+    pairs = make_tasks(generator, samples, 'specific')
+    features = np.array([
+        [task.heart_rate, task.blood_pressure, task.glucose_level, patient.age, patient.height, patient.weight,
+         1 if patient.gender == 'M' else 0]
+        for task, patient in pairs
+    ], dtype=float)
+    forest_k = np.clip(calculator.ml_model_k.predict(features), 0.0, 2.0)
+    forest_m = nearest_class(calculator.ml_model_m.predict(features), calculator.edge_model.m_classes)
+    k_values, m_values = calculator.edge_model.predict(features)
+    scalar = np.array([calculator.edge_model.predict_one(row) for row in features.tolist()])
+    return {
+        'k_mae': float(np.mean(np.abs(k_values - forest_k))),
+        'k_max_error': float(np.max(np.abs(k_values - forest_k))),
+        'm_agreement': float(np.mean(m_values == forest_m)),
+        'threshold_agreement': threshold_agreement(k_values, forest_k, MODEL_SETTINGS['edge_k_thresholds']),
+        'scalar_batch_mismatches': int(np.sum(~np.isclose(scalar[:, 0], k_values) | (scalar[:, 1] != m_values)))
+    }
+
+
+def bench_scalar_scoring(calculator: PriorityCalculator, generator: WorkloadGenerator, size: int,
+                         task_type: str, max_readings: int) -> dict:
+    """Per-reading calculate_task_priority latency for one patient type"""
+    pairs = make_tasks(generator, min(size, max_readings), task_type)
+    if calculator.priority_cache is not None:
+        calculator.priority_cache.clear()  # Earlier sizes score the same leading readings
+    elapsed, latencies = time_each(lambda pair: calculator.calculate_task_priority(*pair), pairs)
+    return summarize(f"{task_type}_scoring", size, len(pairs), elapsed, latencies)
+
+
+def bench_repeated_scoring(calculator: PriorityCalculator, generator: WorkloadGenerator, size: int,
+                           max_readings: int, repeats: int = 10) -> dict:
+    """Per-reading specific-patient scoring when each reading repeats `repeats` times, as on a steady monitor"""
+    count = min(size, max_readings)
+    pairs = make_tasks(generator, max(count // repeats, 1), 'specific')
+    pairs = [pair for pair in pairs for _ in range(repeats)][:count]
+    if calculator.priority_cache is not None:
+        calculator.priority_cache.clear()
+        hits, misses = calculator.priority_cache.hits, calculator.priority_cache.misses
+    elapsed, latencies = time_each(lambda pair: calculator.calculate_task_priority(*pair), pairs)
+    result = summarize('repeated_scoring', size, len(pairs), elapsed, latencies)
+    if calculator.priority_cache is not None:
+        lookups = calculator.priority_cache.hits - hits + calculator.priority_cache.misses - misses
+        result['cache_hit_rate'] = (calculator.priority_cache.hits - hits) / lookups if lookups else 0.0
+    return result
+
+
+def bench_batch_scoring(calculator: PriorityCalculator, generator: WorkloadGenerator, size: int) -> dict:
+    """calculate_task_priorities over a mixed block of readings"""
+    pairs = make_tasks(generator, size // 2, 'general') + make_tasks(generator, size - size // 2, 'specific')
+    tasks = [task for task, _ in pairs]
+    patients = [patient for _, patient in pairs]
+    if calculator.priority_cache is not None:
+        calculator.priority_cache.clear()
+    start = time.perf_counter()
+    calculator.calculate_task_priorities(tasks, patients)
+    elapsed = time.perf_counter() - start
+    return summarize('batch_scoring', size, len(tasks), elapsed, [elapsed / len(tasks)])
+
+
+def bench_training(size: int) -> dict:
+    """Wall-clock time to train both priority models from scratch"""
+    calculator = PriorityCalculator()
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        start = time.perf_counter()
+        calculator.train_ml_models()
+        elapsed = time.perf_counter() - start
+    result = summarize('training', size, 1, elapsed, [elapsed])
+    result['readings'] = 0
+    result['readings_per_s'] = 0.0
+    return result
+
+
+def bench_retraining(generator: WorkloadGenerator, size: int) -> dict:
+    """Background retrain on `size` observed readings, with per-reading scoring latency while it runs and swaps"""
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        # A calculator of its own, so the swapped-in models don't leak into other benchmarks
+        calculator = PriorityCalculator()
+        calculator.ml_models
+        calculator.edge_model
+    calculator.priority_cache = None  # Time the models, not cache hits on the repeated readings
+    retrainer = ModelRetrainer(
+        calculator, buffer_size=size, min_samples=1, drift_threshold=float('inf'),
+        trees_per_retrain=RETRAINING_SETTINGS['trees_per_retrain'],
+        max_estimators=RETRAINING_SETTINGS['max_estimators'], n_jobs=RETRAINING_SETTINGS['n_jobs']
+    )
+    pairs = make_tasks(generator, size, 'specific')
+    features = np.array([
+        [task.heart_rate, task.blood_pressure, task.glucose_level, patient.age, patient.height, patient.weight,
+         1 if patient.gender == 'M' else 0]
+        for task, patient in pairs
+    ], dtype=float)
+    retrainer.observe(features, calculator.calculate_specific_priority_batch(features)[0])
+
+    # Keep scoring on this thread until the new models are live
+    latencies = []
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        retrainer.retrain_now()
+        while retrainer.running():
+            for pair in pairs[:100]:
+                start = time.perf_counter()
+                calculator.calculate_task_priority(*pair)
+                latencies.append(time.perf_counter() - start)
+        retrainer.close()
+    if not retrainer.history:
+        raise SystemExit("Retraining failed, see the log output")
+
+    entry = retrainer.history[-1]
+    result = summarize('retraining', size, size, entry['wall_s'], latencies)
+    result.update({
+        'train_s': entry['train_s'],
+        'distill_s': entry['distill_s'],
+        'swap_us': entry['swap_us'],
+        'scoring_max_ms': max(latencies) * 1000 if latencies else 0.0,
+        'edge_model': entry['edge_model']
+    })
+    return result
+
+
+def bench_patient_lookup(size: int) -> dict:
+    """get_patient latency with `size` patients per edge device"""
+    generator = WorkloadGenerator(num_edge_devices=2, patients_per_device=size, seed=0)
+    patient_db = PatientDatabase()
+    for edge_id in (1, 2):
+        patient_db.load_patients_from_frame(generator.generate_patients(edge_id), edge_id)
+    rng = np.random.default_rng(0)
+    patient_ids = generator.patient_ids(1)
+    lookups = [patient_ids[i] for i in rng.integers(0, size, size)]
+    elapsed, latencies = time_each(lambda patient_id: patient_db.get_patient(patient_id, 1), lookups)
+    return summarize('patient_lookup', size, len(lookups), elapsed, latencies)
+
+
+def bench_ingest(size: int, batch_size: int = 256) -> list:
+    """Reading `size` sensor readings into per-column lists, as create_health_tasks does, from CSV and binary"""
+    generator = WorkloadGenerator(num_edge_devices=1, patients_per_device=100, seed=0)
+    results = []
+    with tempfile.TemporaryDirectory() as data_dir, contextlib.redirect_stdout(open(os.devnull, 'w')):
+        generator.write_dataset(data_dir, size)
+        csv_path = os.path.join(data_dir, 'sensor_readings_edge1.csv')
+        binary_path = convert_csv(csv_path)
+        for fmt, path, reader in (('csv', csv_path, iter_csv_batches), ('binary', binary_path, iter_binary_batches)):
+            start = time.perf_counter()
+            readings = 0
+            for batch in reader(path, batch_size):
+                columns = [batch[column].tolist() for column in SENSOR_COLUMNS]
+                readings += len(columns[0])
+            elapsed = time.perf_counter() - start
+            result = summarize(f"ingest_{fmt}", size, readings, elapsed)
+            result['file_bytes'] = os.path.getsize(path)
+            results.append(result)
+    return results
+
+
+def bench_simulation(size: int) -> dict:
+    """End-to-end run_simulation throughput on a generated workload of `size` readings per device"""
+    from src.simulation_manager import HealthcareEdgeSystem
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        system = HealthcareEdgeSystem()
+        generator = WorkloadGenerator(patients_per_device=100, rate=20.0, seed=0)
+        sources = system.load_workload(generator, size)
+        # Load the models before timing so the run measures steady-state throughput
+        system.priority_calculator.ml_model_k
+        system.priority_calculator.edge_model
+        start = time.perf_counter()
+        system.run_simulation(sources=sources)
+        elapsed = time.perf_counter() - start
+
+    latencies = system.aggregator.latency
+    # Readings ingested; edge-side pre-aggregation turns fewer of them into tasks
+    readings = system.readings_ingested()
+    result = summarize('simulation', size, readings, elapsed)
+    # Simulated end-to-end latency (reading timestamp to task completion), not wall-clock
+    result.update({
+        'sim_latency_p50_ms': latencies.quantile(0.50) * 1000,
+        'sim_latency_p95_ms': latencies.quantile(0.95) * 1000,
+        'sim_latency_p99_ms': latencies.quantile(0.99) * 1000,
+        'deadline_miss_rate': system.aggregator.deadline_snapshot()['miss_rate']
+    })
+    return result
+
+
+def import_breakdown(importtime_log: str, top: int = 8) -> dict:
+    """Self import time in ms per top-level package from `python -X importtime` output, largest first"""
+    packages = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1000
+    return dict(sorted(packages.items(), key=lambda entry: -entry[1])[:top])
+
+
+def bench_startup(probe: str, size: int) -> dict:
+    """Import and initialization time of one entry point in a fresh interpreter"""
+    imports, init = STARTUP_PROBES[probe]
+    script = STARTUP_SCRIPT.format(imports=imports, init=init, heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    elapsed = timings['import_s'] + timings['init_s']
+    result = summarize(f"startup_{probe}", size, 0, elapsed)
+    result.update(timings)
+    result['modules_ms'] = import_breakdown(completed.stderr)
+    return result
+
+
+def git_commit() -> str:
+    """Current commit hash, or 'unknown' outside a git checkout"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results: list, baseline_path: str):
+    """Print the change against a previous results file (positive = faster)"""
+    with open(baseline_path) as f:
+        baseline = {(r['benchmark'], r['size']): r for r in json.load(f)['results']}
+    print(f"\nComparison against {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result['benchmark'], result['size']))
+        if previous is None:
+            continue
+        if result['benchmark'] in ('training', 'retraining') or result['benchmark'].startswith('startup_'):
+            change = (previous['elapsed_s'] - result['elapsed_s']) / previous['elapsed_s'] * 100
+        elif previous['readings_per_s']:
+            change = (result['readings_per_s'] - previous['readings_per_s']) / previous['readings_per_s'] * 100
+        else:
+            continue
+        print(f"  {result['benchmark']:16} size={result['size']:<8} {change:+.1f}%")
+
+
+def run_benchmarks(names: list, sizes: list, max_scalar: int) -> list:
+    """Run the selected benchmarks at every size"""
+    results = []
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        calculator = PriorityCalculator()
+        calculator.ml_model_k  # Load or train the models outside the timed sections
+        calculator.edge_model
+    generator = WorkloadGenerator(patients_per_device=100, seed=0)
+
+    if {'general_scoring', 'batch_scoring'} & set(names):
+        mismatches = check_general_fast_path(calculator)
+        if mismatches:
+            raise SystemExit(f"General-priority fast path disagrees with the formula on {mismatches} readings")
+        print("General-priority fast path matches the formula")
+
+    if {'specific_scoring', 'batch_scoring'} & set(names):
+        if calculator.edge_model is None:
+            print("Edge model disabled, specific tasks are scored by the forests")
+        else:
+            agreement = check_edge_model(calculator, generator)
+            if agreement['scalar_batch_mismatches']:
+                raise SystemExit(f"Edge model scalar and batch paths disagree on "
+                                 f"{agreement['scalar_batch_mismatches']} readings")
+            print(f"Edge model vs forests: k MAE {agreement['k_mae']:.4f}, k max error {agreement['k_max_error']:.4f}, "
+                  f"m agreement {agreement['m_agreement']:.3f}, "
+                  f"k threshold agreement {agreement['threshold_agreement']:.4f}")
+
+    for size in sizes:
+        for name in names:
+            if name == 'startup':
+                if size != sizes[0]:
+                    continue  # Startup cost doesn't depend on workload size
+                for probe in STARTUP_PROBES:
+                    result = bench_startup(probe, size)
+                    results.append(result)
+                    modules = ", ".join(f"{package}={ms:.0f}ms" for package, ms in result['modules_ms'].items())
+                    print(f"{result['benchmark']:16} import {result['import_s'] * 1000:.0f}ms, "
+                          f"init {result['init_s'] * 1000:.0f}ms ({modules})")
+                    if result['heavy_modules']:
+                        print(f"{'':16} heavy modules loaded: {', '.join(result['heavy_modules'])}")
+                continue
+            if name == 'ingest':
+                for result in bench_ingest(size):
+                    results.append(result)
+                    print(f"{result['benchmark']:16} size={size:<8} {result['readings_per_s']:12.1f} readings/s, "
+                          f"{result['file_bytes']} bytes on disk")
+                continue
+            if name == 'general_scoring':
+                result = bench_scalar_scoring(calculator, generator, size, 'general', max_scalar)
+            elif name == 'specific_scoring':
+                result = bench_scalar_scoring(calculator, generator, size, 'specific', max_scalar)
+            elif name == 'repeated_scoring':
+                result = bench_repeated_scoring(calculator, generator, size, max_scalar)
+            elif name == 'batch_scoring':
+                result = bench_batch_scoring(calculator, generator, size)
+            elif name == 'training':
+                if size != sizes[0]:
+                    continue  # Training cost doesn't depend on workload size
+                result = bench_training(size)
+            elif name == 'retraining':
+                result = bench_retraining(generator, size)
+                print(f"{'':16} size={size:<8} train {result['train_s']:.2f}s, distill {result['distill_s']:.2f}s, "
+                      f"swap stall {result['swap_us']:.1f}us, scoring max {result['scoring_max_ms']:.2f}ms")
+            elif name == 'patient_lookup':
+                result = bench_patient_lookup(size)
+            else:
+                result = bench_simulation(size)
+
+            results.append(result)
+            latency = f", p50={result['latency_p50_ms']:.3f}ms p99={result['latency_p99_ms']:.3f}ms" \
+                if 'latency_p50_ms' in result else ''
+            print(f"{result['benchmark']:16} size={size:<8} {result['readings_per_s']:12.1f} readings/s"
+                  f"{latency}, peak RSS {result['peak_rss_mb']:.1f} MB")
+    return results
+
+
+def main():
+    """Run the benchmark suite and save the results as JSON"""
+    parser = argparse.ArgumentParser(description="Team24 HeartAttack benchmark suite")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help="workload sizes")
+    parser.add_argument('--only', choices=BENCHMARKS, nargs='+', default=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument('--max-scalar', type=int, default=2000,
+                        help="cap on readings for the per-reading scoring benchmarks")
+    parser.add_argument('--edge-model', action='store_true',
+                        help="score specific patients with the distilled edge model")
+    parser.add_argument('--output', default=None, help="results file (default: benchmarks/results_<commit>.json)")
+    parser.add_argument('--compare', default=None, help="previous results file to compare against")
+    args = parser.parse_args()
+
+    MODEL_SETTINGS['edge_model'] = args.edge_model or MODEL_SETTINGS['edge_model']
+    commit = git_commit()
+    results = run_benchmarks(args.only, args.sizes, args.max_scalar)
+
+    output = args.output or os.path.join('benchmarks', f"results_{commit}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results
+        }, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
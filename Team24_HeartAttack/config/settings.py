@@ -32,6 +32,117 @@ CLOUD_DEVICE_SPECS = {
 
 # Simulation settings
 SIMULATION_SETTINGS = {
+    'num_edge_devices': 2,   # Edge devices N read data/edge_device_N_patients.csv and data/sensor_readings_edgeN.csv
+    'data_dir': 'data',
+    'sensor_format': 'csv',  # 'csv' or 'binary' (sensor_readings_edgeN.bin, see python -m src.sensor_wire)
     'base_processing_time': 0.1,  # seconds
-    'task_generation_interval': 1.0
-}
\ No newline at end of file
+    'task_generation_interval': 1.0,
+    'batch_size': 256,       # Sensor readings per ingestion/scoring batch
+    'replay_speedup': 10.0,  # Real-time replay rate multiplier (None = as fast as possible)
+    'queue_size': 1024,      # Bounded per-device queue for the real-time runtime
+    'task_memory_mb': 512,   # Memory a task holds on its server while it runs
+    'utilization_interval': 1.0,  # Simulated seconds between utilization samples
+    'rate_window': 60.0,          # Simulated seconds covered by per-edge task rates
+    'task_store_segment_size': 100000,  # Completed-task records per spilled segment
+    'task_store_spill_dir': None,       # Directory for spilled segments (None = keep in memory)
+    'task_store_format': 'parquet'      # 'parquet' or 'feather' (.npy when pyarrow is missing)
+}
+
+# Edge-side pre-aggregation of non-urgent readings before offload
+PRE_AGGREGATION_SETTINGS = {
+    'enabled': False,
+    'window': 30.0,            # Seconds a patient's non-urgent readings are collected into one summary
+    'deadband': {              # Change from the last forwarded vitals below which a reading is suppressed
+        'heart_rate': 5,
+        'blood_pressure': 5,
+        'glucose_level': 10.0
+    },
+    'urgent_threshold': 1.0,   # Readings with k above this bypass the stage
+    'summary_payload_kb': 1    # Size of one window summary sent upstream
+}
+
+# Log output; per-task scheduling decisions are INFO, urgent ones are always written immediately
+LOGGING_SETTINGS = {
+    'level': 'INFO',           # 'WARNING' keeps only urgent tasks and problems, 'DEBUG' adds data summaries
+    'format': 'text',          # 'text' or 'json' (JSON lines)
+    'async': True,             # Write from a background thread so stdout never blocks scoring
+    'sample_every': 1,         # Log one in N non-urgent tasks
+    'urgent_threshold': 1.5    # Tasks with k above this bypass sampling and the background queue
+}
+
+# Opt-in pipeline instrumentation
+INSTRUMENTATION_SETTINGS = {
+    'enabled': False,          # Per-stage timers and counters, with a breakdown after each run
+    'profiler': None,          # 'cprofile' or 'pyinstrument' to profile a run
+    'profile_output': None,    # .prof (cProfile) or .html (pyinstrument) file; None prints a summary
+    'export_path': None,       # Write stage metrics here after each run
+    'export_format': 'json'    # 'json' or 'prometheus'
+}
+
+# Priority model persistence
+MODEL_SETTINGS = {
+    'training_data': 'data/heart_disease_full.csv',
+    'model_dir': 'models',
+    'n_estimators': 100,
+    'random_state': 42,
+    'data_seed': 42,             # Seed for the synthetic columns of the training data
+    'training_chunksize': None,  # Rows per chunk; set to stream training sets larger than RAM
+    'trees_per_chunk': 10,       # Trees added per chunk when streaming
+    'artifact_version': 1,  # Bump when the artifact layout or training pipeline changes
+    'edge_model': False,         # Score specific tasks with the distilled edge model instead of the forests
+    'edge_n_estimators': 8,      # Student trees; more trees and depth = closer to the forests, slower
+    'edge_max_depth': 8,
+    'edge_distill_samples': 20000,  # Jittered training rows labelled by the forests for distillation
+    'edge_max_k_mae': 0.05,      # Fall back to the forests if the student misses these on held-out rows
+    'edge_min_m_agreement': 0.95,
+    'edge_k_thresholds': (1.0, 1.5),       # k cut-offs for placement, deadlines and complexity...
+    'edge_min_threshold_agreement': 0.99,  # ...on which the student must take the forests' side this often
+    'n_jobs': -1,                # Cores used to build trees when training (-1 = all)
+    'priority_cache_size': 65536,  # LRU entries of specific-patient results (0 = no cache)
+    'priority_cache_glucose_quantum': 0.1  # mg/dL; readings in the same bucket share a cached result
+}
+
+# Per-patient rolling vital-sign history and trend escalation
+TREND_SETTINGS = {
+    'enabled': False,
+    'window': 32,              # Readings kept per patient
+    'max_patients': 10000,     # Preallocated patient slots; the least recently seen patient is evicted beyond this
+    'idle_timeout': 600.0,     # Seconds without a reading after which a patient's history is dropped
+    'horizon': 60.0,           # Seconds ahead the rolling trend is projected when scoring
+    'min_readings': 4          # Readings needed before a trend can raise k
+}
+
+# Background retraining of the specific-patient models on the readings the system scores
+RETRAINING_SETTINGS = {
+    'enabled': False,
+    'buffer_size': 50000,      # Most recent specific-patient readings kept for retraining
+    'min_samples': 2000,       # Readings needed before the first retrain
+    'interval': None,          # Wall-clock seconds between scheduled retrains (None = only on drift)
+    'drift_threshold': 0.1,    # Retrain when mean |served k - formula k| exceeds this ...
+    'drift_window': 2000,      # ... over this many recent readings
+    'trees_per_retrain': 20,   # Trees fitted on the buffered readings per retrain
+    'max_estimators': 200,     # Oldest trees are dropped beyond this
+    'n_jobs': -1,              # Cores used to fit the new trees (-1 = all)
+    'executor': 'thread'       # 'thread' or 'process' (fork) for the retraining worker
+}
+
+# Deadlines derived from k/m, earliest-deadline-first queues and admission control
+DEADLINE_SETTINGS = {
+    'discipline': 'edf',          # 'edf' (earliest deadline first) or 'priority' (highest k, then m)
+    'budgets': (                  # (upper bound on k, seconds from reading to completion), by increasing k
+        (1.0, 10.0),
+        (1.5, 2.0),
+        (float('inf'), 0.5)
+    ),
+    'm_tightening': 0.1,          # Each step of m above 1 shortens the budget by this fraction
+    'admission': 'offload'        # None, 'offload' (to a device that finishes in time) or 'reject' (if none can)
+}
+
+# Edge/cloud placement
+PLACEMENT_SETTINGS = {
+    'policy': 'load_aware',       # 'static' (k > 1.0 -> home edge, else cloud) or 'load_aware'
+    'task_payload_kb': 4,         # Size of one reading sent off its home edge device
+    'edge_link_latency': 0.002,   # seconds, edge-to-edge hospital LAN
+    'cloud_link_latency': 0.05,   # seconds, edge-to-cloud WAN
+    'urgent_reserved_slots': 2    # Edge cores kept free for urgent work when taking non-urgent tasks
+}
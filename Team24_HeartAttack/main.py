@@ -1,24 +1,89 @@
+import argparse
 import sys
 import os
 
 # Add src directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.simulation_manager import HealthcareEdgeSystem
+from src.instrumentation import Instrumentation, PROFILERS
+from src.event_log import LOG_FORMATS, TaskEventLogger, configure_logging
+from config.settings import INSTRUMENTATION_SETTINGS, LOGGING_SETTINGS, RETRAINING_SETTINGS, DEADLINE_SETTINGS, \
+    MODEL_SETTINGS, PRE_AGGREGATION_SETTINGS
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Team24 HeartAttack healthcare edge computing simulation")
+    parser.add_argument('--realtime', action='store_true',
+                        help="run edge devices concurrently, replaying readings at their timestamps")
+    parser.add_argument('--speedup', type=float, default=None,
+                        help="real-time replay rate multiplier (0 = as fast as possible)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="run edge devices as shards across this many processes")
+    parser.add_argument('--instrument', action='store_true',
+                        help="time each pipeline stage and print a breakdown after the run")
+    parser.add_argument('--profile', choices=PROFILERS, default=None,
+                        help="profile the simulation run with cProfile or pyinstrument")
+    parser.add_argument('--profile-output', default=None,
+                        help="write the profile here (.prof for cProfile, .html for pyinstrument)")
+    parser.add_argument('--trends', action='store_true',
+                        help="raise the priority of patients whose vital signs are trending towards urgency")
+    parser.add_argument('--pre-aggregate', action='store_true',
+                        help="condense non-urgent readings into per-patient window summaries at the edge")
+    parser.add_argument('--edge-model', action='store_true',
+                        help="score specific patients with the distilled edge model when it matches the forests")
+    parser.add_argument('--retrain', action='store_true',
+                        help="retrain the specific-patient models in the background on the scored readings")
+    parser.add_argument('--scheduling', choices=('edf', 'priority'), default=DEADLINE_SETTINGS['discipline'],
+                        help="order device queues by earliest deadline or by highest k and m")
+    parser.add_argument('--admission', choices=('offload', 'reject', 'off'), default=DEADLINE_SETTINGS['admission'] or 'off',
+                        help="offload tasks that would miss their deadline on their device, also reject those "
+                             "no device can finish in time, or neither")
+    parser.add_argument('--quiet', action='store_true',
+                        help="log only urgent tasks and problems instead of every scheduling decision")
+    parser.add_argument('--log-format', choices=LOG_FORMATS, default=LOGGING_SETTINGS['format'],
+                        help="plain text or JSON lines")
+    parser.add_argument('--log-sample', type=int, default=LOGGING_SETTINGS['sample_every'],
+                        help="log one in N non-urgent tasks")
+    return parser.parse_args()
 
 def main():
     """Main function to run the healthcare edge computing simulation"""
+    args = parse_args()
+    # Imported after argument parsing so --help doesn't load pandas and EdgeSimPy
+    from src.simulation_manager import HealthcareEdgeSystem
+    configure_logging(
+        'WARNING' if args.quiet else LOGGING_SETTINGS['level'], args.log_format, LOGGING_SETTINGS['async']
+    )
+    
     print("TEAM24 HEARTATTACK - Healthcare Edge Computing System")
     print("=" * 50)
     
+    # Deadline handling is read when the system builds its queues and placement engine
+    DEADLINE_SETTINGS['discipline'] = args.scheduling
+    DEADLINE_SETTINGS['admission'] = None if args.admission == 'off' else args.admission
+    MODEL_SETTINGS['edge_model'] = args.edge_model or MODEL_SETTINGS['edge_model']
+    PRE_AGGREGATION_SETTINGS['enabled'] = args.pre_aggregate or PRE_AGGREGATION_SETTINGS['enabled']
+    
     # Initialize the healthcare edge system
-    healthcare_system = HealthcareEdgeSystem()
+    instrumentation = Instrumentation(args.instrument or INSTRUMENTATION_SETTINGS['enabled'])
+    healthcare_system = HealthcareEdgeSystem(instrumentation=instrumentation)
+    healthcare_system.task_log = TaskEventLogger(LOGGING_SETTINGS['urgent_threshold'], args.log_sample)
+    if args.trends:
+        healthcare_system.priority_calculator.enable_trends()
+    if args.retrain or RETRAINING_SETTINGS['enabled']:
+        healthcare_system.enable_retraining()
     
     # Run the simulation
-    healthcare_system.run_simulation()
+    if args.realtime:
+        healthcare_system.run_realtime(args.speedup)
+    elif args.workers:
+        healthcare_system.run_sharded(args.workers)
+    else:
+        healthcare_system.run_simulation(profiler=args.profile, profile_output=args.profile_output)
     
     # Analyze and display results
     healthcare_system.analyze_performance()
+    healthcare_system.compare_placement_policies()
     
     # Demonstrate priority calculation with examples
     print("\n" + "="*60)
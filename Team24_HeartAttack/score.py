@@ -0,0 +1,58 @@
+import argparse
+import csv
+import os
+import sys
+
+# Add src directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+# Only NumPy is imported for general patients; pandas, scikit-learn and EdgeSimPy never load
+from src.priority_calculator import PriorityCalculator
+
+SCORE_COLUMNS = ['heart_rate', 'blood_pressure', 'glucose_level']
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Score general-patient readings (k and m values)")
+    parser.add_argument('readings', nargs='?', default='-',
+                        help="CSV with heart_rate, blood_pressure and glucose_level columns (default: stdin)")
+    parser.add_argument('--batch-size', type=int, default=4096, help="readings scored per batch")
+    return parser.parse_args()
+
+
+def iter_reading_batches(lines, batch_size: int):
+    """Yield lists of CSV rows (dicts) of at most batch_size"""
+    batch = []
+    for row in csv.DictReader(lines):
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    """Write each input row back with its k and m values"""
+    args = parse_args()
+    calculator = PriorityCalculator()
+
+    source = sys.stdin if args.readings == '-' else open(args.readings, newline='')
+    with source:
+        writer = None
+        for batch in iter_reading_batches(source, args.batch_size):
+            if writer is None:
+                writer = csv.DictWriter(sys.stdout, fieldnames=list(batch[0]) + ['k_value', 'm_value'])
+                writer.writeheader()
+            k_values, m_values = calculator.calculate_general_priority_batch(
+                *([float(row[column]) for row in batch] for column in SCORE_COLUMNS)
+            )
+            for row, k_value, m_value in zip(batch, k_values.tolist(), m_values.tolist()):
+                row['k_value'] = k_value
+                row['m_value'] = m_value
+                writer.writerow(row)
+
+
+if __name__ == "__main__":
+    main()
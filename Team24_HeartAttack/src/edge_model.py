@@ -0,0 +1,180 @@
+import numpy as np
+
+
+class CompiledForest:
+    """Tree ensemble flattened into NumPy arrays that predicts k and the m class in one pass.
+
+    Every tree predicts [k, P(m = class_0), P(m = class_1), ...]; the
+    nodes of all trees are concatenated into flat arrays and leaf values
+    are pre-divided by the number of trees, so a prediction is the sum of
+    one leaf per tree. k is clipped to [0, 2] and m is the most probable
+    class. Inference needs only NumPy, never scikit-learn.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, m_classes, depth: int, fidelity: dict = None):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=float)
+        self.left = np.asarray(left, dtype=np.intp)    # -1 at leaves
+        self.right = np.asarray(right, dtype=np.intp)  # -1 at leaves
+        self.value = np.asarray(value, dtype=float)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.m_classes = np.asarray(m_classes, dtype=float)
+        self.depth = int(depth)
+        self.fidelity = fidelity or {}
+
+        # Batch walk: leaves loop back to themselves so every row can take `depth` steps
+        nodes = np.arange(len(self.left))
+        is_leaf = self.left < 0
+        self._left_batch = np.where(is_leaf, nodes, self.left)
+        self._right_batch = np.where(is_leaf, nodes, self.right)
+        self._feature_batch = np.where(is_leaf, 0, self.feature)
+
+        # Scalar walk over plain lists avoids per-element NumPy overhead for single readings
+        self._lists = (self.feature.tolist(), self.threshold.tolist(), self.left.tolist(),
+                       self.right.tolist(), self.value.tolist())
+        self._roots_list = self.roots.tolist()
+        self._m_classes_list = self.m_classes.tolist()
+
+    @classmethod
+    def from_sklearn(cls, forest, m_classes, fidelity: dict = None) -> 'CompiledForest':
+        """Flatten a fitted multi-output forest whose outputs are [k, one-hot m]"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        n_trees = len(forest.estimators_)
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            features.append(np.where(is_leaf, -1, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+            rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+            values.append(tree.value[:, :, 0] / n_trees)
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+        return cls(
+            np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts),
+            np.concatenate(rights), np.concatenate(values), roots, m_classes, depth, fidelity
+        )
+
+    def to_arrays(self) -> dict:
+        """Arrays that fully describe the model, for np.savez"""
+        arrays = {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'left': self.left,
+            'right': self.right,
+            'value': self.value,
+            'roots': self.roots,
+            'm_classes': self.m_classes,
+            'depth': np.array(self.depth)
+        }
+        arrays.update({f"fidelity_{name}": np.array(metric) for name, metric in self.fidelity.items()})
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> 'CompiledForest':
+        """Rebuild a model from to_arrays() output (or a loaded .npz file)"""
+        fidelity = {name[len('fidelity_'):]: float(arrays[name]) for name in arrays if name.startswith('fidelity_')}
+        return cls(
+            arrays['feature'], arrays['threshold'], arrays['left'], arrays['right'], arrays['value'],
+            arrays['roots'], arrays['m_classes'], int(arrays['depth']), fidelity
+        )
+
+    def predict_one(self, features) -> tuple[float, float]:
+        """k and m for one feature vector"""
+        feature, threshold, left, right, value = self._lists
+        k_value = 0.0
+        probabilities = [0.0] * len(self._m_classes_list)
+        for node in self._roots_list:
+            while left[node] >= 0:
+                node = left[node] if features[feature[node]] <= threshold[node] else right[node]
+            leaf = value[node]
+            k_value += leaf[0]
+            probabilities = [total + p for total, p in zip(probabilities, leaf[1:])]
+        m_value = self._m_classes_list[probabilities.index(max(probabilities))]
+        return max(0.0, min(k_value, 2.0)), m_value
+
+    def predict(self, features) -> tuple[np.ndarray, np.ndarray]:
+        """k and m arrays for a (readings, features) matrix"""
+        features = np.asarray(features, dtype=float)
+        if len(features) == 0:
+            return np.empty(0), np.empty(0)
+
+        # All (reading, tree) pairs descend one level per step
+        rows = np.arange(len(features))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(features), len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_left = features[rows, self._feature_batch[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self._left_batch[nodes], self._right_batch[nodes])
+
+        totals = self.value[nodes].sum(axis=1)
+        k_values = np.clip(totals[:, 0], 0.0, 2.0)
+        m_values = self.m_classes[totals[:, 1:].argmax(axis=1)]
+        return k_values, m_values
+
+
+def nearest_class(values, classes) -> np.ndarray:
+    """Snap continuous m predictions to the closest valid m class"""
+    classes = np.asarray(classes, dtype=float)
+    return classes[np.abs(np.asarray(values, dtype=float)[:, None] - classes).argmin(axis=1)]
+
+
+def augment_features(X: np.ndarray, samples: int, noise: float, rng) -> np.ndarray:
+    """Resample training rows and jitter each column by `noise` times its standard deviation"""
+    X = np.asarray(X, dtype=float)
+    picked = X[rng.integers(0, len(X), samples)]
+    jitter = rng.normal(0.0, 1.0, picked.shape) * (X.std(axis=0) * noise)
+    return np.vstack([X, picked + jitter])
+
+
+def threshold_agreement(k_values: np.ndarray, k_reference: np.ndarray, k_thresholds) -> float:
+    """Fraction of readings on the same side of every threshold (k > threshold) in both arrays"""
+    thresholds = np.asarray(k_thresholds, dtype=float)
+    if not len(k_values) or not len(thresholds):
+        return 1.0
+    same = (k_values[:, None] > thresholds) == (k_reference[:, None] > thresholds)
+    return float(np.mean(same.all(axis=1)))
+
+
+def distill_priority_model(model_k, model_m, X, m_classes, n_estimators: int, max_depth: int,
+                           samples: int, noise: float = 0.1, random_state: int = None,
+                           k_thresholds: tuple = ()) -> CompiledForest:
+    """Fit a compiled student forest to the predictions of the k/m teacher forests.
+
+    The teachers label the training rows plus `samples` jittered copies;
+    the student is one multi-output forest trained on [k, one-hot m], with
+    m snapped to its nearest class. Agreement with the teachers is measured
+    on a fresh jittered sample and stored in the model's fidelity dict,
+    including the fraction of rows on which the student falls on the same
+    side of every k threshold in `k_thresholds` as the teachers.
+    n_estimators and max_depth trade accuracy for latency.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(random_state)
+    m_classes = np.asarray(m_classes, dtype=float)
+
+    def teacher(features):
+        return (np.clip(model_k.predict(features), 0.0, 2.0),
+                nearest_class(model_m.predict(features), m_classes))
+
+    X_train = augment_features(X, samples, noise, rng)
+    k_train, m_train = teacher(X_train)
+    targets = np.column_stack([k_train, m_train[:, None] == m_classes]).astype(float)
+
+    student = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, random_state=random_state)
+    student.fit(X_train, targets)
+
+    X_check = augment_features(X, max(samples // 4, 1), noise, rng)
+    k_check, m_check = teacher(X_check)
+    compiled = CompiledForest.from_sklearn(student, m_classes)
+    k_values, m_values = compiled.predict(X_check)
+    compiled.fidelity = {
+        'k_mae': float(np.mean(np.abs(k_values - k_check))),
+        'k_max_error': float(np.max(np.abs(k_values - k_check))),
+        'm_agreement': float(np.mean(m_values == m_check)),
+        'threshold_agreement': threshold_agreement(k_values, k_check, k_thresholds)
+    }
+    return compiled
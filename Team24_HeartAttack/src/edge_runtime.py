@@ -0,0 +1,181 @@
+import asyncio
+import collections
+import time
+
+import pandas as pd
+
+from src.metrics import LatencyHistogram
+from src.sensor_stream import SENSOR_COLUMNS, iter_batch_rows
+
+# Marks the end of a device's sensor stream on its queue
+_END_OF_STREAM = None
+
+
+class DeviceRuntimeStats:
+    """Throughput and end-to-end latency for one edge device"""
+    
+    def __init__(self, edge_device_id: int):
+        self.edge_device_id = edge_device_id
+        self.readings = 0
+        self.latencies = LatencyHistogram()
+        self.max_queue_depth = 0
+        self.started_at = None
+        self.finished_at = None
+    
+    def summary(self) -> dict:
+        elapsed = (self.finished_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        return {
+            'edge_device': self.edge_device_id,
+            'readings': self.readings,
+            'elapsed_s': elapsed,
+            'readings_per_s': self.readings / elapsed if elapsed > 0 else 0.0,
+            'latency_p50_ms': self.latencies.quantile(0.50) * 1000,
+            'latency_p95_ms': self.latencies.quantile(0.95) * 1000,
+            'latency_p99_ms': self.latencies.quantile(0.99) * 1000,
+            'max_queue_depth': self.max_queue_depth
+        }
+
+
+class AsyncEdgeRuntime:
+    """Runs every edge device as a live node: one ingestion coroutine and one bounded queue each.
+    
+    Readings are replayed at their CSV timestamps divided by `speedup`
+    (None replays as fast as possible). A full queue blocks ingestion,
+    which gives backpressure when scoring falls behind. `sources` maps an
+    edge device ID to an iterable of reading DataFrames, e.g. from
+    WorkloadGenerator, in place of its sensor CSV.
+    
+    Ingestion is concurrent, but a single consumer scores and schedules
+    the readings of all devices, one batch at a time on a worker thread,
+    so the priority calculator, the event engine and the metrics are
+    never updated from two threads at once. The consumer merges devices
+    in timestamp order: a reading is only taken once every other device
+    has passed its timestamp (its watermark), so the engine's clock never
+    moves past a reading that is still to be scheduled.
+    """
+    
+    def __init__(self, system, speedup: float = 1.0, queue_size: int = 1024, batch_size: int = 256,
+                 sources: dict = None):
+        self.system = system
+        self.sources = sources or {}
+        self.speedup = speedup
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.stats = {}
+        self.queues = {}
+        self.watermarks = {}  # edge_device_id -> no later reading from the device is earlier than this
+        self._progress = None  # Set by ingestion whenever a queue or watermark changes
+    
+    async def _ingest(self, edge_device_id: int, queue: asyncio.Queue, stats: DeviceRuntimeStats):
+        """Replay one device's sensor stream onto its queue at timestamp rate"""
+        first_timestamp = None
+        batches = self.sources.get(edge_device_id) or self.system.stream_sensor_readings(edge_device_id, self.batch_size)
+        for sensor_batch in batches:
+            for reading in iter_batch_rows(sensor_batch):
+                timestamp = float(reading[-1])
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                # Published before pacing, so other devices' earlier readings go ahead while this one waits
+                self.watermarks[edge_device_id] = timestamp
+                self._progress.set()
+                
+                if self.speedup:
+                    due = stats.started_at + (timestamp - first_timestamp) / self.speedup
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                
+                await queue.put((reading, time.perf_counter()))
+                self._progress.set()
+                stats.max_queue_depth = max(stats.max_queue_depth, queue.qsize())
+            
+            # Yield between file chunks even when replaying unpaced
+            await asyncio.sleep(0)
+        
+        await queue.put(_END_OF_STREAM)
+        self._progress.set()
+    
+    def _next_batch(self, pending: dict, ended: set) -> dict:
+        """Take up to batch_size readings, in timestamp order, that no device can still precede"""
+        # Top up each device's lookahead from its queue
+        for edge_device_id, queue in self.queues.items():
+            readings = pending[edge_device_id]
+            while len(readings) < self.batch_size and not queue.empty():
+                item = queue.get_nowait()
+                if item is _END_OF_STREAM:
+                    ended.add(edge_device_id)
+                else:
+                    readings.append(item)
+        
+        # Every reading a device has yet to queue is at or after its watermark
+        horizon = min(
+            (float('inf') if edge_device_id in ended else self.watermarks.get(edge_device_id, float('-inf'))
+             for edge_device_id in pending),
+            default=float('inf')
+        )
+        batch = {}
+        taken = 0
+        while taken < self.batch_size:
+            heads = [(float(readings[0][0][-1]), edge_device_id) for edge_device_id, readings in pending.items() if readings]
+            if not heads:
+                break
+            timestamp, edge_device_id = min(heads)
+            if timestamp > horizon:
+                break
+            batch.setdefault(edge_device_id, []).append(pending[edge_device_id].popleft())
+            taken += 1
+        return batch
+    
+    async def _process(self):
+        """Score and schedule every device's readings in timestamp order, off the event loop"""
+        pending = {edge_device_id: collections.deque() for edge_device_id in self.queues}
+        ended = set()
+        last_timestamp = None
+        while True:
+            self._progress.clear()
+            batch = self._next_batch(pending, ended)
+            if not batch:
+                if len(ended) == len(self.queues) and not any(pending.values()):
+                    break
+                await self._progress.wait()
+                continue
+            
+            sensor_batches = {
+                edge_device_id: pd.DataFrame([reading for reading, _ in items], columns=SENSOR_COLUMNS)
+                for edge_device_id, items in batch.items()
+            }
+            await asyncio.to_thread(self.system.process_sensor_batches, sensor_batches)
+            
+            done = time.perf_counter()
+            for edge_device_id, items in batch.items():
+                stats = self.stats[edge_device_id]
+                stats.readings += len(items)
+                stats.latencies.record_many([done - enqueued for _, enqueued in items])
+                last_timestamp = max(last_timestamp or float('-inf'), float(items[-1][0][-1]))
+                if edge_device_id in ended and not pending[edge_device_id]:
+                    stats.finished_at = done
+        
+        # Forward the windows still open at the edge once every stream has ended
+        if self.system.pre_aggregators:
+            await asyncio.to_thread(self.system.flush_pre_aggregation, None, last_timestamp)
+        for stats in self.stats.values():
+            stats.finished_at = stats.finished_at or time.perf_counter()
+    
+    async def run(self) -> dict:
+        """Run all edge devices concurrently until their streams are exhausted"""
+        self._progress = asyncio.Event()
+        coroutines = []
+        for edge_device_id in self.system.edge_device_ids:
+            queue = self.queues[edge_device_id] = asyncio.Queue(maxsize=self.queue_size)
+            stats = DeviceRuntimeStats(edge_device_id)
+            stats.started_at = time.perf_counter()
+            self.stats[edge_device_id] = stats
+            coroutines.append(self._ingest(edge_device_id, queue, stats))
+        coroutines.append(self._process())
+        
+        await asyncio.gather(*coroutines)
+        return self.report()
+    
+    def report(self) -> dict:
+        """Per-device sustained throughput and latency percentiles"""
+        return {edge_device_id: stats.summary() for edge_device_id, stats in self.stats.items()}
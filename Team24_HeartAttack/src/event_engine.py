@@ -0,0 +1,189 @@
+import heapq
+import itertools
+import logging
+import threading
+
+from src.scheduler import DeviceQueue
+
+logger = logging.getLogger('heartattack.engine')
+
+# Event kinds, ordered so that at equal times resources are freed before new work is placed
+COMPLETE, DELIVER, ARRIVAL, SAMPLE = 0, 1, 2, 3
+
+
+class NetworkLink:
+    """One-way link that sends transfers one at a time at its bandwidth"""
+
+    def __init__(self, bandwidth_mbps: float, latency: float):
+        self.bandwidth_mbps = bandwidth_mbps
+        self.latency = latency
+        self.free_at = 0.0
+        self.busy_time = 0.0
+        self.bytes_sent = 0
+
+    def transfer(self, now: float, size_bytes: int) -> float:
+        """Queue a transfer behind earlier ones; return its delivery time"""
+        start = max(now, self.free_at)
+        transmission = size_bytes * 8 / (self.bandwidth_mbps * 1e6)
+        self.free_at = start + transmission
+        self.busy_time += transmission
+        self.bytes_sent += size_bytes
+        return self.free_at + self.latency
+
+
+class DiscreteEventEngine:
+    """Discrete-event simulation of edge and cloud servers and the links between them.
+
+    A heap-ordered event list drives the clock. A reading arrives at its
+    timestamp on its home edge device. It crosses a network link when it is
+    placed elsewhere, then waits in the target's ready queue, ordered by
+    `discipline` (see DeviceQueue). It holds a CPU core and memory until it
+    completes.
+    
+    Tasks must be submitted in timestamp order: advance() moves the clock
+    past everything up to its argument. Callers that place a task from the
+    queue state and then submit it hold `lock` across both steps.
+    """
+
+    def __init__(self, on_complete=None, utilization_interval: float = 1.0, discipline: str = 'priority'):
+        self.queues = {}
+        self.discipline = discipline
+        self.links = {}
+        self.on_complete = on_complete
+        self.utilization_interval = utilization_interval
+        self.utilization_samples = []
+        self.clock = 0.0
+        self.events = []
+        self._seq = itertools.count()
+        self._next_sample = None
+        self._sample_marks = {}  # Utilization integrals per device at the previous sample
+        self.late_arrivals = 0   # Tasks submitted with a timestamp the clock had already passed
+        self.oversize_rejections = 0  # Tasks refused because they need more memory than their device has
+        # Reentrant so a placement decision, the advance it triggers and the submit form one step
+        self.lock = threading.RLock()
+
+    def add_device(self, name: str, cpu_slots: int, memory_capacity: float = float('inf')):
+        """Register a server with one slot per CPU core"""
+        self.queues[name] = DeviceQueue(name, cpu_slots, memory_capacity, self.discipline)
+        self._sample_marks[name] = (0.0, 0.0)
+
+    def add_link(self, source: str, target: str, bandwidth_mbps: float, latency: float):
+        """Register a one-way network link between two servers"""
+        self.links[(source, target)] = NetworkLink(bandwidth_mbps, latency)
+
+    def empty_copy(self, on_complete=None):
+        """A new engine with the same servers and links and no tasks"""
+        engine = DiscreteEventEngine(on_complete, self.utilization_interval, self.discipline)
+        for name, queue in self.queues.items():
+            engine.add_device(name, queue.cpu_slots, queue.memory_capacity)
+        for (source, target), link in self.links.items():
+            engine.add_link(source, target, link.bandwidth_mbps, link.latency)
+        return engine
+
+    def _push(self, time: float, kind: int, *payload):
+        heapq.heappush(self.events, (time, kind, next(self._seq), payload))
+
+    def submit(self, name: str, record: dict, arrival: float, source: str = None, size_bytes: int = 0) -> bool:
+        """Schedule a task to arrive at `source` (its home device) and run on `name`.
+        
+        Returns False without queueing the task if it needs more memory than
+        `name` has; it could never start and would block the queue behind it.
+        """
+        with self.lock:
+            if not self.queues[name].fits(record):
+                self.oversize_rejections += 1
+                if self.oversize_rejections == 1:
+                    logger.warning("Task needing %.0f MB rejected by %s (%.0f MB memory)",
+                                   record.get('memory', 0), name, self.queues[name].memory_capacity)
+                return False
+            if arrival < self.clock:
+                self.late_arrivals += 1
+                if self.late_arrivals == 1:
+                    logger.warning("Task submitted at t=%.3f behind the engine clock (t=%.3f); "
+                                   "submissions must be in timestamp order", arrival, self.clock)
+            self.queues[name].reserve(record)
+            self._push(arrival, ARRIVAL, name, record, source or name, size_bytes)
+            if self._next_sample is None:
+                self._next_sample = arrival + self.utilization_interval
+                self._push(self._next_sample, SAMPLE)
+        return True
+
+    def advance(self, until: float) -> list:
+        """Process every event up to simulated time `until`; return the completed records"""
+        completed = []
+        with self.lock:
+            while self.events and self.events[0][0] <= until:
+                time, kind, _, payload = heapq.heappop(self.events)
+                self.clock = time
+                if kind == ARRIVAL:
+                    self._on_arrival(time, *payload)
+                elif kind == DELIVER:
+                    self._on_deliver(time, *payload)
+                elif kind == COMPLETE:
+                    completed.append(self._on_complete(time, *payload))
+                else:
+                    self._on_sample(time)
+
+        if self.on_complete:
+            for record in completed:
+                self.on_complete(record)
+        return completed
+
+    def drain(self) -> list:
+        """Run until every submitted task has completed"""
+        return self.advance(float('inf'))
+
+    def _on_arrival(self, time: float, name: str, record: dict, source: str, size_bytes: int):
+        record['timestamp'] = time
+        if source == name:
+            record['network_delay'] = 0.0
+            self._on_deliver(time, name, record)
+            return
+        # Transfers on the same link compete for its bandwidth
+        delivered = self.links[(source, name)].transfer(time, size_bytes)
+        record['network_delay'] = delivered - time
+        self._push(delivered, DELIVER, name, record)
+
+    def _on_deliver(self, time: float, name: str, record: dict):
+        queue = self.queues[name]
+        queue.enqueue(record, time, next(self._seq))
+        self._dispatch(queue, time)
+
+    def _on_complete(self, time: float, name: str, record: dict) -> dict:
+        queue = self.queues[name]
+        queue.finish(record, time)
+        record['latency'] = time - record['timestamp']
+        self._dispatch(queue, time)
+        return record
+
+    def _dispatch(self, queue: DeviceQueue, time: float):
+        """Start ready tasks while the device has free cores and memory"""
+        record = queue.start_next(time)
+        while record is not None:
+            self._push(record['completion_time'], COMPLETE, queue.name, record)
+            record = queue.start_next(time)
+
+    def _on_sample(self, time: float):
+        """Record per-device CPU and memory utilization over the last interval"""
+        for name, queue in self.queues.items():
+            queue.accumulate(time)
+            previous_core_time, previous_memory_time = self._sample_marks[name]
+            self._sample_marks[name] = (queue.busy_core_time, queue.memory_time)
+            self.utilization_samples.append({
+                'time': time,
+                'device': name,
+                'cpu': (queue.busy_core_time - previous_core_time) / (queue.cpu_slots * self.utilization_interval),
+                'memory': (queue.memory_time - previous_memory_time) / (queue.memory_capacity * self.utilization_interval)
+            })
+        # Keep sampling only while there is other work in the event list
+        if self.events:
+            self._next_sample = time + self.utilization_interval
+            self._push(self._next_sample, SAMPLE)
+        else:
+            self._next_sample = None
+
+    def utilization(self, name: str) -> float:
+        """Average CPU utilization of a device over the simulated run"""
+        queue = self.queues[name]
+        queue.accumulate(self.clock)
+        return queue.busy_core_time / (queue.cpu_slots * self.clock) if self.clock > 0 else 0.0
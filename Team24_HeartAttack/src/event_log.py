@@ -0,0 +1,171 @@
+import atexit
+import contextlib
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+LOGGER_NAME = 'heartattack'
+URGENT_LOGGER_NAME = f"{LOGGER_NAME}.urgent"
+LOG_FORMATS = ('text', 'json')
+
+TASK_TEMPLATE = ("Time {timestamp:6.1f}: {task_type:8} task for {patient_id} "
+                 "(HR={heart_rate}, BP={blood_pressure}, Glucose={glucose_level}) "
+                 "-> k={k_value:.2f}, m={m_value:.1f} -> {target_device} in {processing_time:.3f}s")
+
+# Silent until configure_logging is called, e.g. when the system is used as a library
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+_listener = None
+
+
+class TextFormatter(logging.Formatter):
+    """Plain console lines; task events use the scheduling-decision template"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = getattr(record, 'event', None)
+        if event is None:
+            return super().format(record)
+        line = TASK_TEMPLATE.format(**event)
+        return f"[URGENT] {line}" if record.levelno >= logging.WARNING else line
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line with the record's level, logger and fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {'time': record.created, 'level': record.levelname, 'logger': record.name}
+        event = getattr(record, 'event', None)
+        if event is None:
+            entry['message'] = record.getMessage()
+        else:
+            entry.update(event)
+        return json.dumps(entry)
+
+
+def configure_logging(level: str = 'INFO', fmt: str = 'text', async_output: bool = True, stream=None):
+    """Route the system's log records to `stream` (stdout by default).
+
+    With `async_output` records are queued and written by a background
+    thread, so a slow terminal never blocks scoring. Urgent task events
+    bypass the queue and are written immediately, so they can appear ahead
+    of queued lines. Calling it again replaces the previous configuration.
+    """
+    global _listener
+    if fmt not in LOG_FORMATS:
+        raise ValueError(f"fmt must be one of {LOG_FORMATS}, got {fmt!r}")
+    shutdown_logging()
+    stream = stream or sys.stdout
+    formatter = JsonLinesFormatter() if fmt == 'json' else TextFormatter()
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    logger.propagate = False
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(formatter)
+    if async_output:
+        records = queue.SimpleQueue()  # Unbounded, so putting a record never waits
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, handler)
+        _listener.start()
+    else:
+        logger.addHandler(handler)
+
+    # Urgent events are always emitted, whatever the configured level
+    urgent_handler = logging.StreamHandler(stream)
+    urgent_handler.setFormatter(formatter)
+    urgent_logger = logging.getLogger(URGENT_LOGGER_NAME)
+    urgent_logger.setLevel(logging.WARNING)
+    urgent_logger.propagate = False
+    urgent_logger.addHandler(urgent_handler)
+
+
+def flush_logging():
+    """Wait until every queued record has been written, e.g. before printing a report"""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+@contextlib.contextmanager
+def logging_paused():
+    """Flush and stop the background writer for the duration of the block, e.g. while forking workers.
+
+    A child forked while the writer thread holds a lock would inherit the
+    lock with no thread to release it. Records logged meanwhile stay
+    queued and are written once the writer restarts.
+    """
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+    try:
+        yield
+    finally:
+        if listener is not None:
+            listener.start()
+            _listener = listener
+
+
+def shutdown_logging():
+    """Flush queued records, stop the background writer and remove the handlers"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for name in (LOGGER_NAME, URGENT_LOGGER_NAME):
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            if not isinstance(handler, logging.NullHandler):
+                logger.removeHandler(handler)
+                handler.flush()
+
+
+atexit.register(shutdown_logging)
+
+
+class TaskEventLogger:
+    """Scheduling-decision events for each task.
+
+    Tasks with k > urgent_threshold are logged at WARNING on the urgent
+    logger, synchronously. Other tasks are logged at INFO, one in every
+    `sample_every`; when INFO is disabled they cost a single level check.
+    """
+
+    def __init__(self, urgent_threshold: float = 1.5, sample_every: int = 1):
+        self.urgent_threshold = urgent_threshold
+        self.sample_every = max(1, sample_every)
+        self.logger = logging.getLogger(f"{LOGGER_NAME}.tasks")
+        self.urgent_logger = logging.getLogger(URGENT_LOGGER_NAME)
+        self.non_urgent = 0
+
+    def log(self, task, task_metrics: dict):
+        if task.k_value > self.urgent_threshold:
+            if self.urgent_logger.isEnabledFor(logging.WARNING):
+                self.urgent_logger.warning('task', extra={'event': self._event(task, task_metrics)})
+            return
+
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.non_urgent += 1
+        if self.non_urgent % self.sample_every:
+            return
+        self.logger.info('task', extra={'event': self._event(task, task_metrics)})
+
+    @staticmethod
+    def _event(task, task_metrics: dict) -> dict:
+        return {
+            'timestamp': task.timestamp,
+            'task_type': task.task_type,
+            'patient_id': task.patient_id,
+            'edge_device': task.edge_device_id,
+            'heart_rate': task.heart_rate,
+            'blood_pressure': task.blood_pressure,
+            'glucose_level': task.glucose_level,
+            'readings': task.readings,
+            'k_value': task.k_value,
+            'm_value': task.m_value,
+            'target_device': task_metrics['target_device'].upper(),
+            'processing_time': task_metrics['processing_time']
+        }
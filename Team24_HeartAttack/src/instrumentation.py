@@ -0,0 +1,211 @@
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+
+try:
+    import pyinstrument
+except ImportError:  # Only the cProfile hook is available
+    pyinstrument = None
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+# Shared no-op context for disabled stages, so a disabled timer allocates nothing
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class _Stage:
+    """Context manager that times one pass through a pipeline stage"""
+
+    __slots__ = ('instrumentation', 'name', 'items', 'start')
+
+    def __init__(self, instrumentation, name: str, items: int):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(self.name, time.perf_counter() - self.start, self.items)
+
+
+class Instrumentation:
+    """Opt-in timers and counters around the pipeline stages.
+
+    `with instrumentation.stage('name', items):` adds the elapsed time, one
+    call and `items` processed items to the stage; `count(name, n)` bumps a
+    plain counter. When disabled both return immediately, so the hooks can
+    stay in the hot path. Stages can be printed as a breakdown or exported
+    as JSON or Prometheus text.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stages = {}    # name -> [calls, items, total seconds, max seconds]
+        self.counters = {}  # name -> count
+        # Edge devices record from worker threads in the real-time runtime
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be pickled; shards send their instance back to the parent
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def stage(self, name: str, items: int = 1):
+        """Context manager timing one pass through a stage"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, items)
+
+    def record(self, name: str, seconds: float, items: int = 1):
+        """Add one timed pass through a stage"""
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                self.stages[name] = [1, items, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += items
+                stats[2] += seconds
+                stats[3] = max(stats[3], seconds)
+
+    def count(self, name: str, n: int = 1):
+        """Bump a plain counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed_iter(self, name: str, iterable):
+        """Yield from `iterable`, timing each step as the stage `name` (e.g. CSV parsing)"""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, time.perf_counter() - start, len(item) if hasattr(item, '__len__') else 1)
+            yield item
+
+    def merge(self, other: 'Instrumentation'):
+        """Add another instance's stages and counters, e.g. from a shard"""
+        for name, (calls, items, total, longest) in other.stages.items():
+            stats = self.stages.setdefault(name, [0, 0, 0.0, 0.0])
+            stats[0] += calls
+            stats[1] += items
+            stats[2] += total
+            stats[3] = max(stats[3], longest)
+        for name, count in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + count
+
+    def snapshot(self) -> dict:
+        """Per-stage totals and counters as plain values"""
+        return {
+            'stages': {
+                name: {
+                    'calls': calls,
+                    'items': items,
+                    'total_s': total,
+                    'mean_us': total / calls * 1e6 if calls else 0.0,
+                    'max_us': longest * 1e6
+                }
+                for name, (calls, items, total, longest) in self.stages.items()
+            },
+            'counters': dict(self.counters)
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = 'heartattack') -> str:
+        """Stages and counters in the Prometheus text exposition format"""
+        lines = []
+        metrics = (
+            ('stage_seconds_total', 'counter', 'Time spent in each pipeline stage', 2),
+            ('stage_calls_total', 'counter', 'Passes through each pipeline stage', 0),
+            ('stage_items_total', 'counter', 'Items processed by each pipeline stage', 1),
+            ('stage_max_seconds', 'gauge', 'Longest single pass through each pipeline stage', 3)
+        )
+        for metric, kind, description, index in metrics:
+            lines.append(f"# HELP {prefix}_{metric} {description}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, stats in self.stages.items():
+                lines.append(f'{prefix}_{metric}{{stage="{name}"}} {stats[index]}')
+        for name, count in self.counters.items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str, fmt: str = 'json'):
+        """Write the snapshot to `path` as 'json' or 'prometheus'"""
+        with open(path, 'w') as f:
+            f.write(self.to_prometheus() if fmt == 'prometheus' else self.to_json())
+
+    def report(self) -> str:
+        """Per-stage breakdown, largest share of time first"""
+        total = sum(stats[2] for stats in self.stages.values())
+        lines = [f"  {'stage':16} {'calls':>9} {'items':>10} {'total s':>9} {'share':>7} {'mean us':>10} {'max us':>10}"]
+        for name, (calls, items, seconds, longest) in sorted(self.stages.items(), key=lambda entry: -entry[1][2]):
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"  {name:16} {calls:>9} {items:>10} {seconds:>9.3f} {share:>6.1f}% "
+                         f"{seconds / calls * 1e6:>10.1f} {longest * 1e6:>10.1f}")
+        for name, count in self.counters.items():
+            lines.append(f"  {name}: {count}")
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def profile(profiler: str = None, output: str = None):
+    """Profile the enclosed block with cProfile or pyinstrument; a no-op when `profiler` is None.
+
+    With `output` the cProfile stats (.prof) or pyinstrument HTML report is
+    written there, otherwise a summary is printed.
+    """
+    if profiler is None:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"profiler must be one of {PROFILERS}, got {profiler!r}")
+    if profiler == 'pyinstrument' and pyinstrument is None:
+        raise ImportError("pyinstrument is not installed; use profiler='cprofile' or pip install pyinstrument")
+
+    if profiler == 'cprofile':
+        profiler_instance = cProfile.Profile()
+        profiler_instance.enable()
+        try:
+            yield
+        finally:
+            profiler_instance.disable()
+            if output:
+                profiler_instance.dump_stats(output)
+            else:
+                stream = io.StringIO()
+                pstats.Stats(profiler_instance, stream=stream).sort_stats('cumulative').print_stats(25)
+                print(stream.getvalue())
+    else:
+        profiler_instance = pyinstrument.Profiler()
+        profiler_instance.start()
+        try:
+            yield
+        finally:
+            profiler_instance.stop()
+            if output:
+                with open(output, 'w') as f:
+                    f.write(profiler_instance.output_html())
+            else:
+                print(profiler_instance.output_text())
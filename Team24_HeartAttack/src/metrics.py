@@ -0,0 +1,324 @@
+import collections
+import math
+
+import numpy as np
+
+# Queueing delay is reported per urgency class: (label, upper bound on k)
+URGENCY_CLASSES = (('k <= 1.0', 1.0), ('1.0 < k <= 1.5', 1.5), ('k > 1.5', float('inf')))
+
+
+class LatencyHistogram:
+    """HDR-style histogram of latencies with logarithmic buckets.
+
+    Values between `lowest` and `highest` seconds land in buckets of fixed
+    relative width, so a quantile is within `precision` of the true value.
+    Values outside the range are clamped to the first or last bucket.
+    Recording costs O(1), a quantile costs O(buckets) (a constant), and
+    histograms with the same parameters merge by adding counts.
+    """
+
+    def __init__(self, lowest: float = 1e-6, highest: float = 1e4, precision: float = 0.01):
+        self.lowest = lowest
+        self.highest = highest
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.counts = np.zeros(int(math.log(highest / lowest) / self._log_base) + 2, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def _bucket(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        return min(int(math.log(value / self.lowest) / self._log_base) + 1, len(self.counts) - 1)
+
+    def record(self, value: float):
+        self.counts[self._bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def record_many(self, values):
+        """Record an array of values at once"""
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return
+        buckets = np.zeros(len(values), dtype=np.int64)
+        above = values > self.lowest
+        buckets[above] = np.minimum(
+            (np.log(values[above] / self.lowest) / self._log_base).astype(np.int64) + 1, len(self.counts) - 1
+        )
+        np.add.at(self.counts, buckets, 1)
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0 <= q <= 1), clamped to the observed min and max"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        bucket = int(np.searchsorted(np.cumsum(self.counts), rank))
+        # Upper edge of the bucket, so estimates err on the pessimistic side
+        value = self.lowest * (1 + self.precision) ** bucket
+        return min(max(value, self.min), self.max)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Add another histogram with the same range and precision into this one"""
+        if len(other.counts) != len(self.counts) or other.lowest != self.lowest:
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+
+class WindowedRate:
+    """Events per second over a sliding window of time, kept in fixed-width buckets"""
+
+    def __init__(self, window: float = 60.0, resolution: float = 1.0):
+        self.window = window
+        self.resolution = resolution
+        self.buckets = collections.deque()  # (bucket index, count), oldest first
+        self.in_window = 0
+        self.total = 0
+        self.first = None  # Time of the first event, for runs shorter than the window
+
+    def _expire(self, now: float):
+        oldest = math.floor((now - self.window) / self.resolution)
+        while self.buckets and self.buckets[0][0] <= oldest:
+            self.in_window -= self.buckets.popleft()[1]
+
+    def record(self, now: float, count: int = 1):
+        bucket = math.floor(now / self.resolution)
+        if self.first is None:
+            self.first = now
+        if self.buckets and self.buckets[-1][0] == bucket:
+            self.buckets[-1] = (bucket, self.buckets[-1][1] + count)
+        elif self.buckets and self.buckets[-1][0] > bucket:
+            # Completions are recorded in time order; a late event joins the newest bucket
+            self.buckets[-1] = (self.buckets[-1][0], self.buckets[-1][1] + count)
+        else:
+            self.buckets.append((bucket, count))
+        self.in_window += count
+        self.total += count
+        self._expire(now)
+
+    def rate(self, now: float = None) -> float:
+        """Events per second over the window ending at `now` (default: the newest event)"""
+        if self.first is None:
+            return 0.0
+        if now is None:
+            now = (self.buckets[-1][0] + 1) * self.resolution if self.buckets else self.first
+        self._expire(now)
+        span = min(self.window, max(now - self.first, self.resolution))
+        return self.in_window / span
+
+
+class MetricsAggregator:
+    """Running task statistics, updated as each task completes.
+
+    Counts, sums and latency histograms are kept per scheduling location,
+    urgency class, task type and edge device, so reports read them in O(1)
+    rather than passing over the task records. Records with a 'deadline'
+    also feed deadline misses, slack and lateness histograms; rejected
+    tasks are counted with record_rejected(). Aggregators from separate
+    shards combine with merge().
+    """
+
+    def __init__(self, rate_window: float = 60.0, rate_resolution: float = 1.0):
+        self.rate_window = rate_window
+        self.rate_resolution = rate_resolution
+        self.tasks = 0
+        self.urgent_tasks = 0
+        self.latency = LatencyHistogram()
+        self.location_latency = collections.defaultdict(LatencyHistogram)
+        self.processing_time = collections.Counter()  # location -> total seconds
+        self.queueing_delay = collections.Counter()   # location -> total seconds
+        self.urgency_tasks = collections.Counter()
+        self.urgency_queueing = collections.Counter()
+        self.urgency_max_queueing = {}
+        self.task_types = collections.Counter()
+        self.edge_tasks = collections.Counter()
+        self.edge_rates = {}
+        self.last_completion = 0.0
+        self.first_arrival = float('inf')
+        self.last_arrival = 0.0
+        # Deadlines: slack of tasks finished in time, lateness of the others
+        self.deadline_tasks = 0
+        self.deadline_misses = 0
+        self.urgency_misses = collections.Counter()
+        self.urgency_rejected = collections.Counter()
+        self.slack = LatencyHistogram()
+        self.lateness = LatencyHistogram()
+        self.offloaded = 0
+        self.rejected = 0
+
+    def _arrival(self, timestamp: float):
+        self.first_arrival = min(self.first_arrival, timestamp)
+        self.last_arrival = max(self.last_arrival, timestamp)
+
+    def record(self, record: dict):
+        """Add one completed task record"""
+        location = record['scheduled_location']
+        latency = record['latency']
+        queueing_delay = record['queueing_delay']
+        k_value = record['k_value']
+
+        self.tasks += 1
+        if k_value > 1.0:
+            self.urgent_tasks += 1
+        self.latency.record(latency)
+        self.location_latency[location].record(latency)
+        self.processing_time[location] += record['processing_time']
+        self.queueing_delay[location] += queueing_delay
+
+        urgency = next(label for label, bound in URGENCY_CLASSES if k_value <= bound)
+        self.urgency_tasks[urgency] += 1
+        self.urgency_queueing[urgency] += queueing_delay
+        self.urgency_max_queueing[urgency] = max(self.urgency_max_queueing.get(urgency, 0.0), queueing_delay)
+
+        self.task_types[record['task_type']] += 1
+        edge_device = record['edge_device']
+        self.edge_tasks[edge_device] += 1
+        completion = record['timestamp'] + latency
+        self.last_completion = max(self.last_completion, completion)
+        if edge_device not in self.edge_rates:
+            self.edge_rates[edge_device] = WindowedRate(self.rate_window, self.rate_resolution)
+        self.edge_rates[edge_device].record(completion)
+
+        self._arrival(record['timestamp'])
+        if record.get('admission') == 'offloaded':
+            self.offloaded += 1
+        deadline = record.get('deadline')
+        if deadline is not None:
+            self.deadline_tasks += 1
+            slack = deadline - completion
+            if slack >= 0:
+                self.slack.record(slack)
+            else:
+                self.deadline_misses += 1
+                self.urgency_misses[urgency] += 1
+                self.lateness.record(-slack)
+
+    def record_rejected(self, record: dict):
+        """Count a task that admission control turned away"""
+        self.rejected += 1
+        self.urgency_rejected[next(label for label, bound in URGENCY_CLASSES if record['k_value'] <= bound)] += 1
+        self._arrival(record['timestamp'])
+
+    def merge(self, other: 'MetricsAggregator'):
+        """Fold another aggregator (e.g. from another shard) into this one"""
+        self.tasks += other.tasks
+        self.urgent_tasks += other.urgent_tasks
+        self.latency.merge(other.latency)
+        for location, histogram in other.location_latency.items():
+            self.location_latency[location].merge(histogram)
+        self.processing_time.update(other.processing_time)
+        self.queueing_delay.update(other.queueing_delay)
+        self.urgency_tasks.update(other.urgency_tasks)
+        self.urgency_queueing.update(other.urgency_queueing)
+        for urgency, delay in other.urgency_max_queueing.items():
+            self.urgency_max_queueing[urgency] = max(self.urgency_max_queueing.get(urgency, 0.0), delay)
+        self.task_types.update(other.task_types)
+        self.edge_tasks.update(other.edge_tasks)
+        # Shards own disjoint edge devices, so their rate windows don't overlap
+        self.edge_rates.update(other.edge_rates)
+        self.last_completion = max(self.last_completion, other.last_completion)
+        self.first_arrival = min(self.first_arrival, other.first_arrival)
+        self.last_arrival = max(self.last_arrival, other.last_arrival)
+        self.deadline_tasks += other.deadline_tasks
+        self.deadline_misses += other.deadline_misses
+        self.urgency_misses.update(other.urgency_misses)
+        self.urgency_rejected.update(other.urgency_rejected)
+        self.slack.merge(other.slack)
+        self.lateness.merge(other.lateness)
+        self.offloaded += other.offloaded
+        self.rejected += other.rejected
+
+    def deadline_snapshot(self) -> dict:
+        """Deadline misses, rejections, slack and lateness, overall and per urgency class"""
+        offered = self.deadline_tasks + self.rejected
+        urgency = {}
+        for label, _ in URGENCY_CLASSES:
+            tasks = self.urgency_tasks[label] + self.urgency_rejected[label]
+            if tasks:
+                urgency[label] = {
+                    'tasks': tasks,
+                    'misses': self.urgency_misses[label],
+                    'rejected': self.urgency_rejected[label],
+                    'miss_rate': (self.urgency_misses[label] + self.urgency_rejected[label]) / tasks
+                }
+        return {
+            'tasks': self.deadline_tasks,
+            'misses': self.deadline_misses,
+            'rejected': self.rejected,
+            'offloaded': self.offloaded,
+            # Completed late or rejected, out of every task that had a deadline
+            'miss_rate': (self.deadline_misses + self.rejected) / offered if offered else 0.0,
+            'slack_p5': self.slack.quantile(0.05),
+            'slack_p50': self.slack.quantile(0.50),
+            'slack_p95': self.slack.quantile(0.95),
+            'lateness_p50': self.lateness.quantile(0.50),
+            'lateness_p99': self.lateness.quantile(0.99),
+            'lateness_max': self.lateness.max,
+            'urgency': urgency
+        }
+
+    def throughput(self) -> dict:
+        """Tasks per simulated second: offered (arrivals, including rejected), completed, and completed on time"""
+        arrival_span = self.last_arrival - self.first_arrival
+        span = self.last_completion - self.first_arrival
+        on_time = self.slack.count if self.deadline_tasks else self.tasks
+        return {
+            'offered': (self.tasks + self.rejected) / arrival_span if arrival_span > 0 else 0.0,
+            'completed': self.tasks / span if span > 0 else 0.0,
+            'on_time': on_time / span if span > 0 else 0.0
+        }
+
+    def snapshot(self) -> dict:
+        """Current statistics as a plain dict"""
+        locations = {
+            location: {
+                'tasks': histogram.count,
+                'avg_processing_time': self.processing_time[location] / histogram.count,
+                'avg_queueing_delay': self.queueing_delay[location] / histogram.count,
+                'latency_p50': histogram.quantile(0.50),
+                'latency_p99': histogram.quantile(0.99)
+            }
+            for location, histogram in self.location_latency.items()
+        }
+        urgency = {
+            label: {
+                'tasks': self.urgency_tasks[label],
+                'avg_queueing_delay': self.urgency_queueing[label] / self.urgency_tasks[label],
+                'max_queueing_delay': self.urgency_max_queueing[label]
+            }
+            for label, _ in URGENCY_CLASSES if self.urgency_tasks[label]
+        }
+        return {
+            'tasks': self.tasks,
+            'urgent_tasks': self.urgent_tasks,
+            'latency_mean': self.latency.mean(),
+            'latency_p50': self.latency.quantile(0.50),
+            'latency_p95': self.latency.quantile(0.95),
+            'latency_p99': self.latency.quantile(0.99),
+            'latency_max': self.latency.max,
+            'locations': locations,
+            'urgency': urgency,
+            'task_types': dict(self.task_types),
+            'edge_tasks': dict(sorted(self.edge_tasks.items())),
+            'edge_rates': {
+                edge_device: rate.rate(self.last_completion)
+                for edge_device, rate in sorted(self.edge_rates.items())
+            },
+            'deadlines': self.deadline_snapshot(),
+            'throughput': self.throughput()
+        }
@@ -0,0 +1,276 @@
+import copy
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from src.edge_model import distill_priority_model
+
+logger = logging.getLogger('heartattack.retrain')
+
+EXECUTORS = ('thread', 'process')
+
+
+def grow_forest(model, X: np.ndarray, y: np.ndarray, trees: int, max_estimators: int, n_jobs: int):
+    """Copy of a fitted forest with `trees` new trees fitted on (X, y).
+
+    The copy keeps its most recent trees up to max_estimators, so the
+    forest slides towards the readings the system sees instead of growing
+    without bound. The new trees are fitted across n_jobs cores; the
+    returned model predicts single-threaded.
+    """
+    model = copy.deepcopy(model)
+    keep = max(max_estimators - trees, 0)
+    model.estimators_ = model.estimators_[-keep:] if keep else []
+    model.n_estimators = len(model.estimators_) + trees
+    model.warm_start = True
+    model.n_jobs = n_jobs
+    model.fit(X, y)
+    model.n_jobs = None  # Joblib dispatch would dominate the latency of one-reading predictions
+    return model
+
+
+def retrain_models(model_k, model_m, X: np.ndarray, y_k: np.ndarray, y_m: np.ndarray, trees: int,
+                   max_estimators: int, n_jobs: int, edge_params: dict = None) -> dict:
+    """Grow both forests on the accumulated readings and distill a new edge model from them.
+
+    Runs on the retrainer's worker thread or process. `edge_params` holds
+    distill_priority_model keyword arguments, or None when the forests
+    score specific tasks directly.
+    """
+    start = time.perf_counter()
+    model_k = grow_forest(model_k, X, y_k, trees, max_estimators, n_jobs)
+    model_m = grow_forest(model_m, X, y_m, trees, max_estimators, n_jobs)
+    trained = time.perf_counter()
+
+    edge_model = None
+    if edge_params is not None:
+        edge_model = distill_priority_model(model_k, model_m, X, **edge_params)
+    return {
+        'model_k': model_k,
+        'model_m': model_m,
+        'edge_model': edge_model,
+        'train_s': trained - start,
+        'distill_s': time.perf_counter() - trained
+    }
+
+
+class ModelRetrainer:
+    """Background retraining of the specific-patient models on the readings the system scores.
+
+    observe() keeps the latest `buffer_size` specific-patient readings
+    in a ring buffer, labelled with the same urgency formula as the
+    offline training data, and tracks the mean gap between the served k
+    and that label over the last `drift_window` readings. Once
+    `min_samples` readings are buffered, a retrain starts when the gap
+    exceeds `drift_threshold` or `interval` seconds have passed since the
+    last one. It runs on a worker thread or process and the result is
+    swapped into the calculator in one step, while scoring carries on.
+    Only one retrain runs at a time.
+    """
+
+    def __init__(self, calculator, buffer_size: int = 50000, min_samples: int = 2000, interval: float = None,
+                 drift_threshold: float = 0.1, drift_window: int = 2000, trees_per_retrain: int = 20,
+                 max_estimators: int = 200, n_jobs: int = -1, executor: str = 'thread'):
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
+        self.calculator = calculator
+        self.min_samples = min_samples
+        self.interval = interval
+        self.drift_threshold = drift_threshold
+        self.trees_per_retrain = trees_per_retrain
+        self.max_estimators = max_estimators
+        self.n_jobs = n_jobs
+        self.executor = executor
+
+        self.features = np.empty((buffer_size, 7))
+        self.k_labels = np.empty(buffer_size)
+        self.m_labels = np.empty(buffer_size)
+        self.filled = 0
+        self.position = 0    # Next slot to overwrite
+        self.drift_errors = np.zeros(drift_window)
+        self.drift_filled = 0
+        self.drift_position = 0
+        self.observed = 0
+
+        self.last_retrain = time.monotonic()
+        self.history = []    # One dict per completed retrain
+        self.failures = 0
+        self._pool = None
+        self._published = None  # Event set once the running retrain has been swapped in or failed
+        # observe() may be called from the real-time runtime's edge device threads
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Shard workers fork with the calculator; the pool and lock stay with the parent
+        state = self.__dict__.copy()
+        state.update(_pool=None, _published=None)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def observe(self, features: np.ndarray, k_values: np.ndarray):
+        """Buffer scored specific-patient readings; start a retrain if one is due"""
+        features = np.asarray(features, dtype=float).reshape(-1, self.features.shape[1])
+        if not len(features):
+            return
+        k_labels, m_labels = self.calculator.calculate_general_priority_batch(
+            features[:, 0], features[:, 1], features[:, 2]
+        )
+        errors = np.abs(np.asarray(k_values, dtype=float) - k_labels)
+
+        with self._lock:
+            self.observed += len(features)
+            self._append(features, k_labels, m_labels)
+            self._append_errors(errors)
+            trigger = self._due()
+            snapshot = self._claim(trigger) if trigger is not None else None
+        if snapshot is not None:
+            self._submit(*snapshot)
+
+    def _append(self, features: np.ndarray, k_labels: np.ndarray, m_labels: np.ndarray):
+        size = len(self.k_labels)
+        if len(features) >= size:
+            features, k_labels, m_labels = features[-size:], k_labels[-size:], m_labels[-size:]
+        slots = (self.position + np.arange(len(features))) % size
+        self.features[slots] = features
+        self.k_labels[slots] = k_labels
+        self.m_labels[slots] = m_labels
+        self.position = (self.position + len(features)) % size
+        self.filled = min(self.filled + len(features), size)
+
+    def _append_errors(self, errors: np.ndarray):
+        size = len(self.drift_errors)
+        errors = errors[-size:]
+        slots = (self.drift_position + np.arange(len(errors))) % size
+        self.drift_errors[slots] = errors
+        self.drift_position = (self.drift_position + len(errors)) % size
+        self.drift_filled = min(self.drift_filled + len(errors), size)
+
+    def drift(self) -> float:
+        """Mean |served k - formula k| over the drift window"""
+        return float(self.drift_errors[:self.drift_filled].mean()) if self.drift_filled else 0.0
+
+    def running(self) -> bool:
+        """Whether a retrain is in progress"""
+        return self._published is not None and not self._published.is_set()
+
+    def _due(self):
+        """Reason to retrain now, or None"""
+        if self.filled < self.min_samples or self.running():
+            return None
+        if self.drift_filled == len(self.drift_errors) and self.drift() > self.drift_threshold:
+            return 'drift'
+        if self.interval is not None and time.monotonic() - self.last_retrain >= self.interval:
+            return 'schedule'
+        return None
+
+    def retrain_now(self, wait: bool = False) -> bool:
+        """Start a retrain on the buffered readings; False if too few or one is already running"""
+        with self._lock:
+            if self.filled < self.min_samples or self.running():
+                return False
+            snapshot = self._claim('manual')
+        self._submit(*snapshot)
+        if wait:
+            self.wait()
+        return True
+
+    def _claim(self, trigger: str) -> tuple:
+        """Mark a retrain as running and snapshot the buffer; called under the lock"""
+        samples = self.filled
+        self.last_retrain = time.monotonic()
+        self._published = threading.Event()
+        return (trigger, self._published, samples, self.drift(), self.features[:samples].copy(),
+                self.k_labels[:samples].copy(), self.m_labels[:samples].copy())
+
+    def _submit(self, trigger: str, published: threading.Event, samples: int, drift: float,
+                features: np.ndarray, k_labels: np.ndarray, m_labels: np.ndarray):
+        """Hand a buffer snapshot and the live forests to the worker.
+
+        Runs outside the lock: reading ml_models may load or train the
+        forests, and other scoring threads must not wait on that.
+        """
+        calculator = self.calculator
+        submitted = time.perf_counter()
+        try:
+            # Already loaded unless specific tasks have only used an edge model read from disk
+            model_k, model_m = calculator.ml_models
+            edge_params = calculator.edge_distill_params() if calculator.use_edge_model else None
+            if self._pool is None:
+                if self.executor == 'process':
+                    context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+                    self._pool = ProcessPoolExecutor(max_workers=1, mp_context=context)
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='retrain')
+            future = self._pool.submit(retrain_models, model_k, model_m, features, k_labels, m_labels,
+                                       self.trees_per_retrain, self.max_estimators, self.n_jobs, edge_params)
+        except Exception as e:
+            self.failures += 1
+            logger.error("Retraining could not start: %s", e)
+            published.set()
+            return
+        future.add_done_callback(
+            lambda future: self._publish(future, published, trigger, samples, drift, submitted)
+        )
+
+    def _publish(self, future, published: threading.Event, trigger: str, samples: int, drift: float,
+                 submitted: float):
+        """Swap a finished retrain into the calculator; runs off the scoring path"""
+        try:
+            self._swap_in(future.result(), trigger, samples, drift, submitted)
+        except Exception as e:
+            self.failures += 1
+            logger.error("Retraining failed: %s", e)
+        finally:
+            published.set()
+
+    def _swap_in(self, result: dict, trigger: str, samples: int, drift: float, submitted: float):
+        version, swap_s = self.calculator.swap_models(result['model_k'], result['model_m'], result['edge_model'])
+        with self._lock:
+            # Gaps measured against the previous models would re-trigger straight away
+            self.drift_filled = 0
+        entry = {
+            'version': version,
+            'trigger': trigger,
+            'samples': samples,
+            'drift': drift,
+            'train_s': result['train_s'],
+            'distill_s': result['distill_s'],
+            'wall_s': time.perf_counter() - submitted,
+            'swap_us': swap_s * 1e6,
+            'edge_model': self.calculator.use_edge_model
+        }
+        self.history.append(entry)
+        logger.info("Models v%d retrained on %d readings (%s, drift %.3f): train %.2fs, distill %.2fs, "
+                    "swap stall %.1fus", version, samples, trigger, drift, entry['train_s'],
+                    entry['distill_s'], entry['swap_us'])
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the running retrain, if any, has been swapped in; False on timeout"""
+        published = self._published
+        return published is None or published.wait(timeout)
+
+    def close(self):
+        """Wait for the running retrain and stop the worker"""
+        self.wait()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def stats(self) -> dict:
+        """Buffer state and the timings of every retrain so far"""
+        return {
+            'observed': self.observed,
+            'buffered': self.filled,
+            'drift': self.drift(),
+            'retrains': len(self.history),
+            'failures': self.failures,
+            'history': list(self.history)
+        }
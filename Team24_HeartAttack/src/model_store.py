@@ -0,0 +1,102 @@
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger('heartattack.model_store')
+
+
+class ModelStore:
+    """Versioned on-disk store for the trained k/m priority models"""
+    
+    def __init__(self, model_dir: str, artifact_version: int = 1):
+        self.model_dir = model_dir
+        self.artifact_version = artifact_version
+    
+    def artifact_key(self, training_data_path: str, params: dict) -> str:
+        """Hash of the training data contents, hyperparameters and artifact version"""
+        digest = hashlib.sha256()
+        with open(training_data_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        digest.update(str(self.artifact_version).encode())
+        return digest.hexdigest()
+    
+    def artifact_path(self, key: str) -> str:
+        """Location of the artifact for a given key"""
+        return os.path.join(self.model_dir, f"priority_models_{key[:16]}.joblib")
+    
+    def load(self, key: str, mmap_mode: str = None):
+        """Load (model_k, model_m) for a key, or None if missing or stale.
+        
+        With mmap_mode='r' the artifact's arrays are memory-mapped read-only
+        instead of copied into each process.
+        """
+        import joblib  # Only needed once a specific-patient model is loaded
+        
+        path = self.artifact_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            artifact = joblib.load(path, mmap_mode=mmap_mode)
+        except Exception as e:
+            logger.error("Error loading model artifact %s: %s", path, e)
+            return None
+        
+        if artifact.get('version') != self.artifact_version or artifact.get('key') != key:
+            return None
+        return artifact['model_k'], artifact['model_m']
+    
+    def save(self, key: str, model_k, model_m) -> str:
+        """Write the models atomically so a concurrent reader never sees a partial file"""
+        import joblib
+        
+        os.makedirs(self.model_dir, exist_ok=True)
+        path = self.artifact_path(key)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        artifact = {
+            'version': self.artifact_version,
+            'key': key,
+            'model_k': model_k,
+            'model_m': model_m
+        }
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+    
+    def edge_model_path(self, key: str) -> str:
+        """Location of the compiled edge model for a given key"""
+        return os.path.join(self.model_dir, f"edge_model_{key[:16]}.npz")
+    
+    def load_arrays(self, key: str):
+        """Load the compiled edge model arrays for a key, or None if missing or stale.
+        
+        The file is a plain .npz archive, so edge nodes can read it with
+        NumPy alone.
+        """
+        path = self.edge_model_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as archive:
+                arrays = {name: archive[name] for name in archive.files}
+        except Exception as e:
+            logger.error("Error loading edge model %s: %s", path, e)
+            return None
+        
+        if int(arrays.pop('version', -1)) != self.artifact_version or str(arrays.pop('key', '')) != key:
+            return None
+        return arrays
+    
+    def save_arrays(self, key: str, arrays: dict) -> str:
+        """Write compiled edge model arrays atomically"""
+        os.makedirs(self.model_dir, exist_ok=True)
+        path = self.edge_model_path(key)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, version=np.array(self.artifact_version), key=np.array(key), **arrays)
+        os.replace(tmp_path, path)
+        return path
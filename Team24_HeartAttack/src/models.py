@@ -1,7 +1,15 @@
 from dataclasses import dataclass
-import pandas as pd
+import csv
+import logging
+from typing import TYPE_CHECKING
 
-@dataclass
+# Callers of load_patients_from_frame bring pandas; nothing here imports it, so start-up stays light
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger('heartattack.models')
+
+@dataclass(slots=True)
 class Patient:
     patient_id: str
     type: str  # 'general' or 'specific'
@@ -21,38 +29,75 @@ class HealthTask:
     m_value: float = 0.0
     timestamp: float = 0.0
     edge_device_id: int = 0
+    readings: int = 1  # Sensor readings the task stands for (>1 for edge-side summaries)
 
 class PatientDatabase:
     def __init__(self):
+        # Index keyed by (edge_device_id, patient_id) for O(1) lookup
         self.patients = {}
     
     def load_patients_from_csv(self, csv_file_path: str, edge_device_id: int):
         """Load patients from CSV file for a specific edge device"""
         try:
-            df = pd.read_csv(csv_file_path)
-            patients = []
-            for _, row in df.iterrows():
-                patient = Patient(
-                    patient_id=row['patient_id'],
-                    type=row['type'],
-                    age=row['age'],
-                    height=row['height'],
-                    weight=row['weight'],
-                    gender=row['gender']
-                )
-                patients.append(patient)
-            
-            self.patients[edge_device_id] = patients
-            print(f"Loaded {len(patients)} patients for edge device {edge_device_id}")
+            with open(csv_file_path, newline='') as f:
+                rows = [
+                    (row['patient_id'], row['type'], _parse_number(row['age']), _parse_number(row['height']),
+                     _parse_number(row['weight']), row['gender'])
+                    for row in csv.DictReader(f)
+                ]
+            patients = self._replace_patients(rows, edge_device_id)
+            logger.info("Loaded %d patients for edge device %s", len(patients), edge_device_id)
             return patients
         except Exception as e:
-            print(f"Error loading patients from {csv_file_path}: {e}")
+            logger.error("Error loading patients from %s: %s", csv_file_path, e)
             return []
     
+    def load_patients_from_frame(self, df: 'pd.DataFrame', edge_device_id: int) -> list[Patient]:
+        """Replace an edge device's patients with the rows of a DataFrame in the patient CSV schema"""
+        columns = [df[name].tolist() for name in ('patient_id', 'type', 'age', 'height', 'weight', 'gender')]
+        return self._replace_patients(zip(*columns), edge_device_id)
+    
+    def _replace_patients(self, rows, edge_device_id: int) -> list[Patient]:
+        """Replace an edge device's patients with rows of Patient fields"""
+        patients = [Patient(*values) for values in rows]
+        
+        # Reloading an edge device replaces its previous patient set
+        for key in [key for key in self.patients if key[0] == edge_device_id]:
+            del self.patients[key]
+        for patient in patients:
+            self.patients[(edge_device_id, patient.patient_id)] = patient
+        
+        return patients
+    
     def get_patient(self, patient_id: str, edge_device_id: int) -> Patient:
         """Get patient by ID from specific edge device"""
-        if edge_device_id in self.patients:
-            for patient in self.patients[edge_device_id]:
-                if patient.patient_id == patient_id:
-                    return patient
-        return None
\ No newline at end of file
+        return self.patients.get((edge_device_id, patient_id))
+    
+    def get_patients(self, edge_device_id: int) -> list[Patient]:
+        """Get all patients registered on a specific edge device"""
+        return [patient for (edge_id, _), patient in self.patients.items() if edge_id == edge_device_id]
+    
+    def add_patient(self, patient: Patient, edge_device_id: int):
+        """Add or replace a single patient without reloading the CSV"""
+        self.patients[(edge_device_id, patient.patient_id)] = patient
+    
+    def update_patient(self, patient_id: str, edge_device_id: int, **fields) -> Patient:
+        """Update fields of an existing patient, returning None if it doesn't exist"""
+        patient = self.get_patient(patient_id, edge_device_id)
+        if patient is None:
+            return None
+        for name, value in fields.items():
+            setattr(patient, name, value)
+        return patient
+    
+    def remove_patient(self, patient_id: str, edge_device_id: int) -> bool:
+        """Remove a patient, returning whether it was present"""
+        return self.patients.pop((edge_device_id, patient_id), None) is not None
+
+
+def _parse_number(text: str):
+    """int or float from a CSV field, as pandas.read_csv would infer it (NaN when empty)"""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text) if text.strip() else float('nan')
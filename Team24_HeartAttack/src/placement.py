@@ -0,0 +1,211 @@
+import random
+
+import numpy as np
+
+from src.event_engine import DiscreteEventEngine
+
+# Admission control for tasks with deadlines: off, move late tasks, or also drop those no device can finish in time
+ADMISSION_MODES = (None, 'offload', 'reject')
+
+
+class PlacementEngine:
+    """Chooses the device for each task.
+    
+    The 'static' policy is the original rule: k > 1.0 runs on the home
+    edge device, everything else in the cloud. The 'load_aware' policy
+    estimates completion time (network transfer + queueing + processing)
+    on each candidate. Urgent tasks may spill to a peer edge device or the
+    cloud. Non-urgent tasks may run on an edge device that has idle cores
+    beyond those reserved for urgent work.
+    
+    With `admission` set, a task whose deadline can't be met on the
+    policy's choice is offloaded to the device expected to finish it
+    first (home edge, peer edges, cloud). In 'reject' mode it is rejected
+    instead when no device can finish it in time.
+    """
+    
+    def __init__(self, scheduler: DiscreteEventEngine, edge_names: dict, cloud_name: str,
+                 processing_time_fn, settings: dict, edge_bandwidth: float, cloud_bandwidth: float,
+                 policy: str = 'load_aware', admission: str = None):
+        if admission not in ADMISSION_MODES:
+            raise ValueError(f"admission must be one of {ADMISSION_MODES}, got {admission!r}")
+        self.scheduler = scheduler
+        self.edge_names = edge_names  # edge_device_id -> device name
+        self.cloud_name = cloud_name
+        self.processing_time_fn = processing_time_fn
+        self.settings = settings
+        self.edge_bandwidth = edge_bandwidth    # Mbps
+        self.cloud_bandwidth = cloud_bandwidth  # Mbps
+        self.policy = policy
+        self.admission = admission
+        self.spilled = 0
+        self.offloaded = 0
+        self.rejected = 0
+    
+    def network_delay(self, home_name: str, target_name: str) -> float:
+        """Uncontended transfer time of one reading from its home edge device to the target"""
+        if target_name == home_name:
+            return 0.0
+        payload_bits = self.settings['task_payload_kb'] * 1024 * 8
+        if target_name == self.cloud_name:
+            bandwidth = min(self.edge_bandwidth, self.cloud_bandwidth)
+            return self.settings['cloud_link_latency'] + payload_bits / (bandwidth * 1e6)
+        return self.settings['edge_link_latency'] + payload_bits / (self.edge_bandwidth * 1e6)
+    
+    def place(self, task, deadline: float = None) -> tuple[str, float, float, str]:
+        """Return (device name, processing time, network delay, admission) for a scored task.
+        
+        `deadline` is the task's absolute deadline. Admission is
+        'admitted', 'offloaded' or 'rejected'; a rejected task has no
+        device (None).
+        """
+        home_name = self.edge_names[task.edge_device_id]
+        processing_times = {
+            'edge': self.processing_time_fn(task, True),
+            'cloud': self.processing_time_fn(task, False)
+        }
+        
+        if self.policy == 'static':
+            target_name = home_name if task.k_value > 1.0 else self.cloud_name
+        else:
+            target_name = self._place_load_aware(task, home_name, processing_times, deadline)
+        
+        admission = 'admitted'
+        if self.admission and deadline is not None:
+            target_name, admission = self._admit(task, target_name, home_name, processing_times, deadline)
+            if target_name is None:
+                return None, 0.0, 0.0, admission
+        
+        location = 'cloud' if target_name == self.cloud_name else 'edge'
+        return target_name, processing_times[location], self.network_delay(home_name, target_name), admission
+    
+    def _admit(self, task, target_name: str, home_name: str, processing_times: dict, deadline: float):
+        """(device, admission) for a task that must complete by `deadline`"""
+        now = task.timestamp
+        self.scheduler.advance(now)
+        budget = deadline - now
+        if self._estimated_completion(target_name, home_name, processing_times, now, deadline) <= budget:
+            return target_name, 'admitted'
+        
+        best_name, best_time = self._earliest_completion(
+            [home_name] + [name for name in self.edge_names.values() if name != home_name] + [self.cloud_name],
+            home_name, processing_times, now, deadline
+        )
+        if best_time > budget and self.admission == 'reject':
+            self.rejected += 1
+            return None, 'rejected'
+        if best_name == target_name:
+            return target_name, 'admitted'
+        self.offloaded += 1
+        return best_name, 'offloaded'
+    
+    def _place_load_aware(self, task, home_name: str, processing_times: dict, deadline: float = None) -> str:
+        """Pick the candidate with the earliest estimated completion"""
+        now = task.timestamp
+        # Bring queue state up to the task's arrival so depth and free cores are current
+        self.scheduler.advance(now)
+        
+        if task.k_value > 1.0:
+            # Urgent: home edge wins ties, then peer edges; the cloud only once every edge has a backlog
+            edge_name, edge_time = self._earliest_completion(
+                [home_name] + [name for name in self.edge_names.values() if name != home_name],
+                home_name, processing_times, now, deadline
+            )
+            best_name = edge_name
+            if self.scheduler.queues[edge_name].free_slots(now) == 0:
+                cloud_name, cloud_time = self._earliest_completion(
+                    [self.cloud_name], home_name, processing_times, now, deadline
+                )
+                if cloud_time < edge_time:
+                    best_name = cloud_name
+            static_target = home_name
+        else:
+            # Non-urgent: an edge device with idle cores beyond the urgent reserve may take it
+            reserved = self.settings['urgent_reserved_slots']
+            candidates = [self.cloud_name] + [
+                name for name in dict.fromkeys([home_name, *self.edge_names.values()])
+                if self.scheduler.queues[name].depth() == 0
+                and self.scheduler.queues[name].free_slots(now) > reserved
+            ]
+            best_name, _ = self._earliest_completion(candidates, home_name, processing_times, now, deadline)
+            static_target = self.cloud_name
+        
+        if best_name != static_target:
+            self.spilled += 1
+        return best_name
+    
+    def _estimated_completion(self, name: str, home_name: str, processing_times: dict, now: float,
+                              deadline: float = None) -> float:
+        """Seconds from `now` until the task would complete on `name`"""
+        location = 'cloud' if name == self.cloud_name else 'edge'
+        return (self.network_delay(home_name, name)
+                + self.scheduler.queues[name].estimated_wait(now, deadline)
+                + processing_times[location])
+    
+    def _earliest_completion(self, candidates: list, home_name: str, processing_times: dict, now: float,
+                             deadline: float = None):
+        """(name, estimated completion) of the candidate that finishes first; earlier entries win ties"""
+        best_name, best_time = None, float('inf')
+        for name in candidates:
+            completion = self._estimated_completion(name, home_name, processing_times, now, deadline)
+            if completion < best_time:
+                best_name, best_time = name, completion
+        return best_name, best_time
+
+
+def replay_placement(tasks: list, engine: DiscreteEventEngine, edge_names: dict, cloud_name: str,
+                     processing_time_fn, settings: dict, edge_bandwidth: float, cloud_bandwidth: float,
+                     policy: str, memory_mb: float = 0, seed: int = 0, deadline_policy=None,
+                     admission: str = None) -> dict:
+    """Replay scored tasks through an empty copy of `engine` under one placement policy.
+    
+    With a DeadlinePolicy, tasks get the same deadlines as in the run and
+    `deadline_miss_rate` is the fraction of tasks completed late or rejected.
+    """
+    completed = []
+    rejected = 0
+    scheduler = engine.empty_copy(on_complete=completed.append)
+    
+    # Same seed for every policy so processing-time jitter is identical
+    rng = random.Random(seed)
+    placement = PlacementEngine(
+        scheduler, edge_names, cloud_name,
+        lambda task, is_edge: processing_time_fn(task, is_edge, rng),
+        settings, edge_bandwidth, cloud_bandwidth, policy, admission if deadline_policy else None
+    )
+    payload_bytes = settings['task_payload_kb'] * 1024
+    
+    for task in sorted(tasks, key=lambda task: task.timestamp):
+        deadline = task.timestamp + deadline_policy.relative(task.k_value, task.m_value) if deadline_policy else None
+        target_name, processing_time, _, _ = placement.place(task, deadline)
+        if target_name is None:
+            rejected += 1
+            continue
+        record = {
+            'k_value': task.k_value,
+            'm_value': task.m_value,
+            'processing_time': processing_time,
+            'memory': memory_mb
+        }
+        if deadline is not None:
+            record['deadline'] = deadline
+        if not scheduler.submit(target_name, record, task.timestamp,
+                                source=edge_names[task.edge_device_id], size_bytes=payload_bytes):
+            rejected += 1
+    
+    scheduler.drain()
+    latencies = np.array([record['latency'] for record in completed])
+    if len(latencies) == 0:
+        latencies = np.zeros(1)
+    misses = sum(record['completion_time'] > record['deadline'] for record in completed if 'deadline' in record)
+    return {
+        'policy': policy,
+        'tasks': len(tasks),
+        'spilled': placement.spilled,
+        'offloaded': placement.offloaded,
+        'rejected': rejected,
+        'deadline_miss_rate': (misses + rejected) / len(tasks) if tasks else 0.0,
+        'latency_p50': float(np.percentile(latencies, 50)),
+        'latency_p95': float(np.percentile(latencies, 95)),
+        'latency_p99': float(np.percentile(latencies, 99))
+    }
@@ -0,0 +1,159 @@
+import collections
+import heapq
+
+from src.models import HealthTask
+
+
+class PatientWindow:
+    """Running aggregate of one patient's non-urgent readings in the current window"""
+
+    __slots__ = ('first', 'readings', 'changed', 'heart_rate', 'blood_pressure', 'glucose_level',
+                 'k_value', 'm_value')
+
+    def __init__(self, task: HealthTask):
+        self.first = task  # A one-reading window forwards this reading instead of a summary
+        self.readings = 0
+        self.changed = 0
+        self.heart_rate = 0.0
+        self.blood_pressure = 0.0
+        self.glucose_level = 0.0
+        self.k_value = -1.0
+        self.m_value = 0.0
+
+    def add(self, task: HealthTask, changed: bool):
+        self.readings += 1
+        self.changed += changed
+        self.heart_rate += task.heart_rate
+        self.blood_pressure += task.blood_pressure
+        self.glucose_level += task.glucose_level
+        if task.k_value > self.k_value:
+            self.k_value = task.k_value
+            self.m_value = task.m_value
+
+
+class EdgePreAggregator:
+    """Edge-side stage between task creation and scheduling that condenses non-urgent readings.
+
+    Readings with k > urgent_threshold are forwarded immediately. A
+    non-urgent reading joins its patient's window, which stays open for
+    `window` seconds from its first reading. A reading within `deadband` of
+    the patient's last forwarded vitals on every parameter is suppressed:
+    it is counted in the window but doesn't make it worth sending. When a
+    window expires it is forwarded as one summary task (mean vitals, the
+    highest k and its m) if any of its readings changed, and dropped
+    otherwise. Expired windows are collected whenever a reading arrives, so
+    they leave together as a batch stamped with that reading's time.
+    """
+
+    def __init__(self, window: float, deadband: dict, urgent_threshold: float = 1.0):
+        self.window = window
+        self.deadband = (deadband['heart_rate'], deadband['blood_pressure'], deadband['glucose_level'])
+        self.urgent_threshold = urgent_threshold
+        self.windows = {}         # patient_id -> open PatientWindow
+        self.expiry = []          # Heap of (window end, patient_id); one entry per open window
+        self.last_forwarded = {}  # patient_id -> (HR, BP, glucose) last sent upstream
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+        self.readings = 0
+        self.bypassed = 0     # Urgent readings forwarded as-is
+        self.aggregated = 0   # Non-urgent readings taken into a window
+        self.suppressed = 0   # Aggregated readings within the deadband
+        self.summaries = 0    # Windows of several readings forwarded as summary tasks
+        self.held = 0         # One-reading windows forwarded as the reading itself
+        self.dropped_windows = 0
+        # Non-urgent readings that didn't become their own task, by task type
+        self.avoided_tasks = collections.Counter()
+
+    def offer(self, task: HealthTask) -> list[HealthTask]:
+        """Take one scored task; return the tasks to schedule now, oldest first"""
+        if self.first_timestamp is None:
+            self.first_timestamp = task.timestamp
+        self.last_timestamp = task.timestamp
+        self.readings += 1
+
+        forwarded = self.flush_expired(task.timestamp)
+        if task.k_value > self.urgent_threshold:
+            self.bypassed += 1
+            forwarded.append(task)
+            return forwarded
+
+        window = self.windows.get(task.patient_id)
+        if window is None:
+            window = self.windows[task.patient_id] = PatientWindow(task)
+            heapq.heappush(self.expiry, (task.timestamp + self.window, task.patient_id))
+
+        last = self.last_forwarded.get(task.patient_id)
+        changed = last is None or any(
+            abs(value - previous) >= band
+            for value, previous, band in zip((task.heart_rate, task.blood_pressure, task.glucose_level), last, self.deadband)
+        )
+        self.aggregated += 1
+        self.suppressed += not changed
+        window.add(task, changed)
+        return forwarded
+
+    def flush_expired(self, now: float) -> list[HealthTask]:
+        """Close every window that ended by `now`"""
+        forwarded = []
+        while self.expiry and self.expiry[0][0] <= now:
+            _, patient_id = heapq.heappop(self.expiry)
+            summary = self._close(self.windows.pop(patient_id), now)
+            if summary is not None:
+                forwarded.append(summary)
+        return forwarded
+
+    def flush(self, now: float = None) -> list[HealthTask]:
+        """Close every open window, e.g. at the end of a stream"""
+        now = self.last_timestamp if now is None else now
+        forwarded = []
+        while self.expiry:
+            _, patient_id = heapq.heappop(self.expiry)
+            summary = self._close(self.windows.pop(patient_id), now)
+            if summary is not None:
+                forwarded.append(summary)
+        return forwarded
+
+    def _close(self, window: PatientWindow, now: float) -> HealthTask:
+        """Summary task for a closed window, or None if nothing in it changed"""
+        first = window.first
+        if not window.changed:
+            self.dropped_windows += 1
+            self.avoided_tasks[first.task_type] += window.readings
+            return None
+
+        self.avoided_tasks[first.task_type] += window.readings - 1
+        if window.readings == 1:
+            # Held at the edge until the window closed
+            self.held += 1
+            summary = first
+            summary.timestamp = now
+        else:
+            self.summaries += 1
+            summary = HealthTask(
+                patient_id=first.patient_id,
+                heart_rate=round(window.heart_rate / window.readings),
+                blood_pressure=round(window.blood_pressure / window.readings),
+                glucose_level=window.glucose_level / window.readings,
+                task_type=first.task_type,
+                k_value=window.k_value,
+                m_value=window.m_value,
+                timestamp=now,
+                edge_device_id=first.edge_device_id,
+                readings=window.readings
+            )
+        self.last_forwarded[first.patient_id] = (summary.heart_rate, summary.blood_pressure, summary.glucose_level)
+        return summary
+
+    def stats(self) -> dict:
+        """Reading counters for this edge device"""
+        return {
+            'readings': self.readings,
+            'bypassed': self.bypassed,
+            'aggregated': self.aggregated,
+            'suppressed': self.suppressed,
+            'summaries': self.summaries,
+            'held': self.held,
+            'dropped_windows': self.dropped_windows,
+            'avoided_tasks': sum(self.avoided_tasks.values())
+        }
@@ -0,0 +1,80 @@
+import collections
+import threading
+
+
+class PriorityCache:
+    """Bounded LRU cache of (k, m) results keyed by patient profile and quantized vitals.
+
+    Keys hold the profile values themselves (age, height, weight, gender)
+    rather than the patient ID, so editing a patient record changes the key
+    and the old entry can never be served again; it just ages out.
+    Call clear() whenever the models change. get/put are guarded by a lock
+    because scoring threads share one calculator.
+    """
+
+    def __init__(self, max_entries: int = 65536, glucose_quantum: float = 0.1):
+        self.max_entries = max_entries
+        self.glucose_quantum = glucose_quantum
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be pickled; the calculator is sent to shard workers
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key(self, heart_rate, blood_pressure, glucose_level, age, height, weight, gender) -> tuple:
+        """Cache key for one specific-patient reading"""
+        return (int(heart_rate), int(blood_pressure), round(glucose_level / self.glucose_quantum),
+                age, height, weight, gender)
+
+    def get(self, key):
+        """Cached (k, m) for a key, or None; a hit marks the entry as most recently used"""
+        with self._lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result: tuple):
+        """Store (k, m) for a key, evicting the least recently used entry when full"""
+        with self._lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, e.g. after the models are retrained or reloaded"""
+        with self._lock:
+            self.entries.clear()
+
+    def renewed(self) -> 'PriorityCache':
+        """Empty cache with the same settings and running counters, to swap in for this one"""
+        cache = PriorityCache(self.max_entries, self.glucose_quantum)
+        with self._lock:
+            cache.hits, cache.misses, cache.evictions = self.hits, self.misses, self.evictions
+        return cache
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
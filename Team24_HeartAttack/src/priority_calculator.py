@@ -1,7 +1,9 @@
 import numpy as np
+import logging
 import sys
 import os
-from sklearn.ensemble import RandomForestRegressor
+import threading
+import time
 
 # Add parent directory to path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -10,9 +12,19 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from src.models import HealthTask, Patient
+from src.model_store import ModelStore
+from src.edge_model import CompiledForest, distill_priority_model
+from src.priority_cache import PriorityCache
+from src.vital_history import VitalHistory
+from config.settings import MODEL_SETTINGS, TREND_SETTINGS
+
+logger = logging.getLogger('heartattack.priority')
+
+# Feature order used by the ML models for specific patients
+FEATURE_COLUMNS = ['heart_rate', 'blood_pressure', 'glucose_level', 'age', 'height', 'weight', 'gender']
 
 class PriorityCalculator:
-    def __init__(self):
+    def __init__(self, mmap_models: bool = False):
         # Normal ranges for general patients (taken from www.heart.org and www.medscape.com)
         self.normal_ranges = {
             'heart_rate': (60, 100),      # bpm
@@ -27,38 +39,317 @@ class PriorityCalculator:
             'glucose_level': 1.0
         }
         
-        # ML models for specific patients
-        self.ml_model_k = None
-        self.ml_model_m = None
+        # Urgency of every integer reading, for the general-patient fast path
+        self._build_urgency_tables()
+        
+        # ML models for specific patients, loaded lazily on the first specific task. The k/m pair
+        # is one tuple so a hot swap replaces both in a single assignment.
+        self._ml_models = (None, None)
+        self.model_store = ModelStore(MODEL_SETTINGS['model_dir'], MODEL_SETTINGS['artifact_version'])
+        # Worker processes map the persisted artifact read-only instead of retraining
+        self.mmap_models = mmap_models
+        
+        # Compiled student of the two forests, distilled lazily on the first specific task
+        self._edge_model = None
+        self.use_edge_model = MODEL_SETTINGS['edge_model']
+        
+        # Specific-patient results for repeated readings, cleared whenever a model changes
+        self.priority_cache = PriorityCache(
+            MODEL_SETTINGS['priority_cache_size'], MODEL_SETTINGS['priority_cache_glucose_quantum']
+        ) if MODEL_SETTINGS['priority_cache_size'] else None
+        
+        # Per-patient rolling vitals; a rising or falling trend can raise a reading's urgency
+        self.vital_history = None
+        self.trend_escalations = 0
+        if TREND_SETTINGS['enabled']:
+            self.enable_trends()
+        
+        # Optional ModelRetrainer fed with every scored specific-patient reading
+        self.retrainer = None
+        # Bumped on every hot swap; serializes concurrent swaps, scoring never takes it
+        self.model_version = 0
+        self._swap_lock = threading.Lock()
+    
+    def __getstate__(self):
+        # Locks can't be pickled
+        state = self.__dict__.copy()
+        del state['_swap_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._swap_lock = threading.Lock()
+    
+    @property
+    def ml_models(self) -> tuple:
+        """(model_k, model_m) as one consistent pair"""
+        if self._ml_models[0] is None or self._ml_models[1] is None:
+            self.load_ml_models()
+        return self._ml_models
+    
+    @property
+    def ml_model_k(self):
+        return self.ml_models[0]
+    
+    @ml_model_k.setter
+    def ml_model_k(self, model):
+        self._ml_models = (model, self._ml_models[1])
+        self._models_changed()
+    
+    @property
+    def ml_model_m(self):
+        return self.ml_models[1]
+    
+    @ml_model_m.setter
+    def ml_model_m(self, model):
+        self._ml_models = (self._ml_models[0], model)
+        self._models_changed()
+    
+    @property
+    def edge_model(self):
+        """Compiled edge model for specific tasks, or None when the forests are used"""
+        if self._edge_model is None and self.use_edge_model:
+            self.load_edge_model()
+        return self._edge_model
+    
+    def _models_changed(self):
+        """Drop cached results computed with the previous models"""
+        if self.priority_cache is not None:
+            self.priority_cache.clear()
+    
+    def _model_params(self) -> dict:
+        """Hyperparameters that identify a trained model artifact"""
+        return {
+            'n_estimators': MODEL_SETTINGS['n_estimators'],
+            'random_state': MODEL_SETTINGS['random_state'],
+            'data_seed': MODEL_SETTINGS['data_seed'],
+            'training_chunksize': MODEL_SETTINGS['training_chunksize'],
+            'trees_per_chunk': MODEL_SETTINGS['trees_per_chunk'],
+            'features': FEATURE_COLUMNS
+        }
+    
+    def _model_key(self):
+        """Artifact key for the current training data, or None if it can't be read"""
+        try:
+            return self.model_store.artifact_key(MODEL_SETTINGS['training_data'], self._model_params())
+        except OSError as e:
+            logger.error("Error hashing training data: %s", e)
+            return None
+    
+    def load_ml_models(self):
+        """Load persisted ML models, retraining only if the artifact is missing or stale"""
+        key = self._model_key()
+        models = self.model_store.load(key, mmap_mode='r' if self.mmap_models else None) if key else None
+        
+        if models is not None:
+            self._ml_models = tuple(models)
+            self._models_changed()
+            return
+        
         self.train_ml_models()
+        model_k, model_m = self._ml_models
+        if key and model_k is not None and model_m is not None:
+            try:
+                self.model_store.save(key, model_k, model_m)
+            except OSError as e:
+                logger.error("Error saving model artifact: %s", e)
+    
+    def _edge_model_params(self) -> dict:
+        """Hyperparameters that identify a distilled edge model"""
+        params = self._model_params()
+        params.update({
+            'edge_n_estimators': MODEL_SETTINGS['edge_n_estimators'],
+            'edge_max_depth': MODEL_SETTINGS['edge_max_depth'],
+            'edge_distill_samples': MODEL_SETTINGS['edge_distill_samples'],
+            'edge_k_thresholds': list(MODEL_SETTINGS['edge_k_thresholds'])
+        })
+        return params
+    
+    def load_edge_model(self):
+        """Load the persisted edge model, distilling it from the forests if missing or stale.
+        
+        A model whose agreement with the forests misses edge_max_k_mae,
+        edge_min_m_agreement or edge_min_threshold_agreement is discarded and
+        specific tasks keep using the forests.
+        """
+        try:
+            key = self.model_store.artifact_key(MODEL_SETTINGS['training_data'], self._edge_model_params())
+        except OSError as e:
+            logger.error("Error hashing training data: %s", e)
+            key = None
+        arrays = self.model_store.load_arrays(key) if key else None
+        
+        if arrays is not None:
+            model = CompiledForest.from_arrays(arrays)
+        else:
+            model = self.distill_edge_model()
+            if model is None:
+                self.use_edge_model = False
+                return
+            if key:
+                try:
+                    self.model_store.save_arrays(key, model.to_arrays())
+                except OSError as e:
+                    logger.error("Error saving edge model: %s", e)
+        
+        if not self._edge_model_acceptable(model):
+            self.use_edge_model = False
+            return
+        self._edge_model = model
+        self._models_changed()
+    
+    def _edge_model_acceptable(self, model: CompiledForest) -> bool:
+        """Whether an edge model is close enough to the forests to replace them"""
+        fidelity = model.fidelity
+        if fidelity.get('k_mae', float('inf')) > MODEL_SETTINGS['edge_max_k_mae'] or \
+                fidelity.get('m_agreement', 0.0) < MODEL_SETTINGS['edge_min_m_agreement'] or \
+                fidelity.get('threshold_agreement', 0.0) < MODEL_SETTINGS['edge_min_threshold_agreement']:
+            logger.warning("Edge model too far from the forests (%s), using the forests", fidelity)
+            return False
+        return True
+    
+    def edge_distill_params(self) -> dict:
+        """distill_priority_model keyword arguments other than the teachers and seed rows"""
+        return {
+            'm_classes': sorted(set(self.parameter_weights.values())),
+            'n_estimators': MODEL_SETTINGS['edge_n_estimators'],
+            'max_depth': MODEL_SETTINGS['edge_max_depth'],
+            'samples': MODEL_SETTINGS['edge_distill_samples'],
+            'random_state': MODEL_SETTINGS['random_state'],
+            'k_thresholds': tuple(MODEL_SETTINGS['edge_k_thresholds'])
+        }
+    
+    def distill_edge_model(self):
+        """Distill the k/m forests into a CompiledForest, or None on failure"""
+        try:
+            from src.real_data_loader import RealDataLoader
+            
+            data_loader = RealDataLoader(seed=MODEL_SETTINGS['data_seed'])
+            # The first chunk is enough to seed the jittered distillation set
+            chunksize = MODEL_SETTINGS['training_chunksize'] or 100000
+            training_data = next(data_loader.iter_training_data(MODEL_SETTINGS['training_data'], chunksize))
+            
+            model_k, model_m = self.ml_models
+            return distill_priority_model(
+                model_k, model_m, training_data[FEATURE_COLUMNS].values, **self.edge_distill_params()
+            )
+        except Exception as e:
+            logger.error("Error distilling edge model: %s", e)
+            return None
     
     def train_ml_models(self):
         """Train ML models using medical data"""
+        if MODEL_SETTINGS['training_chunksize']:
+            self.train_ml_models_streaming(MODEL_SETTINGS['training_chunksize'])
+            return
+        
         try:
+            # scikit-learn and pandas load only when models are trained, not for general scoring
+            from sklearn.ensemble import RandomForestRegressor
             # Import our real data loader
             from src.real_data_loader import RealDataLoader
             
             # Load real medical data
-            data_loader = RealDataLoader()
-            real_data = data_loader.load_real_training_data()
+            data_loader = RealDataLoader(seed=MODEL_SETTINGS['data_seed'])
+            real_data = data_loader.load_real_training_data(MODEL_SETTINGS['training_data'])
             
             # Prepare features for ML model
-            feature_columns = ['heart_rate', 'blood_pressure', 'glucose_level', 'age', 'height', 'weight', 'gender']
-            X = real_data[feature_columns].values
+            X = real_data[FEATURE_COLUMNS].values
             
             # Use calculated k and m values
             y_k = real_data['k_value'].values
             y_m = real_data['m_value'].values
             
-            # Train models with real medical patterns
-            self.ml_model_k = RandomForestRegressor(n_estimators=100, random_state=42)
-            self.ml_model_m = RandomForestRegressor(n_estimators=100, random_state=42)
+            # Train models with real medical patterns, building trees on n_jobs cores
+            model_k = RandomForestRegressor(
+                n_estimators=MODEL_SETTINGS['n_estimators'], random_state=MODEL_SETTINGS['random_state'],
+                n_jobs=MODEL_SETTINGS['n_jobs']
+            )
+            model_m = RandomForestRegressor(
+                n_estimators=MODEL_SETTINGS['n_estimators'], random_state=MODEL_SETTINGS['random_state'],
+                n_jobs=MODEL_SETTINGS['n_jobs']
+            )
+            
+            model_k.fit(X, y_k)
+            model_m.fit(X, y_m)
+            
+            self._set_trained_models(model_k, model_m)
+            
+        except Exception as e:
+            logger.error("Error in real data training: %s", e)  
+    
+    def train_ml_models_streaming(self, chunksize: int):
+        """Train ML models chunk by chunk, growing each forest with warm_start"""
+        try:
+            from sklearn.ensemble import RandomForestRegressor
+            from src.real_data_loader import RealDataLoader
+            
+            data_loader = RealDataLoader(seed=MODEL_SETTINGS['data_seed'])
+            trees_per_chunk = MODEL_SETTINGS['trees_per_chunk']
             
-            self.ml_model_k.fit(X, y_k)
-            self.ml_model_m.fit(X, y_m)
+            model_k = RandomForestRegressor(
+                n_estimators=0, warm_start=True, random_state=MODEL_SETTINGS['random_state'],
+                n_jobs=MODEL_SETTINGS['n_jobs']
+            )
+            model_m = RandomForestRegressor(
+                n_estimators=0, warm_start=True, random_state=MODEL_SETTINGS['random_state'],
+                n_jobs=MODEL_SETTINGS['n_jobs']
+            )
+            
+            # Each chunk contributes new trees; earlier trees are kept, so only one chunk is in memory
+            for chunk in data_loader.iter_training_data(MODEL_SETTINGS['training_data'], chunksize):
+                X = chunk[FEATURE_COLUMNS].values
+                for model, target in ((model_k, 'k_value'), (model_m, 'm_value')):
+                    model.n_estimators += trees_per_chunk
+                    model.fit(X, chunk[target].values)
+            
+            if model_k.n_estimators == 0:
+                logger.error("Error in streaming training: no training rows found")
+                return
+            
+            self._set_trained_models(model_k, model_m)
             
         except Exception as e:
-            print(f"Error in real data training: {e}")  
+            logger.error("Error in streaming training: %s", e)
+    
+    def _set_trained_models(self, model_k, model_m):
+        """Install freshly fitted forests; they predict single-threaded, where joblib overhead would dominate"""
+        model_k.n_jobs = None
+        model_m.n_jobs = None
+        self._ml_models = (model_k, model_m)
+        self._models_changed()
+    
+    def swap_models(self, model_k, model_m, edge_model: CompiledForest = None) -> tuple[int, float]:
+        """Replace the live models while other threads keep scoring; returns (new version, stall seconds).
+        
+        The forests are swapped as one pair and the priority cache is
+        replaced rather than cleared, so a scorer that started on the old
+        models can only write into the discarded cache. With the edge model
+        enabled, `edge_model` replaces it if it passes the fidelity check;
+        otherwise specific tasks fall back to the new forests. The stall is
+        the time spent holding the swap lock.
+        """
+        if edge_model is not None and not self._edge_model_acceptable(edge_model):
+            edge_model = None
+        cache = self.priority_cache.renewed() if self.priority_cache is not None else None
+        
+        with self._swap_lock:
+            start = time.perf_counter()
+            # Freed after the lock is released; dropping a forest's last reference is not free
+            retired = (self._ml_models, self._edge_model, self.priority_cache)
+            self._ml_models = (model_k, model_m)
+            if edge_model is not None:
+                self._edge_model = edge_model
+                self.use_edge_model = True
+            elif self.use_edge_model:
+                # Order matters: edge_model must not see None while use_edge_model is set, or it would reload
+                self.use_edge_model = False
+                self._edge_model = None
+            self.priority_cache = cache
+            self.model_version += 1
+            version, stall = self.model_version, time.perf_counter() - start
+        del retired
+        return version, stall
     
     def _calculate_parameter_urgency(self, value: float, lower_bound: float, upper_bound: float) -> float:
         """Calculate urgency for a single parameter using research paper's formula"""
@@ -66,9 +357,64 @@ class PriorityCalculator:
         urgency = abs((upper_bound - value)**2 - (lower_bound - value)**2) / (upper_bound - lower_bound)**2
         return min(urgency, 2.0)  # Cap at 2.0
     
+    def _build_urgency_tables(self):
+        """Precompute _calculate_parameter_urgency for every integer reading that is below the cap.
+        
+        Urgency grows with distance from the middle of the normal range and
+        reaches the 2.0 cap half a range-width outside it. Each table covers
+        that span plus one capped entry at both ends, so clipping an index
+        into the table gives the exact capped value for any integer reading.
+        """
+        self._urgency_tables = {}
+        self._urgency_table_lists = {}
+        for parameter, (lower_bound, upper_bound) in self.normal_ranges.items():
+            half_width = (upper_bound - lower_bound) / 2
+            start = int(np.floor(lower_bound - half_width)) - 1
+            stop = int(np.ceil(upper_bound + half_width)) + 1
+            table = [self._calculate_parameter_urgency(value, lower_bound, upper_bound)
+                     for value in range(start, stop + 1)]
+            if table[0] != 2.0 or table[-1] != 2.0:
+                raise ValueError(f"Urgency table for {parameter} does not reach the cap")
+            self._urgency_tables[parameter] = (start, np.array(table))
+            self._urgency_table_lists[parameter] = (start, table)
+    
+    def _lookup_urgency(self, parameter: str, value) -> float:
+        """Urgency of one reading: table lookup for integers, the formula otherwise"""
+        if value != value or value % 1:  # NaN or fractional
+            return self._calculate_parameter_urgency(value, *self.normal_ranges[parameter])
+        start, table = self._urgency_table_lists[parameter]
+        return table[min(max(int(value) - start, 0), len(table) - 1)]
+    
+    def _lookup_urgency_array(self, parameter: str, values) -> np.ndarray:
+        """Vectorized _lookup_urgency"""
+        values = np.asarray(values, dtype=float)
+        start, table = self._urgency_tables[parameter]
+        is_integer = np.isfinite(values) & (values == np.floor(values))
+        if is_integer.all():
+            return table[np.clip(values - start, 0, len(table) - 1).astype(np.intp)]
+        urgency = np.empty(len(values))
+        urgency[is_integer] = table[np.clip(values[is_integer] - start, 0, len(table) - 1).astype(np.intp)]
+        urgency[~is_integer] = self._calculate_parameter_urgency_array(
+            values[~is_integer], *self.normal_ranges[parameter]
+        )
+        return urgency
+    
     def calculate_general_priority(self, task: HealthTask) -> tuple[float, float]:
         """Calculate priority for general patient type using rule-based approach"""
-        # Calculate k-value for each parameter
+        hr_k = self._lookup_urgency('heart_rate', task.heart_rate)
+        bp_k = self._lookup_urgency('blood_pressure', task.blood_pressure)
+        glucose_k = self._lookup_urgency('glucose_level', task.glucose_level)
+        
+        # k-value is maximum of all parameter urgencies; m-value comes from the
+        # most critical parameter, the first in HR, BP, glucose order on ties
+        if hr_k >= bp_k and hr_k >= glucose_k:
+            return hr_k, self.parameter_weights['heart_rate']
+        if bp_k >= glucose_k:
+            return bp_k, self.parameter_weights['blood_pressure']
+        return glucose_k, self.parameter_weights['glucose_level']
+    
+    def reference_general_priority(self, task: HealthTask) -> tuple[float, float]:
+        """General-patient priority evaluated directly from the formula, without lookup tables"""
         hr_k = self._calculate_parameter_urgency(
             task.heart_rate, *self.normal_ranges['heart_rate']
         )
@@ -97,7 +443,7 @@ class PriorityCalculator:
     def calculate_specific_priority(self, task: HealthTask, patient: Patient) -> tuple[float, float]:
         """Calculate priority for specific patient type using ML model"""
         # Prepare features for ML model
-        features = np.array([[
+        features = [
             task.heart_rate,
             task.blood_pressure,
             task.glucose_level,
@@ -105,10 +451,33 @@ class PriorityCalculator:
             patient.height,
             patient.weight,
             1 if patient.gender == 'M' else 0
-        ]])
+        ]
+        
+        # Read once: a hot swap may replace the cache while this reading is scored
+        cache = self.priority_cache
+        if cache is None:
+            result = self._predict_specific_priority(features)
+        else:
+            key = cache.key(*features)
+            result = cache.get(key)
+            if result is None:
+                result = self._predict_specific_priority(features)
+                cache.put(key, result)
+        
+        if self.retrainer is not None:
+            self.retrainer.observe(features, result[0])
+        return result
+    
+    def _predict_specific_priority(self, features: list) -> tuple[float, float]:
+        """k/m for one feature vector from the edge model or the forests"""
+        edge_model = self.edge_model
+        if edge_model is not None:
+            return edge_model.predict_one(features)
         
-        k_value = float(self.ml_model_k.predict(features)[0])
-        m_value = float(self.ml_model_m.predict(features)[0])
+        model_k, model_m = self.ml_models
+        features = np.array([features])
+        k_value = float(model_k.predict(features)[0])
+        m_value = float(model_m.predict(features)[0])
         
         # Ensure k-value is in [0, 2] range
         k_value = max(0.0, min(k_value, 2.0))
@@ -122,6 +491,175 @@ class PriorityCalculator:
         else:
             k_value, m_value = self.calculate_specific_priority(task, patient)
         
+        if self.vital_history is not None:
+            k_values, m_values = self.apply_trends([task], np.array([k_value]), np.array([m_value]))
+            k_value, m_value = float(k_values[0]), float(m_values[0])
+        
         task.k_value = k_value
         task.m_value = m_value
-        return task
\ No newline at end of file
+        return task
+    
+    def enable_trends(self):
+        """Start keeping per-patient vital history and escalating by trend (see apply_trends)"""
+        self.vital_history = VitalHistory(
+            TREND_SETTINGS['window'], TREND_SETTINGS['max_patients'], TREND_SETTINGS['idle_timeout']
+        )
+    
+    def apply_trends(self, tasks: list[HealthTask], k_values: np.ndarray, m_values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Record the tasks' readings in the vital history and escalate patients trending towards urgency.
+        
+        Each patient's rolling least-squares line is projected
+        TREND_SETTINGS['horizon'] seconds past the reading. When the
+        general-patient formula rates the projected vitals above the
+        task's k, the task takes that k and the m of the parameter driving
+        it. Patients with fewer than min_readings readings in their window
+        keep their score.
+        """
+        trends = self.vital_history.observe_batch(
+            [task.patient_id for task in tasks],
+            [task.timestamp for task in tasks],
+            [task.heart_rate for task in tasks],
+            [task.blood_pressure for task in tasks],
+            [task.glucose_level for task in tasks]
+        )
+        projected = trends['mean'] + trends['slope'] * (trends['lag'] + TREND_SETTINGS['horizon'])[:, None]
+        projected_k, projected_m = self.calculate_general_priority_batch(
+            projected[:, 0], projected[:, 1], projected[:, 2]
+        )
+        escalate = (trends['count'] >= TREND_SETTINGS['min_readings']) & (projected_k > k_values)
+        self.trend_escalations += int(escalate.sum())
+        return np.where(escalate, projected_k, k_values), np.where(escalate, projected_m, m_values)
+    
+    def _calculate_parameter_urgency_array(self, values, lower_bound: float, upper_bound: float) -> np.ndarray:
+        """Vectorized version of _calculate_parameter_urgency for a block of readings"""
+        values = np.asarray(values, dtype=float)
+        urgency = np.abs((upper_bound - values)**2 - (lower_bound - values)**2) / (upper_bound - lower_bound)**2
+        return np.minimum(urgency, 2.0)  # Cap at 2.0
+    
+    def calculate_general_priority_batch(self, heart_rate, blood_pressure, glucose_level) -> tuple[np.ndarray, np.ndarray]:
+        """Calculate general-patient k/m values for arrays of readings"""
+        urgencies = np.column_stack([
+            self._lookup_urgency_array('heart_rate', heart_rate),
+            self._lookup_urgency_array('blood_pressure', blood_pressure),
+            self._lookup_urgency_array('glucose_level', glucose_level)
+        ])
+        
+        k_values = urgencies.max(axis=1)
+        
+        # argmax returns the first maximum, matching max() over the urgency dict (HR > BP > glucose on ties)
+        weights = np.array([
+            self.parameter_weights['heart_rate'],
+            self.parameter_weights['blood_pressure'],
+            self.parameter_weights['glucose_level']
+        ])
+        m_values = weights[urgencies.argmax(axis=1)]
+        
+        return k_values, m_values
+    
+    def calculate_specific_priority_batch(self, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Calculate specific-patient k/m values, predicting only the readings missing from the cache"""
+        features = np.asarray(features, dtype=float)
+        if len(features) == 0:
+            return np.empty(0), np.empty(0)
+        
+        cache = self.priority_cache
+        if cache is None:
+            k_values, m_values = self._predict_specific_priority_batch(features)
+            if self.retrainer is not None:
+                self.retrainer.observe(features, k_values)
+            return k_values, m_values
+        
+        k_values = np.empty(len(features))
+        m_values = np.empty(len(features))
+        keys = [cache.key(*row) for row in features.tolist()]
+        missing = []
+        for i, key in enumerate(keys):
+            result = cache.get(key)
+            if result is None:
+                missing.append(i)
+            else:
+                k_values[i], m_values[i] = result
+        
+        if missing:
+            k_values[missing], m_values[missing] = self._predict_specific_priority_batch(features[missing])
+            for i in missing:
+                cache.put(keys[i], (float(k_values[i]), float(m_values[i])))
+        
+        if self.retrainer is not None:
+            self.retrainer.observe(features, k_values)
+        return k_values, m_values
+    
+    def _predict_specific_priority_batch(self, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """k/m arrays in one edge-model pass, or one predict call per forest"""
+        edge_model = self.edge_model
+        if edge_model is not None:
+            return edge_model.predict(features)
+        
+        model_k, model_m = self.ml_models
+        k_values = np.clip(model_k.predict(features), 0.0, 2.0)
+        m_values = model_m.predict(features)
+        
+        return k_values, m_values
+    
+    def calculate_batch_priority(self, readings) -> tuple[np.ndarray, np.ndarray]:
+        """Calculate k/m values for a block of readings.
+        
+        `readings` is a DataFrame or a dict of equal-length arrays with the
+        columns heart_rate, blood_pressure, glucose_level and task_type.
+        Rows with task_type 'specific' also need age, height, weight and
+        gender ('M'/'F' or 1/0).
+        """
+        heart_rate = np.asarray(readings['heart_rate'], dtype=float)
+        blood_pressure = np.asarray(readings['blood_pressure'], dtype=float)
+        glucose_level = np.asarray(readings['glucose_level'], dtype=float)
+        is_general = np.asarray(readings['task_type']) == 'general'
+        
+        k_values = np.empty(len(heart_rate))
+        m_values = np.empty(len(heart_rate))
+        
+        if is_general.any():
+            k_values[is_general], m_values[is_general] = self.calculate_general_priority_batch(
+                heart_rate[is_general], blood_pressure[is_general], glucose_level[is_general]
+            )
+        
+        is_specific = ~is_general
+        if is_specific.any():
+            gender = np.asarray(readings['gender'])[is_specific]
+            if gender.dtype.kind in 'OUS':
+                gender = (gender == 'M')
+            features = np.column_stack([
+                heart_rate[is_specific],
+                blood_pressure[is_specific],
+                glucose_level[is_specific],
+                np.asarray(readings['age'], dtype=float)[is_specific],
+                np.asarray(readings['height'], dtype=float)[is_specific],
+                np.asarray(readings['weight'], dtype=float)[is_specific],
+                gender.astype(float)
+            ])
+            k_values[is_specific], m_values[is_specific] = self.calculate_specific_priority_batch(features)
+        
+        return k_values, m_values
+    
+    def calculate_task_priorities(self, tasks: list[HealthTask], patients: list[Patient]) -> list[HealthTask]:
+        """Calculate priority values for a list of tasks in one batch"""
+        if not tasks:
+            return tasks
+        
+        readings = {
+            'heart_rate': [task.heart_rate for task in tasks],
+            'blood_pressure': [task.blood_pressure for task in tasks],
+            'glucose_level': [task.glucose_level for task in tasks],
+            'task_type': [task.task_type for task in tasks],
+            'age': [patient.age for patient in patients],
+            'height': [patient.height for patient in patients],
+            'weight': [patient.weight for patient in patients],
+            'gender': [1 if patient.gender == 'M' else 0 for patient in patients]
+        }
+        k_values, m_values = self.calculate_batch_priority(readings)
+        if self.vital_history is not None:
+            k_values, m_values = self.apply_trends(tasks, k_values, m_values)
+        
+        for task, k_value, m_value in zip(tasks, k_values, m_values):
+            task.k_value = float(k_value)
+            task.m_value = float(m_value)
+        return tasks
\ No newline at end of file
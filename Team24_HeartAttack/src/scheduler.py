@@ -0,0 +1,222 @@
+import heapq
+import math
+
+# Ready-queue orderings: highest (k, m) first, or earliest deadline first with (k, m) breaking ties
+DISCIPLINES = ('priority', 'edf')
+
+
+class DeadlinePolicy:
+    """Relative deadlines derived from a task's k and m values.
+
+    `budgets` lists (upper bound on k, seconds) in increasing order of k,
+    like metrics.URGENCY_CLASSES: the first class whose bound is at least k
+    gives the time a reading has from arrival to completion. Each step of
+    m above 1 shortens that budget by the fraction `m_tightening`, so the
+    most critical vital within a class is due first.
+    """
+
+    def __init__(self, budgets, m_tightening: float = 0.0):
+        self.budgets = tuple(budgets)
+        self.m_tightening = m_tightening
+
+    def relative(self, k_value: float, m_value: float) -> float:
+        """Seconds a task with these priority values may take end to end"""
+        budget = next((seconds for bound, seconds in self.budgets if k_value <= bound), self.budgets[-1][1])
+        return budget * (1.0 - self.m_tightening * max(m_value - 1.0, 0.0))
+
+
+class DeadlineWorkIndex:
+    """Processing time of queued tasks by deadline, for O(log n) "work due by" queries.
+
+    Deadlines are grouped into `resolution`-second buckets held in a
+    Fenwick tree. The tree starts just before the earliest live bucket and
+    is rebuilt with room to spare when a deadline falls outside it, so its
+    size follows the spread of queued deadlines, not the length of the
+    run. A query counts its own bucket in full, overestimating by at most
+    one bucket's work.
+    """
+
+    def __init__(self, resolution: float = 0.01):
+        self.resolution = resolution
+        self.buckets = {}  # bucket -> [work, tasks]
+        self.base = None   # Bucket at tree index 0
+        self.tree = [0.0]
+
+    def _update(self, index: int, work: float):
+        tree = self.tree
+        index += 1
+        while index < len(tree):
+            tree[index] += work
+            index += index & -index
+
+    def _rebuild(self):
+        low, high = min(self.buckets), max(self.buckets)
+        headroom = max(high - low + 1, 256)
+        self.base = low - headroom // 4
+        size = 1 << (high - self.base + headroom).bit_length()
+        tree = [0.0] * (size + 1)
+        for bucket, (work, _) in self.buckets.items():
+            tree[bucket - self.base + 1] += work
+        for index in range(1, size + 1):
+            parent = index + (index & -index)
+            if parent <= size:
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def add(self, deadline: float, work: float):
+        if deadline == float('inf'):
+            return
+        bucket = math.floor(deadline / self.resolution)
+        entry = self.buckets.setdefault(bucket, [0.0, 0])
+        entry[0] += work
+        entry[1] += 1
+        if self.base is None or not 0 <= bucket - self.base < len(self.tree) - 1:
+            self._rebuild()
+        else:
+            self._update(bucket - self.base, work)
+
+    def remove(self, deadline: float, work: float):
+        if deadline == float('inf'):
+            return
+        bucket = math.floor(deadline / self.resolution)
+        entry = self.buckets[bucket]
+        entry[1] -= 1
+        if entry[1]:
+            entry[0] -= work
+            self._update(bucket - self.base, -work)
+        else:
+            del self.buckets[bucket]
+            self._update(bucket - self.base, -entry[0])
+        if not self.buckets:
+            self.base = None  # Next add rebuilds, clearing accumulated rounding
+
+    def due_by(self, deadline: float) -> float:
+        """Work of tasks due no later than `deadline` (to bucket resolution)"""
+        if self.base is None:
+            return 0.0
+        index = min(math.floor(deadline / self.resolution) - self.base, len(self.tree) - 2)
+        tree = self.tree
+        work = 0.0
+        index += 1
+        while index > 0:
+            work += tree[index]
+            index -= index & -index
+        return max(work, 0.0)
+
+
+class DeviceQueue:
+    """Ready queue, CPU-core slots and memory for one edge or cloud device.
+
+    With the 'priority' discipline ready tasks are ordered by highest k,
+    then highest m, then earliest arrival. With 'edf' they are ordered by
+    earliest absolute deadline (the record's 'deadline'; none sorts last),
+    then the same keys. Each CPU core is a slot that runs one task at a
+    time, and a task also holds its memory for as long as it runs.
+    """
+
+    def __init__(self, name: str, cpu_slots: int, memory_capacity: float = float('inf'),
+                 discipline: str = 'priority'):
+        if discipline not in DISCIPLINES:
+            raise ValueError(f"discipline must be one of {DISCIPLINES}, got {discipline!r}")
+        self.name = name
+        self.cpu_slots = cpu_slots
+        self.memory_capacity = memory_capacity
+        self.discipline = discipline
+        self.used_memory = 0.0
+        self.ready = []    # ([deadline,] -k, -m, arrival, seq, record)
+        self.running = []  # min-heap of completion times of running tasks
+        self.in_transit = 0     # Tasks placed here but still on the network
+        self.queued_work = 0.0  # Processing time of tasks not yet started
+        self.ready_work = 0.0   # The part of queued_work that has reached the device
+        self.due_work = DeadlineWorkIndex() if discipline == 'edf' else None
+        self.busy_time = 0.0
+        self.completed = 0
+        # Integral of busy cores / memory over time, for utilization
+        self.busy_core_time = 0.0
+        self.memory_time = 0.0
+        self.last_update = 0.0
+
+    def reserve(self, record: dict):
+        """Count a task that is on its way to this device"""
+        self.in_transit += 1
+        self.queued_work += record['processing_time']
+
+    def enqueue(self, record: dict, arrival: float, seq: int):
+        """Make a task that has reached this device eligible to run"""
+        self.in_transit -= 1
+        self.ready_work += record['processing_time']
+        record['arrival_time'] = arrival
+        if self.due_work is not None:
+            deadline = record.get('deadline', float('inf'))
+            self.due_work.add(deadline, record['processing_time'])
+            entry = (deadline, -record['k_value'], -record['m_value'], arrival, seq, record)
+        else:
+            entry = (-record['k_value'], -record['m_value'], arrival, seq, record)
+        heapq.heappush(self.ready, entry)
+
+    def fits(self, record: dict) -> bool:
+        """Whether the device has enough memory to ever run the task"""
+        return record.get('memory', 0) <= self.memory_capacity
+
+    def depth(self) -> int:
+        """Tasks waiting or in transit to this device"""
+        return len(self.ready) + self.in_transit
+
+    def free_slots(self, now: float = None) -> int:
+        """Idle CPU cores"""
+        return self.cpu_slots - len(self.running)
+
+    def estimated_wait(self, now: float, deadline: float = None) -> float:
+        """Expected queueing delay for a task arriving at `now`, spreading backlog over all cores.
+
+        Under EDF a task with `deadline` only waits for ready tasks due no
+        later than it; tasks still in transit are counted whatever their
+        deadline.
+        """
+        if self.depth() < self.free_slots(now):
+            return 0.0
+        running_work = sum(completion - now for completion in self.running if completion > now)
+        if deadline is None or self.due_work is None:
+            return (running_work + self.queued_work) / self.cpu_slots
+        ahead = self.queued_work - self.ready_work + min(self.due_work.due_by(deadline), self.ready_work)
+        return (running_work + ahead) / self.cpu_slots
+
+    def accumulate(self, now: float):
+        """Advance the utilization integrals to `now`"""
+        elapsed = now - self.last_update
+        if elapsed > 0:
+            self.busy_core_time += elapsed * len(self.running)
+            self.memory_time += elapsed * self.used_memory
+            self.last_update = now
+
+    def start_next(self, now: float):
+        """Start the first ready task in queue order if a core and its memory are free"""
+        if not self.ready or len(self.running) >= self.cpu_slots:
+            return None
+        record = self.ready[0][-1]
+        if self.used_memory + record.get('memory', 0) > self.memory_capacity:
+            return None
+
+        heapq.heappop(self.ready)
+        if self.due_work is not None:
+            self.due_work.remove(record.get('deadline', float('inf')), record['processing_time'])
+        arrival = record['arrival_time']
+        self.accumulate(now)
+        completion_time = now + record['processing_time']
+        heapq.heappush(self.running, completion_time)
+        self.used_memory += record.get('memory', 0)
+        self.queued_work -= record['processing_time']
+        self.ready_work -= record['processing_time']
+
+        record['start_time'] = now
+        record['completion_time'] = completion_time
+        record['queueing_delay'] = now - arrival
+        return record
+
+    def finish(self, record: dict, now: float):
+        """Release the core and memory held by a completed task"""
+        self.accumulate(now)
+        heapq.heappop(self.running)  # Completions are processed in time order
+        self.used_memory -= record.get('memory', 0)
+        self.busy_time += record['processing_time']
+        self.completed += 1
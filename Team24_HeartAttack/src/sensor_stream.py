@@ -0,0 +1,43 @@
+import itertools
+
+# pandas is imported by the DataFrame readers only, so importing SENSOR_COLUMNS stays cheap
+
+# Column layout of the sensor_readings_edge{N}.csv files
+SENSOR_COLUMNS = ['patient_id', 'heart_rate', 'blood_pressure', 'glucose_level', 'timestamp']
+
+
+def iter_csv_batches(source, batch_size: int):
+    """Read sensor readings in bounded-size DataFrame batches.
+    
+    `source` is a file path or any file-like object with a CSV header row,
+    e.g. `socket.makefile('r')`, so only one batch is held in memory.
+    """
+    import pandas as pd
+    
+    with pd.read_csv(source, chunksize=batch_size) as reader:
+        for batch in reader:
+            yield batch
+
+
+def iter_record_batches(records, batch_size: int):
+    """Group an iterable of readings into DataFrame batches.
+    
+    Each record is a dict keyed by SENSOR_COLUMNS or a tuple in that order,
+    so a generator or live feed can be consumed without materializing it.
+    """
+    import pandas as pd
+    
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            return
+        if isinstance(batch[0], dict):
+            yield pd.DataFrame.from_records(batch, columns=SENSOR_COLUMNS)
+        else:
+            yield pd.DataFrame(batch, columns=SENSOR_COLUMNS)
+
+
+def iter_batch_rows(batch):
+    """Readings of a DataFrame or SensorBatch as tuples in SENSOR_COLUMNS order"""
+    return zip(*(batch[column].tolist() for column in SENSOR_COLUMNS))
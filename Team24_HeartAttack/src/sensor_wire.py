@@ -0,0 +1,187 @@
+import argparse
+import os
+import struct
+
+import numpy as np
+
+# Binary sensor stream layout:
+#   header   HEADER: magic, format version, record size, patient count, patient table size in bytes
+#   table    UTF-8 patient IDs joined by newlines; a record's patient field indexes this table
+#   records  RECORD_DTYPE packed back to back until the end of the stream
+WIRE_MAGIC = b'HASR'
+WIRE_VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+RECORD_DTYPE = np.dtype([
+    ('patient', '<u4'),
+    ('heart_rate', '<u2'),       # bpm
+    ('blood_pressure', '<u2'),   # mmHg
+    ('glucose_tenths', '<u2'),   # Glucose in 0.1 mg/dL steps, so one-decimal readings round-trip exactly
+    ('timestamp', '<f8')
+])
+GLUCOSE_SCALE = 10
+
+
+class SensorBatch:
+    """Block of binary readings decoded in place, indexed by column like a sensor DataFrame.
+
+    `records` is a structured view over the bytes read, so the HR, BP and
+    timestamp columns are returned without copying; patient IDs and
+    glucose are computed for the whole block at once.
+    """
+
+    __slots__ = ('records', 'patient_ids')
+
+    def __init__(self, records: np.ndarray, patient_ids: np.ndarray):
+        self.records = records
+        self.patient_ids = patient_ids
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        if column == 'patient_id':
+            return self.patient_ids[self.records['patient']]
+        if column == 'glucose_level':
+            return self.records['glucose_tenths'] / GLUCOSE_SCALE
+        return self.records[column]
+
+
+def decode_records(buffer) -> np.ndarray:
+    """Structured view over a bytes-like buffer of whole records (bytes, bytearray, mmap, memoryview)"""
+    view = memoryview(buffer).cast('B')
+    if len(view) % RECORD_DTYPE.itemsize:
+        raise ValueError(f"Buffer of {len(view)} bytes is not a whole number of {RECORD_DTYPE.itemsize}-byte records")
+    return np.frombuffer(view, dtype=RECORD_DTYPE)
+
+
+def encode_records(patient_index, heart_rate, blood_pressure, glucose_level, timestamp) -> bytes:
+    """Pack equal-length column arrays into records"""
+    heart_rate = np.rint(np.asarray(heart_rate, dtype=float))
+    blood_pressure = np.rint(np.asarray(blood_pressure, dtype=float))
+    glucose_tenths = np.rint(np.asarray(glucose_level, dtype=float) * GLUCOSE_SCALE)
+    limit = np.iinfo(np.uint16).max
+    for name, values in (('heart_rate', heart_rate), ('blood_pressure', blood_pressure),
+                         ('glucose_level', glucose_tenths)):
+        if len(values) and (not np.isfinite(values).all() or values.min() < 0 or values.max() > limit):
+            raise ValueError(f"{name} values outside the range of the binary record format")
+
+    records = np.empty(len(heart_rate), dtype=RECORD_DTYPE)
+    records['patient'] = patient_index
+    records['heart_rate'] = heart_rate
+    records['blood_pressure'] = blood_pressure
+    records['glucose_tenths'] = glucose_tenths
+    records['timestamp'] = timestamp
+    return records.tobytes()
+
+
+def write_header(f, patient_ids: list):
+    """Write the stream header and patient table"""
+    table = '\n'.join(patient_ids).encode()
+    f.write(HEADER.pack(WIRE_MAGIC, WIRE_VERSION, RECORD_DTYPE.itemsize, len(patient_ids), len(table)))
+    f.write(table)
+
+
+def _read_exact(f, size: int, data: bytes = b'') -> bytes:
+    """Keep reading until `data` is `size` bytes; unbuffered sources can return less per read()"""
+    while len(data) < size:
+        chunk = f.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def read_header(f) -> np.ndarray:
+    """Read the stream header and return the patient table"""
+    header = _read_exact(f, HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError("Truncated sensor stream header")
+    magic, version, record_size, patient_count, table_size = HEADER.unpack(header)
+    if magic != WIRE_MAGIC:
+        raise ValueError("Not a binary sensor stream")
+    if version != WIRE_VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Unsupported sensor stream version {version} with {record_size}-byte records")
+    table = _read_exact(f, table_size).decode()
+    patient_ids = table.split('\n') if patient_count else []
+    if len(patient_ids) != patient_count:
+        raise ValueError("Corrupt sensor stream patient table")
+    return np.array(patient_ids, dtype=object)
+
+
+def iter_binary_batches(source, batch_size: int):
+    """Read binary sensor readings in SensorBatch blocks of at most batch_size.
+
+    `source` is a file path or a binary file-like object, e.g.
+    `socket.makefile('rb')`. Each block is one read() decoded in place.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield from iter_binary_batches(f, batch_size)
+        return
+
+    patient_ids = read_header(source)
+    block_size = batch_size * RECORD_DTYPE.itemsize
+    while True:
+        block = source.read(block_size)
+        if not block:
+            return
+        # Complete a record split across reads before decoding
+        remainder = len(block) % RECORD_DTYPE.itemsize
+        if remainder:
+            block = _read_exact(source, len(block) + RECORD_DTYPE.itemsize - remainder, block)
+            if len(block) % RECORD_DTYPE.itemsize:
+                raise ValueError("Sensor stream ends in a partial record")
+        yield SensorBatch(decode_records(block), patient_ids)
+
+
+def write_binary(output_path: str, batches, patient_ids: list) -> int:
+    """Write DataFrame or SensorBatch reading batches as a binary stream; returns the number of readings.
+
+    Every patient_id in the batches must be in `patient_ids`, whose
+    order defines the patient index.
+    """
+    index = {patient_id: i for i, patient_id in enumerate(patient_ids)}
+    readings = 0
+    tmp_path = f"{output_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        write_header(f, patient_ids)
+        for batch in batches:
+            patient_index = np.array([index[patient_id] for patient_id in batch['patient_id'].tolist()],
+                                     dtype=np.uint32)
+            f.write(encode_records(patient_index, batch['heart_rate'], batch['blood_pressure'],
+                                   batch['glucose_level'], batch['timestamp']))
+            readings += len(patient_index)
+    os.replace(tmp_path, output_path)
+    return readings
+
+
+def convert_csv(csv_path: str, output_path: str = None, chunksize: int = 100000) -> str:
+    """Convert a sensor_readings_edgeN.csv file to the binary format, streaming it in chunks.
+
+    The patient table lists IDs in order of first appearance. Glucose is
+    stored to 0.1 mg/dL.
+    """
+    from src.sensor_stream import iter_csv_batches  # pandas is only needed to read the CSV
+
+    output_path = output_path or os.path.splitext(csv_path)[0] + '.bin'
+    patient_ids = {}
+    for batch in iter_csv_batches(csv_path, chunksize):
+        patient_ids.update(dict.fromkeys(batch['patient_id'].tolist()))
+    write_binary(output_path, iter_csv_batches(csv_path, chunksize), list(patient_ids))
+    return output_path
+
+
+def main():
+    """Command line entry point: python -m src.sensor_wire data/sensor_readings_edge1.csv ..."""
+    parser = argparse.ArgumentParser(description="Convert sensor reading CSVs to the binary wire format")
+    parser.add_argument('csv_files', nargs='+', help="sensor_readings_edgeN.csv files; each is written next to itself as .bin")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="CSV rows converted per chunk")
+    args = parser.parse_args()
+
+    for csv_path in args.csv_files:
+        output_path = convert_csv(csv_path, chunksize=args.chunk_size)
+        print(f"{csv_path} -> {output_path} ({os.path.getsize(csv_path)} -> {os.path.getsize(output_path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
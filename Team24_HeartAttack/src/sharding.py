@@ -0,0 +1,124 @@
+import contextlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.event_log import logging_paused
+
+# Priority models loaded by the parent before forking; workers share its pages copy-on-write
+_shared_calculator = None
+
+
+def partition_edge_devices(edge_device_ids: list, num_shards: int) -> list:
+    """Split edge device IDs round-robin into at most `num_shards` non-empty shards"""
+    shards = [edge_device_ids[i::num_shards] for i in range(num_shards)]
+    return [shard for shard in shards if shard]
+
+
+def _run_shard(edge_device_ids: list, cloud_share: float, workload: dict, batch_size: int,
+               instrument: bool = False) -> dict:
+    """Ingest, score and schedule one shard's edge devices in a worker process"""
+    from src.simulation_manager import HealthcareEdgeSystem
+    from src.priority_calculator import PriorityCalculator
+    from src.workload_generator import WorkloadGenerator
+    from src.instrumentation import Instrumentation
+    from src.event_log import configure_logging
+    
+    # Per-task output from many processes would interleave and dominate the run time
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # Writes synchronously: a background writer inherited through fork has no thread in the child
+        configure_logging('WARNING', async_output=False)
+        # Without fork the worker maps the persisted artifact instead of retraining
+        calculator = _shared_calculator or PriorityCalculator(mmap_models=True)
+        # Retraining runs in the parent only; a shard's readings aren't fed back
+        calculator.retrainer = None
+        system = HealthcareEdgeSystem(edge_device_ids, cloud_share, calculator, Instrumentation(instrument))
+        
+        sources = None
+        if workload:
+            generator = WorkloadGenerator(**workload['generator'])
+            sources = system.load_workload(generator, workload['readings_per_device'], batch_size)
+        
+        start = time.perf_counter()
+        system.run_simulation(batch_size, sources)
+        elapsed = time.perf_counter() - start
+    
+    return {
+        'edge_device_ids': edge_device_ids,
+        'elapsed_s': elapsed,
+        'readings': system.readings_ingested(),
+        'tasks_processed': system.tasks_processed,
+        'tasks_rejected': system.tasks_rejected,
+        'metrics': system.metrics,
+        'aggregator': system.aggregator,
+        'pre_aggregators': system.pre_aggregators,
+        'instrumentation': system.instrumentation,
+        'utilization': system.utilization,
+        'cloud_name': system.cloud_device.model_name
+    }
+
+
+def run_sharded(system, num_workers: int, workload: dict = None, batch_size: int = None) -> dict:
+    """Run `system`'s edge devices as shards in a process pool and merge the results into it.
+    
+    Each shard gets its own edge devices and an equal share of the cloud's
+    cores. Spillover and cloud contention are therefore only modelled within
+    a shard. `workload` optionally holds WorkloadGenerator keyword arguments
+    under 'generator' and 'readings_per_device', so workers generate their
+    readings instead of reading CSVs.
+    """
+    global _shared_calculator
+    
+    shards = partition_edge_devices(system.edge_device_ids, num_workers)
+    total_devices = len(system.edge_device_ids)
+    
+    # Load (or train once) before starting workers so no shard re-fits the models
+    system.priority_calculator.ml_model_k
+    system.priority_calculator.edge_model
+    _shared_calculator = system.priority_calculator
+    
+    context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+    start = time.perf_counter()
+    # Workers fork on submit; the parent's log writer thread must not hold a lock at that point
+    with logging_paused(), ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+        futures = [
+            pool.submit(_run_shard, shard, len(shard) / total_devices, workload, batch_size,
+                        system.instrumentation.enabled)
+            for shard in shards
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    _shared_calculator = None
+    
+    # Merge shard results into the parent system
+    for result in results:
+        for name in ('tasks_processed', 'tasks_rejected'):
+            getattr(system, name).extend(result[name])
+            result[name].close()  # Delete the shard's spilled segments now they are merged
+        system.aggregator.merge(result['aggregator'])
+        system.pre_aggregators.update(result['pre_aggregators'])  # Shards own disjoint edge devices
+        system.instrumentation.merge(result['instrumentation'])
+        for name, values in result['metrics'].items():
+            system.metrics[name].extend(values)
+        share = len(result['edge_device_ids']) / total_devices
+        for name, utilization in result['utilization'].items():
+            if name == result['cloud_name']:
+                # Each shard ran on its own slice of the cloud; weight slices by their share
+                system.utilization[name] = system.utilization.get(name, 0.0) + utilization * share
+            else:
+                system.utilization[name] = utilization
+    
+    readings = sum(result['readings'] for result in results)
+    return {
+        'workers': len(shards),
+        'readings': readings,
+        'tasks': len(system.tasks_processed),
+        'elapsed_s': elapsed,
+        'readings_per_s': readings / elapsed if elapsed > 0 else 0.0,
+        'shards': [
+            {'edge_device_ids': r['edge_device_ids'], 'readings': r['readings'], 'tasks': len(r['tasks_processed']),
+             'elapsed_s': r['elapsed_s']}
+            for r in results
+        ]
+    }
@@ -1,8 +1,13 @@
-import edge_sim_py as es
-import pandas as pd
+import heapq
+import logging
 import random
 import sys
 import os
+from typing import TYPE_CHECKING
+
+# pandas is imported where CSVs are read, so building the system doesn't load it
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Add the parent directory to Python path to import our modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,85 +19,178 @@ if parent_dir not in sys.path:
 try:
     from src.models import HealthTask, PatientDatabase
     from src.priority_calculator import PriorityCalculator
-    print("Custom modules imported successfully!")
+    from src.sensor_stream import iter_csv_batches, iter_record_batches
+    from src.sensor_wire import iter_binary_batches
+    from src.event_engine import DiscreteEventEngine
+    from src.scheduler import DeadlinePolicy
+    from src.placement import PlacementEngine, replay_placement
+    from src.task_store import TaskRecordStore
+    from src.metrics import MetricsAggregator
+    from src.pre_aggregation import EdgePreAggregator
+    from src.instrumentation import Instrumentation, profile
+    from src.event_log import TaskEventLogger, flush_logging
+    from src.model_retrainer import ModelRetrainer
+    from config.settings import (SIMULATION_SETTINGS, EDGE_DEVICE_SPECS, CLOUD_DEVICE_SPECS, PLACEMENT_SETTINGS,
+                                 PRE_AGGREGATION_SETTINGS, INSTRUMENTATION_SETTINGS, LOGGING_SETTINGS,
+                                 RETRAINING_SETTINGS, DEADLINE_SETTINGS)
 except ImportError as e:
     print(f"Import error: {e}")
     sys.exit(1)
 
+logger = logging.getLogger('heartattack.simulation')
+
 class HealthcareEdgeSystem:
-    def __init__(self):
+    def __init__(self, edge_device_ids: list = None, cloud_share: float = 1.0,
+                 priority_calculator: PriorityCalculator = None, instrumentation: Instrumentation = None):
         self.simulator = None
-        self.priority_calculator = PriorityCalculator()
+        self.priority_calculator = priority_calculator or PriorityCalculator()
         self.patient_db = PatientDatabase()
+        # Edge devices handled by this system; a shard of a sharded run owns a subset
+        self.edge_device_ids = edge_device_ids or list(range(1, SIMULATION_SETTINGS['num_edge_devices'] + 1))
+        # Fraction of the cloud's capacity available to this system
+        self.cloud_share = cloud_share
         self.edge_devices = []
+        self.edge_devices_by_id = {}
         self.cloud_device = None
-        self.tasks_processed = []
+        # Completed task records, stored column-wise
+        self.tasks_processed = TaskRecordStore(
+            segment_size=SIMULATION_SETTINGS['task_store_segment_size'],
+            spill_dir=SIMULATION_SETTINGS['task_store_spill_dir'],
+            spill_format=SIMULATION_SETTINGS['task_store_format']
+        )
+        # Scored tasks that admission control turned away, kept so replays see every reading
+        self.tasks_rejected = TaskRecordStore(
+            segment_size=SIMULATION_SETTINGS['task_store_segment_size'],
+            spill_dir=SIMULATION_SETTINGS['task_store_spill_dir'],
+            spill_format=SIMULATION_SETTINGS['task_store_format']
+        )
+        # Discrete-event clock; records are added to tasks_processed when their task completes
+        self.scheduler = DiscreteEventEngine(
+            on_complete=self._record_task,
+            utilization_interval=SIMULATION_SETTINGS['utilization_interval'],
+            discipline=DEADLINE_SETTINGS['discipline']
+        )
+        # Every task is due a k/m-dependent time after its reading
+        self.deadline_policy = DeadlinePolicy(DEADLINE_SETTINGS['budgets'], DEADLINE_SETTINGS['m_tightening'])
+        self.placement = None
+        # Running statistics that reports read without a pass over tasks_processed
+        self.aggregator = MetricsAggregator(rate_window=SIMULATION_SETTINGS['rate_window'])
+        # Edge-side stage per device that condenses non-urgent readings before they are scheduled
+        self.pre_aggregators = {
+            edge_id: EdgePreAggregator(
+                PRE_AGGREGATION_SETTINGS['window'],
+                PRE_AGGREGATION_SETTINGS['deadband'],
+                PRE_AGGREGATION_SETTINGS['urgent_threshold']
+            )
+            for edge_id in self.edge_device_ids
+        } if PRE_AGGREGATION_SETTINGS['enabled'] else {}
+        # Per-stage timers; disabled unless INSTRUMENTATION_SETTINGS or the caller turns them on
+        self.instrumentation = instrumentation or Instrumentation(INSTRUMENTATION_SETTINGS['enabled'])
+        # Per-task scheduling decisions go through logging, sampled and off the scoring thread
+        self.task_log = TaskEventLogger(LOGGING_SETTINGS['urgent_threshold'], LOGGING_SETTINGS['sample_every'])
+        self.utilization = {}
         self.metrics = {
-            'latency': [],
             'edge_utilization': [],
             'cloud_utilization': [],
             'tasks_scheduled': []
         }
         
-        # Load patient data for both edge devices
+        # Load patient data for every edge device
         self.setup_patient_data()
         
     def setup_patient_data(self):
-        """Load patient data for both edge devices from CSV files"""
+        """Load patient data for every edge device from CSV files"""
         print("Loading patient data...")
         
-        # Load patients for edge device 1
-        patients_edge1 = self.patient_db.load_patients_from_csv(
-            "data/edge_device_1_patients.csv", 
-            edge_device_id=1
-        )
-        
-        # Load patients for edge device 2  
-        patients_edge2 = self.patient_db.load_patients_from_csv(
-            "data/edge_device_2_patients.csv",
-            edge_device_id=2
-        )
+        patient_counts = {}
+        for edge_id in self.edge_device_ids:
+            patients = self.patient_db.load_patients_from_csv(
+                os.path.join(SIMULATION_SETTINGS['data_dir'], f"edge_device_{edge_id}_patients.csv"),
+                edge_device_id=edge_id
+            )
+            patient_counts[edge_id] = len(patients)
         
-        print(f"Total patients loaded: Edge1={len(patients_edge1)}, Edge2={len(patients_edge2)}")
+        print("Total patients loaded: " + ", ".join(f"Edge{edge_id}={count}" for edge_id, count in patient_counts.items()))
     
     def setup_infrastructure(self):
         """Setup edge devices, cloud, and network using EdgeSimPy"""
         print("Setting up edge computing infrastructure...")
+        # EdgeSimPy is only needed once a simulation is built, not to import this module
+        import edge_sim_py as es
     
         self.simulator = es.Simulator()
     
-        # Create two edge devices (Hospital Workstations)
-        edge_device_1 = es.EdgeServer(
-            model_name="edge_device_1",
-            cpu=8,           # 8 CPU cores
-            memory=16384,    # 16 GB RAM
-            disk=500000      # 500 GB storage
-        )
-    
-        edge_device_2 = es.EdgeServer(
-            model_name="edge_device_2", 
-            cpu=8,
-            memory=16384,
-         disk=500000
-        )
-    
-        self.edge_devices = [edge_device_1, edge_device_2]
+        # One edge device (Hospital Workstation) per configured edge device ID
+        self.edge_devices = [
+            es.EdgeServer(
+                model_name=f"edge_device_{edge_id}",
+                cpu=EDGE_DEVICE_SPECS['cpu_capacity'],
+                memory=EDGE_DEVICE_SPECS['memory_capacity'],
+                disk=EDGE_DEVICE_SPECS['disk_capacity']
+            )
+            for edge_id in self.edge_device_ids
+        ]
+        self.edge_devices_by_id = dict(zip(self.edge_device_ids, self.edge_devices))
     
         # Create cloud device
         self.cloud_device = es.EdgeServer(
             model_name="cloud_dc",
-            cpu=32,
-            memory=65536,
-            disk=2000000
+            cpu=CLOUD_DEVICE_SPECS['cpu_capacity'],
+            memory=CLOUD_DEVICE_SPECS['memory_capacity'],
+            disk=CLOUD_DEVICE_SPECS['disk_capacity']
         )
+        
+        # One priority queue per server, with a slot per CPU core and its memory
+        for edge_device in self.edge_devices:
+            self.scheduler.add_device(
+                edge_device.model_name, EDGE_DEVICE_SPECS['cpu_capacity'], EDGE_DEVICE_SPECS['memory_capacity']
+            )
+        self.scheduler.add_device(
+            self.cloud_device.model_name,
+            max(1, round(CLOUD_DEVICE_SPECS['cpu_capacity'] * self.cloud_share)),
+            # A shard's slice of the cloud must still fit one task
+            max(CLOUD_DEVICE_SPECS['memory_capacity'] * self.cloud_share, SIMULATION_SETTINGS['task_memory_mb'])
+        )
+        
+        # Network links: edge-to-edge over the hospital LAN, edge-to-cloud over the WAN
+        cloud_bandwidth = min(EDGE_DEVICE_SPECS['bandwidth_capacity'], CLOUD_DEVICE_SPECS['bandwidth_capacity'])
+        for edge_device in self.edge_devices:
+            for peer_device in self.edge_devices:
+                if peer_device is not edge_device:
+                    self.scheduler.add_link(
+                        edge_device.model_name, peer_device.model_name,
+                        EDGE_DEVICE_SPECS['bandwidth_capacity'], PLACEMENT_SETTINGS['edge_link_latency']
+                    )
+            self.scheduler.add_link(
+                edge_device.model_name, self.cloud_device.model_name,
+                cloud_bandwidth, PLACEMENT_SETTINGS['cloud_link_latency']
+            )
+        
+        self.placement = self._create_placement_engine(self.scheduler, PLACEMENT_SETTINGS['policy'])
     
         print("Infrastructure setup completed!")
         print(f"- Edge devices: {len(self.edge_devices)}")
         print(f"- Cloud device: {self.cloud_device.model_name}")
     
-    def load_sensor_readings(self, edge_device_id: int) -> pd.DataFrame:
+    def _create_placement_engine(self, scheduler: DiscreteEventEngine, policy: str) -> PlacementEngine:
+        """Placement engine over this system's edge devices and cloud"""
+        return PlacementEngine(
+            scheduler,
+            {edge_id: edge_device.model_name for edge_id, edge_device in self.edge_devices_by_id.items()},
+            self.cloud_device.model_name,
+            lambda task, is_edge: self.calculate_processing_time(task, None, is_edge),
+            PLACEMENT_SETTINGS,
+            EDGE_DEVICE_SPECS['bandwidth_capacity'],
+            CLOUD_DEVICE_SPECS['bandwidth_capacity'],
+            policy,
+            DEADLINE_SETTINGS['admission']
+        )
+    
+    def load_sensor_readings(self, edge_device_id: int) -> 'pd.DataFrame':
         """Load sensor readings for a specific edge device from CSV"""
-        csv_file = f"data/sensor_readings_edge{edge_device_id}.csv"
+        import pandas as pd
+        
+        csv_file = os.path.join(SIMULATION_SETTINGS['data_dir'], f"sensor_readings_edge{edge_device_id}.csv")
         try:
             df = pd.read_csv(csv_file)
             print(f"Loaded {len(df)} sensor readings for edge device {edge_device_id}")
@@ -101,12 +199,155 @@ class HealthcareEdgeSystem:
             print(f"Error loading sensor readings from {csv_file}: {e}")
             return pd.DataFrame()
     
-    def create_health_task(self, sensor_row: pd.Series, edge_device_id: int) -> HealthTask:
+    def stream_sensor_readings(self, edge_device_id: int, batch_size: int):
+        """Stream sensor readings for a specific edge device in bounded-size batches.
+        
+        With SIMULATION_SETTINGS['sensor_format'] = 'binary' the readings come
+        from sensor_readings_edgeN.bin and are decoded a block at a time
+        instead of parsed as CSV text.
+        """
+        binary = SIMULATION_SETTINGS['sensor_format'] == 'binary'
+        sensor_file = os.path.join(SIMULATION_SETTINGS['data_dir'],
+                                   f"sensor_readings_edge{edge_device_id}.{'bin' if binary else 'csv'}")
+        try:
+            if binary:
+                yield from iter_binary_batches(sensor_file, batch_size)
+            else:
+                yield from iter_csv_batches(sensor_file, batch_size)
+        except Exception as e:
+            print(f"Error streaming sensor readings from {sensor_file}: {e}")
+    
+    def create_health_tasks(self, sensor_batch: 'pd.DataFrame', edge_device_id: int) -> tuple[list, list]:
+        """Create HealthTasks and their patients for a batch of sensor readings (a DataFrame or SensorBatch)"""
+        instrumentation = self.instrumentation
+        patient_ids = sensor_batch['patient_id'].tolist()
+        with instrumentation.stage('get_patient', len(patient_ids)):
+            found = [self.patient_db.get_patient(patient_id, edge_device_id) for patient_id in patient_ids]
+        
+        tasks = []
+        patients = []
+        with instrumentation.stage('create_tasks', len(patient_ids)):
+            for patient, patient_id, heart_rate, blood_pressure, glucose_level, timestamp in zip(
+                found,
+                patient_ids,
+                sensor_batch['heart_rate'].tolist(),
+                sensor_batch['blood_pressure'].tolist(),
+                sensor_batch['glucose_level'].tolist(),
+                sensor_batch['timestamp'].tolist()
+            ):
+                if patient is None:
+                    logger.warning("Patient %s not found in database", patient_id)
+                    instrumentation.count('missing_patients')
+                    continue
+                
+                tasks.append(HealthTask(
+                    patient_id=patient_id,
+                    heart_rate=int(heart_rate),
+                    blood_pressure=int(blood_pressure),
+                    glucose_level=float(glucose_level),
+                    task_type=patient.type,
+                    timestamp=float(timestamp),
+                    edge_device_id=edge_device_id
+                ))
+                patients.append(patient)
+        
+        return tasks, patients
+    
+    def process_sensor_batch(self, sensor_batch: 'pd.DataFrame', edge_device_id: int) -> list:
+        """Create, score and schedule one batch of sensor readings"""
+        tasks, patients = self.create_health_tasks(sensor_batch, edge_device_id)
+        
+        # Calculate priority values for the whole batch at once
+        with self.instrumentation.stage('priority', len(tasks)):
+            tasks = self.priority_calculator.calculate_task_priorities(tasks, patients)
+        
+        batch_metrics = []
+        for task in tasks:
+            # Schedule whatever the edge-side stage forwards, based on priority
+            batch_metrics.extend(self.schedule_tasks(self.pre_aggregate(task)))
+        
+        return batch_metrics
+    
+    def process_sensor_batches(self, sensor_batches: dict) -> list:
+        """Score each edge device's batch, then schedule the tasks of all of them in timestamp order.
+    
+        `sensor_batches` maps an edge device ID to its readings, each in
+        timestamp order, so the event engine's clock only moves forward.
+        """
+        scored = []
+        for edge_device_id, sensor_batch in sensor_batches.items():
+            tasks, patients = self.create_health_tasks(sensor_batch, edge_device_id)
+            with self.instrumentation.stage('priority', len(tasks)):
+                scored.append(self.priority_calculator.calculate_task_priorities(tasks, patients))
+    
+        batch_metrics = []
+        for task in heapq.merge(*scored, key=lambda task: task.timestamp):
+            batch_metrics.extend(self.schedule_tasks(self.pre_aggregate(task)))
+        return batch_metrics
+    
+    def schedule_tasks(self, tasks: list) -> list:
+        """Schedule and log tasks in order, returning their metrics"""
+        instrumentation = self.instrumentation
+        batch_metrics = []
+        for task in tasks:
+            with instrumentation.stage('schedule'):
+                task_metrics = self.schedule_task(task)
+            with instrumentation.stage('log'):
+                self._log_task(task, task_metrics)
+            batch_metrics.append(task_metrics)
+        return batch_metrics
+    
+    def readings_ingested(self) -> int:
+        """Sensor readings scored so far; pre-aggregation can turn them into fewer tasks"""
+        if self.pre_aggregators:
+            return sum(pre_aggregator.readings for pre_aggregator in self.pre_aggregators.values())
+        return len(self.tasks_processed) + len(self.tasks_rejected)
+    
+    def pre_aggregate(self, task: HealthTask) -> list:
+        """Pass a scored task through its edge device's pre-aggregation stage"""
+        pre_aggregator = self.pre_aggregators.get(task.edge_device_id)
+        if pre_aggregator is None:
+            return [task]
+        with self.instrumentation.stage('pre_aggregate'):
+            return pre_aggregator.offer(task)
+    
+    def flush_pre_aggregation(self, edge_device_ids: list = None, now: float = None) -> list:
+        """Schedule the summaries of every open window, e.g. once a stream has ended"""
+        batch_metrics = []
+        for edge_id in edge_device_ids or list(self.pre_aggregators):
+            batch_metrics.extend(self.schedule_tasks(self.pre_aggregators[edge_id].flush(now)))
+        return batch_metrics
+    
+    def iter_scored_tasks(self, edge_device_id: int, batch_size: int, sensor_batches=None):
+        """Yield scored tasks for one edge device, scoring a batch at a time"""
+        if sensor_batches is None:
+            sensor_batches = self.stream_sensor_readings(edge_device_id, batch_size)
+        for sensor_batch in self.instrumentation.timed_iter('ingest', sensor_batches):
+            tasks, patients = self.create_health_tasks(sensor_batch, edge_device_id)
+            with self.instrumentation.stage('priority', len(tasks)):
+                tasks = self.priority_calculator.calculate_task_priorities(tasks, patients)
+            yield from tasks
+    
+    def _log_task(self, task: HealthTask, task_metrics: dict):
+        """Log the scheduling decision for one task"""
+        self.task_log.log(task, task_metrics)
+    
+    def process_sensor_stream(self, readings, edge_device_id: int, batch_size: int = None) -> int:
+        """Process readings from a generator or live feed without loading them all"""
+        batch_size = batch_size or SIMULATION_SETTINGS['batch_size']
+        processed = 0
+        for sensor_batch in iter_record_batches(readings, batch_size):
+            processed += len(self.process_sensor_batch(sensor_batch, edge_device_id))
+        if edge_device_id in self.pre_aggregators:
+            processed += len(self.flush_pre_aggregation([edge_device_id]))
+        return processed
+    
+    def create_health_task(self, sensor_row: 'pd.Series', edge_device_id: int) -> HealthTask:
         """Create a HealthTask from sensor reading"""
         patient = self.patient_db.get_patient(sensor_row['patient_id'], edge_device_id)
         
         if patient is None:
-            print(f"Warning: Patient {sensor_row['patient_id']} not found in database")
+            logger.warning("Patient %s not found in database", sensor_row['patient_id'])
             return None
         
         task = HealthTask(
@@ -122,18 +363,27 @@ class HealthcareEdgeSystem:
         return task
     
     def schedule_task(self, task: HealthTask) -> dict:
-        """Schedule task to edge or cloud based on priority (k-value)"""
-        edge_device = self.edge_devices[task.edge_device_id - 1]
-        
-        # Decision logic based on k-value (from research paper)
-        if task.k_value > 1.0:  # Urgent task - schedule on edge
-            target_device = edge_device
-            location = "edge"
-            processing_time = self.calculate_processing_time(task, target_device, is_edge=True)
-        else:  # Non-urgent task - schedule on cloud
-            target_device = self.cloud_device
-            location = "cloud" 
-            processing_time = self.calculate_processing_time(task, target_device, is_edge=False)
+        """Queue task on edge or cloud based on priority (k-value).
+        
+        The task is due a k/m-dependent time after its reading. The
+        device's queue orders it by that deadline (EDF) or by (k, m,
+        arrival time); its queueing delay is filled in when a CPU slot
+        dispatches it. A task rejected by admission control is counted
+        but never queued.
+        """
+        # Placement reads queue state that submit changes; both happen under the engine lock
+        with self.scheduler.lock:
+            return self._place_and_submit(task)
+    
+    def _place_and_submit(self, task: HealthTask) -> dict:
+        """Place a scored task and queue it on the event engine; returns its metrics"""
+        deadline = task.timestamp + self.deadline_policy.relative(task.k_value, task.m_value)
+        # Placement policy decides the device (static k-value threshold or load-aware), then admission control
+        target_name, processing_time, network_delay, admission = self.placement.place(task, deadline)
+        if target_name is None:
+            location = target_name = "rejected"
+        else:
+            location = "cloud" if target_name == self.cloud_device.model_name else "edge"
         
         # Record metrics
         task_metrics = {
@@ -142,19 +392,61 @@ class HealthcareEdgeSystem:
             'k_value': task.k_value,
             'm_value': task.m_value,
             'scheduled_location': location,
+            'target_device': target_name,
             'processing_time': processing_time,
+            'network_delay': network_delay,
+            'memory': SIMULATION_SETTINGS['task_memory_mb'],
+            'timestamp': task.timestamp,
             'edge_device': task.edge_device_id,
             'heart_rate': task.heart_rate,
             'blood_pressure': task.blood_pressure,
-            'glucose_level': task.glucose_level
+            'glucose_level': task.glucose_level,
+            'deadline': deadline,
+            'admission': admission
         }
+        if admission == 'rejected':
+            self._record_rejected(task_metrics)
+            return task_metrics
         
-        self.tasks_processed.append(task_metrics)
+        # The reading arrives at its home edge device and crosses a network link if placed elsewhere;
+        # an edge-side summary of several readings is a compact record
+        payload_kb = PRE_AGGREGATION_SETTINGS['summary_payload_kb'] if task.readings > 1 \
+            else PLACEMENT_SETTINGS['task_payload_kb']
+        submitted = self.scheduler.submit(
+            target_name, task_metrics, task.timestamp,
+            source=self.edge_devices_by_id[task.edge_device_id].model_name,
+            size_bytes=payload_kb * 1024
+        )
+        if not submitted:
+            # More memory than the device has; counted as a deadline miss like an admission rejection
+            task_metrics.update(scheduled_location='rejected', target_device='rejected', admission='rejected')
+            self._record_rejected(task_metrics)
         
         return task_metrics
     
-    def calculate_processing_time(self, task: HealthTask, device, is_edge: bool) -> float:
-        """Calculate processing time based on task complexity and device capability"""
+    def _record_rejected(self, task_metrics: dict):
+        """Record a task that was turned away instead of queued"""
+        self.tasks_rejected.append(task_metrics)
+        self.aggregator.record_rejected(task_metrics)
+    
+    def _record_task(self, task_metrics: dict):
+        """Record a task once its device has dispatched it"""
+        self.tasks_processed.append(task_metrics)
+        self.aggregator.record(task_metrics)
+    
+    def _collect_utilization(self):
+        """Fill the utilization metrics from the event engine's samples"""
+        cloud_name = self.cloud_device.model_name
+        self.metrics['edge_utilization'] = [
+            sample for sample in self.scheduler.utilization_samples if sample['device'] != cloud_name
+        ]
+        self.metrics['cloud_utilization'] = [
+            sample for sample in self.scheduler.utilization_samples if sample['device'] == cloud_name
+        ]
+        self.utilization = {name: self.scheduler.utilization(name) for name in self.scheduler.queues}
+    
+    def calculate_processing_time(self, task: HealthTask, device, is_edge: bool, rng=random) -> float:
+        """Calculate processing time based on task complexity and device capability (expected value if rng is None)"""
         base_processing_time = 0.1  # 100ms base time
         
         # More complex tasks take longer (based on urgency)
@@ -173,95 +465,381 @@ class HealthcareEdgeSystem:
         processing_time = base_processing_time * complexity_factor * device_factor
         
         # Add some randomness to simulate real-world variation
-        processing_time *= random.uniform(0.8, 1.2)
+        if rng is not None:
+            processing_time *= rng.uniform(0.8, 1.2)
         
         return processing_time
     
-    def run_simulation(self):
-        """Run the complete healthcare edge computing simulation"""
+    def load_workload(self, generator, readings_per_device: int, batch_size: int = None) -> dict:
+        """Register a WorkloadGenerator's patients and return its reading streams per edge device.
+        
+        The result can be passed as `sources` to run_simulation or run_realtime
+        so generated readings are processed without being written to disk.
+        """
+        batch_size = batch_size or SIMULATION_SETTINGS['batch_size']
+        sources = {}
+        for edge_id in self.edge_device_ids:
+            self.patient_db.load_patients_from_frame(generator.generate_patients(edge_id), edge_id)
+            sources[edge_id] = generator.iter_reading_batches(edge_id, readings_per_device, batch_size)
+        return sources
+    
+    def run_simulation(self, batch_size: int = None, sources: dict = None, profiler: str = None,
+                       profile_output: str = None):
+        """Run the complete healthcare edge computing simulation.
+        
+        `profiler` ('cprofile' or 'pyinstrument') profiles this run only,
+        writing to `profile_output` if given.
+        """
+        batch_size = batch_size or SIMULATION_SETTINGS['batch_size']
+        sources = sources or {}
+        profiler = profiler or INSTRUMENTATION_SETTINGS['profiler']
+        profile_output = profile_output or INSTRUMENTATION_SETTINGS['profile_output']
+        
         print("\n" + "="*50)
         print("STARTING HEALTHCARE EDGE COMPUTING SIMULATION")
         print("="*50)
         
         self.setup_infrastructure()
         
-        # Process sensor readings for both edge devices
-        for edge_id in [1, 2]:
-            print(f"\nProcessing sensor readings for Edge Device {edge_id}...")
+        with profile(profiler, profile_output):
+            # Score each edge device's stream in bounded batches, then schedule tasks from all
+            # devices in timestamp order so queue and placement state follow one clock
+            scored_streams = [
+                self.iter_scored_tasks(edge_id, batch_size, sources.get(edge_id)) for edge_id in self.edge_device_ids
+            ]
+            now = None
+            for task in heapq.merge(*scored_streams, key=lambda task: task.timestamp):
+                now = task.timestamp
+                self.schedule_tasks(self.pre_aggregate(task))
             
-            sensor_readings = self.load_sensor_readings(edge_id)
+            # Windows still open when the streams end are forwarded at the last reading's time
+            self.flush_pre_aggregation(now=now)
             
-            for _, sensor_row in sensor_readings.iterrows():
-                # Create health task from sensor reading
-                task = self.create_health_task(sensor_row, edge_id)
-                
-                if task is None:
-                    continue
-                
-                # Get patient for priority calculation
-                patient = self.patient_db.get_patient(task.patient_id, edge_id)
-                
-                # Calculate priority values
-                task = self.priority_calculator.calculate_task_priority(task, patient)
-                
-                # Schedule task based on priority
-                task_metrics = self.schedule_task(task)
-                
-                print(f"Time {task.timestamp:6.1f}: {task.task_type:8} task for {task.patient_id} "
-                      f"(HR={task.heart_rate}, BP={task.blood_pressure}, Glucose={task.glucose_level}) "
-                      f"-> k={task.k_value:.2f}, m={task.m_value:.1f} -> "
-                      f"{'EDGE' if task.k_value > 1.0 else 'CLOUD'} "
-                      f"in {task_metrics['processing_time']:.3f}s")
+            # Run the event clock until every queued task has completed
+            with self.instrumentation.stage('drain'):
+                self.scheduler.drain()
+            self._collect_utilization()
         
-        print(f"\nSimulation completed! Processed {len(self.tasks_processed)} tasks.")
+        flush_logging()
+        print(f"\nSimulation completed! Processed {self.readings_ingested()} readings into "
+              f"{len(self.tasks_processed)} tasks.")
+        self.report_instrumentation()
     
-    def analyze_performance(self):
-        """Analyze and display simulation results"""
-        if not self.tasks_processed:
-            print("No tasks processed for analysis.")
+    def enable_retraining(self, executor: str = None) -> ModelRetrainer:
+        """Retrain the specific-patient models in the background on the readings this system scores"""
+        retrainer = ModelRetrainer(
+            self.priority_calculator,
+            buffer_size=RETRAINING_SETTINGS['buffer_size'],
+            min_samples=RETRAINING_SETTINGS['min_samples'],
+            interval=RETRAINING_SETTINGS['interval'],
+            drift_threshold=RETRAINING_SETTINGS['drift_threshold'],
+            drift_window=RETRAINING_SETTINGS['drift_window'],
+            trees_per_retrain=RETRAINING_SETTINGS['trees_per_retrain'],
+            max_estimators=RETRAINING_SETTINGS['max_estimators'],
+            n_jobs=RETRAINING_SETTINGS['n_jobs'],
+            executor=executor or RETRAINING_SETTINGS['executor']
+        )
+        self.priority_calculator.retrainer = retrainer
+        return retrainer
+    
+    def report_instrumentation(self):
+        """Print the per-stage breakdown and export it if configured"""
+        if not self.instrumentation.enabled:
+            return
+        print("\nPipeline Stage Breakdown:")
+        print(self.instrumentation.report())
+        if INSTRUMENTATION_SETTINGS['export_path']:
+            self.instrumentation.export(INSTRUMENTATION_SETTINGS['export_path'], INSTRUMENTATION_SETTINGS['export_format'])
+            print(f"Stage metrics exported to {INSTRUMENTATION_SETTINGS['export_path']}")
+    
+    def run_realtime(self, speedup: float = None, sources: dict = None) -> dict:
+        """Run every edge device as a live node on an asyncio runtime"""
+        import asyncio
+        from src.edge_runtime import AsyncEdgeRuntime
+        
+        print("\n" + "="*50)
+        print("STARTING REAL-TIME EDGE RUNTIME")
+        print("="*50)
+        
+        self.setup_infrastructure()
+        
+        runtime = AsyncEdgeRuntime(
+            self,
+            speedup=speedup if speedup is not None else SIMULATION_SETTINGS['replay_speedup'],
+            queue_size=SIMULATION_SETTINGS['queue_size'],
+            batch_size=SIMULATION_SETTINGS['batch_size'],
+            sources=sources
+        )
+        report = asyncio.run(runtime.run())
+        self.scheduler.drain()
+        self._collect_utilization()
+        
+        flush_logging()
+        print(f"\nReal-time run completed! Processed {self.readings_ingested()} readings into "
+              f"{len(self.tasks_processed)} tasks.")
+        for stats in report.values():
+            print(f"  Edge Device {stats['edge_device']}: {stats['readings']} readings, "
+                  f"{stats['readings_per_s']:.1f} readings/s, "
+                  f"latency p50={stats['latency_p50_ms']:.2f}ms p95={stats['latency_p95_ms']:.2f}ms "
+                  f"p99={stats['latency_p99_ms']:.2f}ms, max queue depth {stats['max_queue_depth']}")
+        self.report_instrumentation()
+        
+        return report
+    
+    def compare_placement_policies(self) -> dict:
+        """Replay every scored task under static and load-aware placement and compare latency.
+        
+        Both placement arms run without admission control, so the static arm
+        is the plain k-value threshold rule. When admission control is
+        configured, load-aware placement with admission is a third arm.
+        """
+        if not self.tasks_processed and not self.tasks_rejected:
+            print("No tasks processed for comparison.")
             return None
         
-        import pandas as pd
+        columns = ['patient_id', 'heart_rate', 'blood_pressure', 'glucose_level', 'task_type',
+                   'k_value', 'm_value', 'timestamp', 'edge_device']
+        tasks = [
+            HealthTask(
+                patient_id=patient_id,
+                heart_rate=int(heart_rate),
+                blood_pressure=int(blood_pressure),
+                glucose_level=float(glucose_level),
+                task_type=task_type,
+                k_value=float(k_value),
+                m_value=float(m_value),
+                timestamp=float(timestamp),
+                edge_device_id=int(edge_device)
+            )
+            for store in (self.tasks_processed, self.tasks_rejected)
+            for segment in store.iter_segments(columns)
+            for patient_id, heart_rate, blood_pressure, glucose_level, task_type, k_value, m_value, timestamp, edge_device
+            in segment.itertuples(index=False, name=None)
+        ]
+        
+        arms = {'static': ('static', None), 'load_aware': ('load_aware', None)}
+        if DEADLINE_SETTINGS['admission']:
+            arms['load_aware+admission'] = ('load_aware', DEADLINE_SETTINGS['admission'])
+        
+        results = {}
+        for arm, (policy, admission) in arms.items():
+            results[arm] = replay_placement(
+                tasks,
+                self.scheduler,
+                {edge_id: edge_device.model_name for edge_id, edge_device in self.edge_devices_by_id.items()},
+                self.cloud_device.model_name,
+                lambda task, is_edge, rng: self.calculate_processing_time(task, None, is_edge, rng),
+                PLACEMENT_SETTINGS,
+                EDGE_DEVICE_SPECS['bandwidth_capacity'],
+                CLOUD_DEVICE_SPECS['bandwidth_capacity'],
+                policy,
+                memory_mb=SIMULATION_SETTINGS['task_memory_mb'],
+                deadline_policy=self.deadline_policy,
+                admission=admission
+            )
+        
+        print("\n" + "="*60)
+        print("PLACEMENT POLICY COMPARISON")
+        print("="*60)
+        for arm, result in results.items():
+            print(f"  {arm:20}: p50={result['latency_p50']:.3f}s, p95={result['latency_p95']:.3f}s, "
+                  f"p99={result['latency_p99']:.3f}s, spilled={result['spilled']}, "
+                  f"offloaded={result['offloaded']}, rejected={result['rejected']}, "
+                  f"deadline misses={result['deadline_miss_rate'] * 100:.2f}%")
+        static_p99 = results['static']['latency_p99']
+        change = (results['load_aware']['latency_p99'] - static_p99) / static_p99 * 100 if static_p99 else 0.0
+        print(f"  p99 latency change vs static threshold: {change:+.1f}%")
+        
+        return results
+    
+    def run_sharded(self, num_workers: int = None, workload: dict = None, batch_size: int = None) -> dict:
+        """Run edge devices as shards across a process pool and merge their results"""
+        from src.sharding import run_sharded
+        
+        num_workers = num_workers or os.cpu_count()
+        batch_size = batch_size or SIMULATION_SETTINGS['batch_size']
         
-        # Convert to DataFrame for easier analysis
-        tasks_df = pd.DataFrame(self.tasks_processed)
+        print("\n" + "="*50)
+        print(f"STARTING SHARDED SIMULATION ({num_workers} workers)")
+        print("="*50)
+        
+        self.setup_infrastructure()
+        summary = run_sharded(self, num_workers, workload, batch_size)
+        
+        print(f"\nSharded simulation completed! Processed {summary['readings']} readings into {summary['tasks']} tasks "
+              f"in {summary['elapsed_s']:.2f}s ({summary['readings_per_s']:.1f} readings/s)")
+        for shard in summary['shards']:
+            print(f"  Edge Devices {shard['edge_device_ids']}: {shard['readings']} readings, {shard['tasks']} tasks "
+                  f"in {shard['elapsed_s']:.2f}s")
+        self.report_instrumentation()
+        
+        return summary
+    
+    def pre_aggregation_savings(self) -> dict:
+        """Upstream bandwidth and cloud compute saved by edge-side pre-aggregation, against CLOUD_DEVICE_SPECS.
+        
+        Without the stage every non-urgent reading would be its own cloud
+        task carrying a full payload.
+        """
+        active = [pre_aggregator for pre_aggregator in self.pre_aggregators.values() if pre_aggregator.readings]
+        if not active:
+            return None
+        
+        duration = max(pre_aggregator.last_timestamp for pre_aggregator in active) - \
+            min(pre_aggregator.first_timestamp for pre_aggregator in active)
+        duration = duration if duration > 0 else 1.0
+        
+        raw_kb = PLACEMENT_SETTINGS['task_payload_kb']
+        aggregated = sum(pre_aggregator.aggregated for pre_aggregator in active)
+        held = sum(pre_aggregator.held for pre_aggregator in active)
+        summaries = sum(pre_aggregator.summaries for pre_aggregator in active)
+        saved_kb = aggregated * raw_kb - held * raw_kb - summaries * PRE_AGGREGATION_SETTINGS['summary_payload_kb']
+        saved_mbps = saved_kb * 1024 * 8 / 1e6 / duration
+        
+        # Expected cloud processing time of the tasks that were never created
+        cpu_seconds = sum(
+            count * self.calculate_processing_time(HealthTask('', 0, 0, 0.0, task_type), None, False, rng=None)
+            for pre_aggregator in active
+            for task_type, count in pre_aggregator.avoided_tasks.items()
+        )
+        
+        return {
+            'readings': sum(pre_aggregator.readings for pre_aggregator in active),
+            'bypassed': sum(pre_aggregator.bypassed for pre_aggregator in active),
+            'aggregated': aggregated,
+            'suppressed': sum(pre_aggregator.suppressed for pre_aggregator in active),
+            'forwarded': held + summaries,
+            'avoided_tasks': sum(sum(pre_aggregator.avoided_tasks.values()) for pre_aggregator in active),
+            'bandwidth_saved_mb': saved_kb / 1024,
+            'bandwidth_saved_mbps': saved_mbps,
+            'bandwidth_saved_pct': saved_mbps / CLOUD_DEVICE_SPECS['bandwidth_capacity'] * 100,
+            'cloud_cpu_seconds_saved': cpu_seconds,
+            'cloud_cores_saved': cpu_seconds / duration,
+            'cloud_cpu_saved_pct': cpu_seconds / duration / CLOUD_DEVICE_SPECS['cpu_capacity'] * 100
+        }
+    
+    def analyze_performance(self, sample_size: int = 10) -> dict:
+        """Analyze and display simulation results from the running aggregator"""
+        # Tasks turned away by admission control still belong in the report
+        if not self.aggregator.tasks and not self.aggregator.rejected:
+            print("No tasks processed for analysis.")
+            return None
+        
+        summary = self.aggregator.snapshot()
+        locations = summary['locations']
         
         print("\n" + "="*60)
         print("PERFORMANCE ANALYSIS RESULTS")
         print("="*60)
         
         # Basic statistics
-        print(f"\nTotal Tasks Processed: {len(tasks_df)}")
-        print(f"Edge Tasks: {len(tasks_df[tasks_df['scheduled_location'] == 'edge'])}")
-        print(f"Cloud Tasks: {len(tasks_df[tasks_df['scheduled_location'] == 'cloud'])}")
+        print(f"\nTotal Tasks Processed: {summary['tasks']}")
+        print(f"Edge Tasks: {locations.get('edge', {}).get('tasks', 0)}")
+        print(f"Cloud Tasks: {locations.get('cloud', {}).get('tasks', 0)}")
+        print(f"Rejected Tasks: {self.aggregator.rejected}")
         
         # Average processing time by location
-        avg_processing = tasks_df.groupby('scheduled_location')['processing_time'].mean()
         print(f"\nAverage Processing Time:")
-        for location, time in avg_processing.items():
-            print(f"  {location.upper()}: {time:.3f}s")
+        for location, stats in locations.items():
+            print(f"  {location.upper()}: {stats['avg_processing_time']:.3f}s")
+        
+        # End-to-end latency: network transfer + queueing + processing
+        print(f"\nEnd-to-end Latency: p50={summary['latency_p50']:.3f}s, "
+              f"p95={summary['latency_p95']:.3f}s, p99={summary['latency_p99']:.3f}s")
+        
+        # Queueing delay is waiting for a CPU slot, separate from processing time
+        print(f"\nAverage Queueing Delay:")
+        for location, stats in locations.items():
+            print(f"  {location.upper()}: {stats['avg_queueing_delay']:.3f}s")
+        
+        print(f"\nQueueing Delay by Urgency:")
+        for urgency, stats in summary['urgency'].items():
+            print(f"  {urgency}: mean={stats['avg_queueing_delay']:.3f}s, max={stats['max_queueing_delay']:.3f}s")
+        
+        # Deadlines met under the queue discipline and admission control
+        deadlines = summary['deadlines']
+        print(f"\nDeadlines ({DEADLINE_SETTINGS['discipline'].upper()} queues, "
+              f"admission {DEADLINE_SETTINGS['admission'] or 'off'}):")
+        print(f"  Miss rate: {deadlines['miss_rate'] * 100:.2f}% ({deadlines['misses']} completed late, "
+              f"{deadlines['rejected']} rejected), {deadlines['offloaded']} offloaded to meet their deadline")
+        for urgency, stats in deadlines['urgency'].items():
+            print(f"  {urgency}: {stats['miss_rate'] * 100:.2f}% missed ({stats['misses']} late, "
+                  f"{stats['rejected']} rejected of {stats['tasks']})")
+        print(f"  Slack of on-time tasks: p5={deadlines['slack_p5']:.3f}s, p50={deadlines['slack_p50']:.3f}s, "
+              f"p95={deadlines['slack_p95']:.3f}s")
+        if deadlines['misses']:
+            print(f"  Lateness of late tasks: p50={deadlines['lateness_p50']:.3f}s, "
+                  f"p99={deadlines['lateness_p99']:.3f}s, max={deadlines['lateness_max']:.3f}s")
+        
+        # Offered load above the completion rate means the system ran overloaded
+        throughput = summary['throughput']
+        print(f"\nThroughput: {throughput['offered']:.1f} tasks/s offered, {throughput['completed']:.1f} tasks/s "
+              f"completed, {throughput['on_time']:.1f} tasks/s on time")
+        
+        # Server utilization from the discrete-event clock
+        if self.utilization:
+            print(f"\nAverage CPU Utilization:")
+            for name, utilization in self.utilization.items():
+                print(f"  {name}: {utilization * 100:.1f}%")
         
         # Priority distribution
         print(f"\nPriority Distribution (k-value):")
-        urgent_tasks = len(tasks_df[tasks_df['k_value'] > 1.0])
-        non_urgent_tasks = len(tasks_df[tasks_df['k_value'] <= 1.0])
-        print(f"  Urgent (k > 1.0): {urgent_tasks}")
-        print(f"  Non-urgent (k ≤ 1.0): {non_urgent_tasks}")
+        print(f"  Urgent (k > 1.0): {summary['urgent_tasks']}")
+        print(f"  Non-urgent (k ≤ 1.0): {summary['tasks'] - summary['urgent_tasks']}")
         
         # Task type distribution
-        task_type_counts = tasks_df['task_type'].value_counts()
         print(f"\nTask Type Distribution:")
-        for task_type, count in task_type_counts.items():
+        for task_type, count in summary['task_types'].items():
             print(f"  {task_type}: {count}")
         
-        # Edge device distribution
-        edge_counts = tasks_df['edge_device'].value_counts().sort_index()
+        # Edge device distribution and completion rate over the last rate window
         print(f"\nTasks per Edge Device:")
-        for edge_id, count in edge_counts.items():
-            print(f"  Edge Device {edge_id}: {count} tasks")
+        for edge_id, count in summary['edge_tasks'].items():
+            print(f"  Edge Device {edge_id}: {count} tasks, {summary['edge_rates'][edge_id]:.1f} tasks/s recently")
+        
+        # Readings condensed at the edge before offload
+        savings = self.pre_aggregation_savings()
+        if savings:
+            summary['pre_aggregation'] = savings
+            print(f"\nEdge Pre-aggregation: {savings['readings']} readings, {savings['bypassed']} urgent bypassed, "
+                  f"{savings['aggregated']} aggregated ({savings['suppressed']} unchanged) into "
+                  f"{savings['forwarded']} forwarded tasks")
+            print(f"  Bandwidth saved: {savings['bandwidth_saved_mb']:.2f} MB "
+                  f"({savings['bandwidth_saved_mbps']:.4f} Mbps, {savings['bandwidth_saved_pct']:.4f}% of cloud link)")
+            print(f"  Cloud compute saved: {savings['cloud_cpu_seconds_saved']:.1f} CPU-s "
+                  f"({savings['cloud_cores_saved']:.3f} cores, {savings['cloud_cpu_saved_pct']:.2f}% of cloud CPU)")
+        
+        # Repeated specific-patient readings served from the priority cache
+        cache = self.priority_calculator.priority_cache
+        if cache is not None:
+            summary['priority_cache'] = cache.stats()
+            print(f"\nPriority Cache: {cache.hits} hits, {cache.misses} misses "
+                  f"({summary['priority_cache']['hit_rate'] * 100:.1f}% hit rate)")
+        
+        # Readings whose vital-sign trend raised their priority
+        history = self.priority_calculator.vital_history
+        if history is not None:
+            summary['vital_history'] = dict(history.stats(), escalations=self.priority_calculator.trend_escalations)
+            print(f"\nVital History: {summary['vital_history']['patients']} patients tracked "
+                  f"({summary['vital_history']['memory_mb']:.1f} MB, {history.evictions} evicted), "
+                  f"{self.priority_calculator.trend_escalations} readings escalated by trend")
+        
+        # Background retraining on the readings scored during the run
+        retrainer = self.priority_calculator.retrainer
+        if retrainer is not None:
+            retrainer.wait()
+            summary['retraining'] = retrainer.stats()
+            print(f"\nModel Retraining: {retrainer.observed} specific readings observed, "
+                  f"{len(retrainer.history)} retrains, current drift {summary['retraining']['drift']:.3f}")
+            for entry in retrainer.history:
+                print(f"  v{entry['version']} ({entry['trigger']}, {entry['samples']} readings): "
+                      f"train {entry['train_s']:.2f}s, distill {entry['distill_s']:.2f}s, "
+                      f"swap stall {entry['swap_us']:.1f}us")
         
-        # Display tasks for verification
-        print(f"\nAll Tasks Processed:")
-        print(tasks_df.to_string(index=False))
+        # A few records for verification; the full set is in tasks_processed
+        if sample_size and self.tasks_processed:
+            print(f"\nSample of Tasks Processed (first {sample_size}):")
+            sample = next(self.tasks_processed.iter_segments()).head(sample_size)
+            print(sample.to_string(index=False))
         
-        return tasks_df
\ No newline at end of file
+        return summary
@@ -0,0 +1,236 @@
+import importlib.util
+import json
+import os
+import uuid
+import weakref
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+# pandas is only imported to spill, read back or analyse records, not to fill the store
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas needs pyarrow for Parquet/Feather segments; it is found here but only imported when spilling
+HAVE_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+# Columns stored as integer codes into a per-store category list
+CATEGORICAL_COLUMNS = ('patient_id', 'task_type', 'scheduled_location', 'target_device')
+
+TASK_RECORD_DTYPE = np.dtype([
+    ('patient_id', np.int32),
+    ('task_type', np.uint8),
+    ('scheduled_location', np.uint8),
+    ('target_device', np.uint16),
+    ('edge_device', np.int32),
+    ('k_value', np.float64),
+    ('m_value', np.float64),
+    ('heart_rate', np.int32),
+    ('blood_pressure', np.int32),
+    ('glucose_level', np.float64),
+    ('memory', np.float64),
+    ('timestamp', np.float64),
+    ('processing_time', np.float64),
+    ('network_delay', np.float64),
+    ('arrival_time', np.float64),
+    ('start_time', np.float64),
+    ('completion_time', np.float64),
+    ('queueing_delay', np.float64),
+    ('latency', np.float64),
+    ('deadline', np.float64)
+])
+
+
+class TaskRecordStore:
+    """Columnar store of completed task records.
+
+    Records are copied into a preallocated NumPy structured array that
+    doubles in size as it fills. String fields are encoded as integer codes
+    (see CATEGORICAL_COLUMNS). When `spill_dir` is set, every `segment_size`
+    records are written out as a segment file (Parquet or Feather with
+    pyarrow, .npy otherwise) and the buffer is reused, so memory stays
+    bounded on long runs. Analysis reads one segment at a time. Segment
+    names carry a per-store ID, so several stores (e.g. shard workers
+    and the parent merging them) can spill into the same directory.
+
+    Segments are readable on their own: Parquet/Feather files hold the
+    string columns as dictionary-encoded categoricals, and each .npy file
+    has a .categories.json sidecar mapping its codes. They are deleted by
+    close() or once the store is garbage-collected; pickling hands them to
+    the copy, so a shard's segments outlive the worker that wrote them.
+    """
+
+    def __init__(self, segment_size: int = 100000, spill_dir: str = None, spill_format: str = 'parquet',
+                 initial_capacity: int = 1024):
+        self.segment_size = segment_size
+        self.spill_dir = spill_dir
+        self.spill_format = spill_format if HAVE_PYARROW else 'npy'  # Segments fall back to .npy files
+        self.buffer = np.empty(min(initial_capacity, segment_size), dtype=TASK_RECORD_DTYPE)
+        self.size = 0  # Records in the in-memory buffer
+        self.segments = []  # Paths of spilled segments
+        self.store_id = uuid.uuid4().hex
+        self.spilled = 0    # Records in spilled segments
+        self.categories = {name: [] for name in CATEGORICAL_COLUMNS}
+        self._codes = {name: {} for name in CATEGORICAL_COLUMNS}
+        # Deletes the spilled files; shares the segments list so it sees every later spill
+        self._cleanup = weakref.finalize(self, _remove_segments, self.segments)
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return self.spilled + self.size
+
+    def _encode(self, name: str, value) -> int:
+        """Integer code for a categorical value, adding it on first use"""
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.categories[name])
+            self.categories[name].append(value)
+        return code
+
+    def _reserve(self, count: int):
+        """Make room for `count` more records, spilling or growing the buffer"""
+        if self.spill_dir and self.size + count > self.segment_size and self.size:
+            self.spill()
+        if self.size + count > len(self.buffer):
+            capacity = max(len(self.buffer) * 2, self.size + count)
+            if self.spill_dir:
+                capacity = max(min(capacity, self.segment_size), self.size + count)
+            buffer = np.empty(capacity, dtype=TASK_RECORD_DTYPE)
+            buffer[:self.size] = self.buffer[:self.size]
+            self.buffer = buffer
+
+    def append(self, record: dict):
+        """Copy one completed task record into the store"""
+        self._reserve(1)
+        row = self.buffer[self.size]
+        for name in TASK_RECORD_DTYPE.names:
+            value = record.get(name, 0)
+            row[name] = self._encode(name, value) if name in CATEGORICAL_COLUMNS else value
+        self.size += 1
+
+    def append_frame(self, frame: 'pd.DataFrame'):
+        """Append decoded records, e.g. a segment read from another store"""
+        count = len(frame)
+        if count == 0:
+            return
+        self._reserve(count)
+        rows = self.buffer[self.size:self.size + count]
+        for name in TASK_RECORD_DTYPE.names:
+            values = frame[name].to_numpy() if name in frame else 0
+            if name in CATEGORICAL_COLUMNS:
+                values = np.fromiter((self._encode(name, value) for value in values), dtype=np.int64, count=count)
+            rows[name] = values
+        self.size += count
+
+    def extend(self, other: 'TaskRecordStore'):
+        """Append every record of another store, re-encoding its categories"""
+        for frame in other.iter_segments():
+            self.append_frame(frame)
+
+    def spill(self):
+        """Write the in-memory records out as a segment and reset the buffer"""
+        if not self.size:
+            return
+        path = os.path.join(self.spill_dir, f"tasks_{self.store_id}_{len(self.segments):05d}.{self.spill_format}")
+        records = self.buffer[:self.size]
+        if self.spill_format == 'npy':
+            np.save(path, records)
+            with open(_categories_path(path), 'w') as f:
+                json.dump({name: self.categories[name] for name in CATEGORICAL_COLUMNS}, f)
+        else:
+            import pandas as pd
+            frame = pd.DataFrame({name: self._decode(name, records[name]) for name in TASK_RECORD_DTYPE.names})
+            if self.spill_format == 'feather':
+                frame.to_feather(path)
+            else:
+                frame.to_parquet(path, index=False)
+        self.segments.append(path)
+        self.spilled += self.size
+        self.size = 0
+
+    def _read_segment(self, path: str, columns: list) -> dict:
+        """Raw (encoded) columns of one spilled segment"""
+        if path.endswith('.npy'):
+            records = np.load(path, mmap_mode='r')
+            return {name: np.asarray(records[name]) for name in columns}
+        import pandas as pd
+        if path.endswith('.feather'):
+            frame = pd.read_feather(path, columns=columns)
+        else:
+            frame = pd.read_parquet(path, columns=columns)
+        # Categories only grow, so the segment's are a prefix of the store's; re-map to be safe
+        return {
+            name: frame[name].cat.set_categories(self.categories[name]).cat.codes.to_numpy()
+            if name in CATEGORICAL_COLUMNS else frame[name].to_numpy()
+            for name in columns
+        }
+
+    def _decode(self, name: str, codes: np.ndarray):
+        if name not in CATEGORICAL_COLUMNS:
+            return codes
+        import pandas as pd
+        return pd.Categorical.from_codes(codes.astype(np.int64), categories=self.categories[name])
+
+    def iter_segments(self, columns: list = None):
+        """Yield one DataFrame per segment (spilled, then in-memory) with only `columns`"""
+        import pandas as pd
+        columns = list(columns or TASK_RECORD_DTYPE.names)
+        for path in self.segments:
+            raw = self._read_segment(path, columns)
+            yield pd.DataFrame({name: self._decode(name, raw[name]) for name in columns})
+        if self.size:
+            records = self.buffer[:self.size]
+            yield pd.DataFrame({name: self._decode(name, records[name].copy()) for name in columns})
+
+    def column(self, name: str) -> np.ndarray:
+        """One column across all segments; categorical columns are returned as their values"""
+        parts = [np.asarray(frame[name]) for frame in self.iter_segments([name])]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=TASK_RECORD_DTYPE[name])
+
+    def to_frame(self, columns: list = None) -> 'pd.DataFrame':
+        """Every record as one DataFrame"""
+        import pandas as pd
+        frames = list(self.iter_segments(columns))
+        if not frames:
+            return pd.DataFrame(columns=list(columns or TASK_RECORD_DTYPE.names))
+        return pd.concat(frames, ignore_index=True)
+
+    def close(self):
+        """Delete the spilled segments this store owns and drop every record"""
+        if self._cleanup is not None:
+            self._cleanup()
+        self.segments = []
+        self._cleanup = weakref.finalize(self, _remove_segments, self.segments)
+        self.spilled = 0
+        self.size = 0
+
+    def __getstate__(self):
+        # Only ship the filled part of the buffer between processes
+        state = self.__dict__.copy()
+        state['buffer'] = self.buffer[:self.size].copy()
+        # The copy takes over the spilled files, e.g. a shard worker's store returned to the parent
+        state['_cleanup'] = self._cleanup is not None and self._cleanup.detach() is not None
+        self._cleanup = None
+        return state
+
+    def __setstate__(self, state):
+        owns_segments = state.pop('_cleanup')
+        self.__dict__.update(state)
+        self._cleanup = weakref.finalize(self, _remove_segments, self.segments) if owns_segments else None
+
+
+def _categories_path(path: str) -> str:
+    """Sidecar holding the category lists of a .npy segment"""
+    return os.path.splitext(path)[0] + '.categories.json'
+
+
+def _remove_segments(segments: list):
+    """Delete spilled segment files (and .npy sidecars) that still exist"""
+    for path in segments:
+        for name in (path, _categories_path(path)) if path.endswith('.npy') else (path,):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,194 @@
+import collections
+
+import numpy as np
+
+VITALS = ('heart_rate', 'blood_pressure', 'glucose_level')
+
+# Running-sum columns per slot, each vital (HR, BP, glucose) at offsets 0-2 of its group;
+# times are relative to the slot's origin
+_N, _ST, _STT = 0, 1, 2
+_SV = 3     # sum of values
+_STV = 6    # sum of time * value
+_SVV = 9    # sum of squared values
+_SUMS = 12
+
+
+class VitalHistory:
+    """Rolling window of each patient's last `window` readings with O(1) trend statistics.
+
+    Storage is preallocated for `max_patients` slots, each holding the
+    timestamps and (HR, BP, glucose) of its window plus running sums, so
+    the memory budget is fixed. Every reading adds its terms to the sums
+    and removes the terms of the reading it overwrites; rolling mean,
+    variance and least-squares slope follow from the sums directly. When
+    a slot's ring wraps its sums are recomputed from the buffer, which
+    keeps rounding error from accumulating at amortized O(1) cost.
+
+    A patient silent for longer than `idle_timeout` seconds starts a
+    fresh window, and its slot goes to a new patient when none are free;
+    otherwise the least recently updated patient is evicted.
+    """
+
+    def __init__(self, window: int = 32, max_patients: int = 10000, idle_timeout: float = 600.0):
+        self.window = window
+        self.max_patients = max_patients
+        self.idle_timeout = idle_timeout
+
+        self.times = np.zeros((max_patients, window))
+        self.values = np.zeros((max_patients, window, len(VITALS)))
+        # Flat views of the same memory for the per-reading path; indexing them yields plain floats
+        self._times = memoryview(self.times).cast('B').cast('d')
+        self._values = memoryview(self.values).cast('B').cast('d')
+        # Running sums per slot as fixed-length float lists, the cheapest to update one reading at a time
+        self.sums = [[0.0] * _SUMS for _ in range(max_patients)]
+        self.origin = [0.0] * max_patients       # Time subtracted before summing, for precision
+        self.count = [0] * max_patients          # Readings in each slot's window
+        self.head = [0] * max_patients           # Next ring position to write
+        self.last_time = [0.0] * max_patients
+
+        self.slots = collections.OrderedDict()   # patient_id -> slot, least recently updated first
+        self.free = list(range(max_patients - 1, -1, -1))
+        self.evictions = 0
+
+    def _slot(self, patient_id, timestamp: float) -> int:
+        """Slot for a patient's reading, starting a fresh window if needed"""
+        slot = self.slots.get(patient_id)
+        if slot is not None:
+            self.slots.move_to_end(patient_id)
+            if timestamp - self.last_time[slot] > self.idle_timeout:
+                self._reset(slot, timestamp)
+            return slot
+
+        self.evict_idle(timestamp)
+        if not self.free:
+            _, slot = self.slots.popitem(last=False)
+            self.evictions += 1
+            self.free.append(slot)
+        slot = self.free.pop()
+        self.slots[patient_id] = slot
+        self._reset(slot, timestamp)
+        return slot
+
+    def _reset(self, slot: int, timestamp: float):
+        self.count[slot] = 0
+        self.head[slot] = 0
+        self.sums[slot][:] = [0.0] * _SUMS
+        self.origin[slot] = timestamp
+
+    def evict_idle(self, now: float):
+        """Free the slots of patients with no reading in the last idle_timeout seconds"""
+        while self.slots:
+            patient_id, slot = next(iter(self.slots.items()))
+            if now - self.last_time[slot] <= self.idle_timeout:
+                return
+            del self.slots[patient_id]
+            self.free.append(slot)
+            self.evictions += 1
+
+    def update(self, patient_id, timestamp: float, heart_rate: float, blood_pressure: float,
+               glucose_level: float) -> int:
+        """Add one reading to the patient's window; returns its slot"""
+        slot = self._slot(patient_id, timestamp)
+        position = self.head[slot]
+        index = slot * self.window + position
+        origin = self.origin[slot]
+        times = self._times
+        values = self._values
+        sums = self.sums[slot]
+
+        # Terms of the reading being overwritten, zero while the window is filling
+        if self.count[slot] == self.window:
+            old_t = times[index] - origin
+            old_hr, old_bp, old_glucose = values[3 * index], values[3 * index + 1], values[3 * index + 2]
+        else:
+            old_t = old_hr = old_bp = old_glucose = 0.0
+            self.count[slot] += 1
+            sums[_N] += 1.0
+
+        times[index] = timestamp
+        values[3 * index] = heart_rate
+        values[3 * index + 1] = blood_pressure
+        values[3 * index + 2] = glucose_level
+        self.head[slot] = (position + 1) % self.window
+        self.last_time[slot] = timestamp
+        if self.head[slot] == 0:
+            self._recompute(slot)
+            return slot
+
+        t = timestamp - origin
+        sums[_ST] += t - old_t
+        sums[_STT] += t * t - old_t * old_t
+        sums[_SV] += heart_rate - old_hr
+        sums[_SV + 1] += blood_pressure - old_bp
+        sums[_SV + 2] += glucose_level - old_glucose
+        sums[_STV] += t * heart_rate - old_t * old_hr
+        sums[_STV + 1] += t * blood_pressure - old_t * old_bp
+        sums[_STV + 2] += t * glucose_level - old_t * old_glucose
+        sums[_SVV] += heart_rate * heart_rate - old_hr * old_hr
+        sums[_SVV + 1] += blood_pressure * blood_pressure - old_bp * old_bp
+        sums[_SVV + 2] += glucose_level * glucose_level - old_glucose * old_glucose
+        return slot
+
+    def _recompute(self, slot: int):
+        """Exact sums over a full window, re-anchored at its oldest reading"""
+        times = self.times[slot]
+        values = self.values[slot]
+        origin = self.origin[slot] = float(times.min())
+        t = times - origin
+        self.sums[slot][:] = [float(len(t)), float(t.sum()), float(t @ t),
+                              *values.sum(axis=0).tolist(), *(t @ values).tolist(),
+                              *(values * values).sum(axis=0).tolist()]
+
+    def observe_batch(self, patient_ids, timestamps, heart_rate, blood_pressure, glucose_level) -> dict:
+        """Add readings in order and return each patient's trend right after its reading.
+
+        The result holds arrays over the readings: `count` readings in the
+        window, per-vital (HR, BP, glucose) `mean`, `variance` and `slope`
+        (units per second), and `lag`, the reading's time minus the
+        window's mean time, so mean + slope * (lag + h) projects the trend
+        h seconds ahead.
+        """
+        snapshots = []
+        now = []
+        for reading in zip(patient_ids, timestamps, heart_rate, blood_pressure, glucose_level):
+            slot = self.update(*reading)
+            snapshots.append(self.sums[slot][:])
+            now.append(reading[1] - self.origin[slot])
+        return self.statistics(np.array(snapshots, dtype=float).reshape(-1, _SUMS), np.array(now, dtype=float))
+
+    @staticmethod
+    def statistics(sums: np.ndarray, now: np.ndarray) -> dict:
+        """Trend statistics from stacked running sums (see observe_batch)"""
+        count = sums[:, _N]
+        mean_t = sums[:, _ST] / count
+        mean = sums[:, _SV:_SV + 3] / count[:, None]
+        variance = np.maximum(sums[:, _SVV:_SVV + 3] / count[:, None] - mean * mean, 0.0)
+        # Least-squares slope: cov(t, v) / var(t), zero until the window spans some time
+        var_t = sums[:, _STT] / count - mean_t * mean_t
+        cov_tv = sums[:, _STV:_STV + 3] / count[:, None] - mean_t[:, None] * mean
+        spans_time = var_t > 1e-12
+        slope = np.zeros_like(mean)
+        slope[spans_time] = cov_tv[spans_time] / var_t[spans_time, None]
+        return {
+            'count': count.astype(int),
+            'mean': mean,
+            'variance': variance,
+            'slope': slope,
+            'lag': now - mean_t
+        }
+
+    def trend(self, patient_id):
+        """Current trend statistics for one patient (arrays of length 1), or None if not tracked"""
+        slot = self.slots.get(patient_id)
+        if slot is None:
+            return None
+        return self.statistics(np.array([self.sums[slot]]), np.array([self.last_time[slot] - self.origin[slot]]))
+
+    def stats(self) -> dict:
+        """Tracked patients, evictions and the fixed size of the reading buffers"""
+        return {
+            'patients': len(self.slots),
+            'capacity': self.max_patients,
+            'evictions': self.evictions,
+            'memory_mb': (self.times.nbytes + self.values.nbytes) / 2**20
+        }
@@ -0,0 +1,189 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.sensor_stream import SENSOR_COLUMNS
+
+PATIENT_COLUMNS = ['patient_id', 'type', 'age', 'height', 'weight', 'gender']
+
+ARRIVAL_PROCESSES = ('steady', 'bursty', 'diurnal')
+
+
+class WorkloadGenerator:
+    """Seedable generator of patient tables and sensor streams in the shipped CSV schemas.
+    
+    Readings arrive per edge device as a Poisson process at `rate` readings/s:
+    - steady: constant rate
+    - bursty: `burst_factor` times the rate for `burst_duration` seconds every `burst_period`
+    - diurnal: rate follows a 24-hour sine wave between (1 - amplitude) and (1 + amplitude)
+    A fraction `anomaly_rate` of readings pushes one vital sign far outside its normal range.
+    """
+    
+    def __init__(self, num_edge_devices: int = 2, patients_per_device: int = 100,
+                 specific_ratio: float = 0.5, arrival_process: str = 'steady', rate: float = 10.0,
+                 anomaly_rate: float = 0.05, burst_factor: float = 20.0, burst_period: float = 60.0,
+                 burst_duration: float = 5.0, diurnal_amplitude: float = 0.8, seed: int = None):
+        if arrival_process not in ARRIVAL_PROCESSES:
+            raise ValueError(f"arrival_process must be one of {ARRIVAL_PROCESSES}, got {arrival_process!r}")
+        self.num_edge_devices = num_edge_devices
+        self.patients_per_device = patients_per_device
+        self.specific_ratio = specific_ratio
+        self.arrival_process = arrival_process
+        self.rate = rate
+        self.anomaly_rate = anomaly_rate
+        self.burst_factor = burst_factor
+        self.burst_period = burst_period
+        self.burst_duration = burst_duration
+        self.diurnal_amplitude = diurnal_amplitude
+        self.seed = seed
+    
+    def _rng(self, edge_device_id: int, stream: int) -> np.random.Generator:
+        """Independent generator per (device, stream) so outputs don't depend on call order"""
+        return np.random.default_rng([self.seed if self.seed is not None else np.random.SeedSequence().entropy,
+                                      edge_device_id, stream])
+    
+    def patient_ids(self, edge_device_id: int) -> list[str]:
+        """Patient IDs on an edge device, unique across devices.
+        
+        The separator keeps them unique however many devices and patients
+        there are; zero padding alone would make device 1 patient 100000
+        and device 11 patient 0 both P001100000.
+        """
+        return [f"P{edge_device_id:03d}-{i:05d}" for i in range(self.patients_per_device)]
+    
+    def generate_patients(self, edge_device_id: int) -> pd.DataFrame:
+        """Patient table for one edge device in the edge_device_N_patients.csv schema"""
+        rng = self._rng(edge_device_id, 0)
+        n = self.patients_per_device
+        is_male = rng.random(n) < 0.5
+        return pd.DataFrame({
+            'patient_id': self.patient_ids(edge_device_id),
+            'type': np.where(rng.random(n) < self.specific_ratio, 'specific', 'general'),
+            'age': rng.integers(18, 90, n),
+            'height': np.round(np.where(is_male, 175, 162) + rng.normal(0, 7, n)).astype(int),
+            'weight': np.round(np.where(is_male, 80, 65) + rng.normal(0, 10, n)).astype(int),
+            'gender': np.where(is_male, 'M', 'F')
+        }, columns=PATIENT_COLUMNS)
+    
+    def _rate_at(self, t: np.ndarray) -> np.ndarray:
+        """Arrival rate (readings/s) at times `t`"""
+        if self.arrival_process == 'bursty':
+            in_burst = (t % self.burst_period) < self.burst_duration
+            return np.where(in_burst, self.rate * self.burst_factor, self.rate)
+        if self.arrival_process == 'diurnal':
+            return self.rate * (1 + self.diurnal_amplitude * np.sin(2 * np.pi * t / 86400))
+        return np.full(len(t), self.rate)
+    
+    def _max_rate(self) -> float:
+        if self.arrival_process == 'bursty':
+            return self.rate * self.burst_factor
+        if self.arrival_process == 'diurnal':
+            return self.rate * (1 + self.diurnal_amplitude)
+        return self.rate
+    
+    def _arrival_times(self, rng: np.random.Generator, n: int, start: float) -> np.ndarray:
+        """Next `n` arrival times after `start`, by thinning a Poisson process at the peak rate"""
+        max_rate = self._max_rate()
+        times = []
+        collected = 0
+        while collected < n:
+            candidates = start + np.cumsum(rng.exponential(1 / max_rate, max(n - collected, 64) * 2))
+            start = candidates[-1]
+            if self.arrival_process != 'steady':
+                candidates = candidates[rng.random(len(candidates)) * max_rate < self._rate_at(candidates)]
+            times.append(candidates)
+            collected += len(candidates)
+        return np.concatenate(times)[:n]
+    
+    def _vitals(self, rng: np.random.Generator, baselines: np.ndarray, patient_index: np.ndarray) -> np.ndarray:
+        """Integer (HR, BP, glucose) per reading around each patient's baseline, with anomalies"""
+        n = len(patient_index)
+        vitals = baselines[patient_index] + rng.normal(0, [3, 3, 5], (n, 3))
+        
+        # Anomalous readings: one vital sign jumps to a critical value
+        anomalous = np.flatnonzero(rng.random(n) < self.anomaly_rate)
+        parameter = rng.integers(0, 3, len(anomalous))
+        critical = np.array([[130, 190], [150, 200], [180, 300]])[parameter]
+        vitals[anomalous, parameter] = rng.uniform(critical[:, 0], critical[:, 1])
+        
+        return np.round(vitals).astype(int)
+    
+    def iter_reading_batches(self, edge_device_id: int, num_readings: int, batch_size: int = 100000):
+        """Yield sensor readings for one edge device as DataFrames in the sensor CSV schema"""
+        rng = self._rng(edge_device_id, 1)
+        patient_ids = np.array(self.patient_ids(edge_device_id))
+        # Per-patient resting baselines inside the normal ranges
+        baselines = np.column_stack([
+            rng.normal(75, 8, self.patients_per_device),
+            rng.normal(108, 7, self.patients_per_device),
+            rng.normal(100, 12, self.patients_per_device)
+        ])
+        
+        timestamp = 0.0
+        for offset in range(0, num_readings, batch_size):
+            n = min(batch_size, num_readings - offset)
+            timestamps = self._arrival_times(rng, n, timestamp)
+            timestamp = timestamps[-1]
+            patient_index = rng.integers(0, self.patients_per_device, n)
+            vitals = self._vitals(rng, baselines, patient_index)
+            yield pd.DataFrame({
+                'patient_id': patient_ids[patient_index],
+                'heart_rate': vitals[:, 0],
+                'blood_pressure': vitals[:, 1],
+                'glucose_level': vitals[:, 2],
+                'timestamp': np.round(timestamps, 3)
+            }, columns=SENSOR_COLUMNS)
+    
+    def iter_readings(self, edge_device_id: int, num_readings: int, batch_size: int = 100000):
+        """Yield readings one at a time as tuples in SENSOR_COLUMNS order, without touching disk"""
+        for batch in self.iter_reading_batches(edge_device_id, num_readings, batch_size):
+            yield from batch.itertuples(index=False, name=None)
+    
+    def write_dataset(self, output_dir: str, readings_per_device: int, chunk_size: int = 100000):
+        """Write edge_device_N_patients.csv and sensor_readings_edgeN.csv for every edge device"""
+        os.makedirs(output_dir, exist_ok=True)
+        for edge_device_id in range(1, self.num_edge_devices + 1):
+            self.generate_patients(edge_device_id).to_csv(
+                os.path.join(output_dir, f"edge_device_{edge_device_id}_patients.csv"), index=False
+            )
+            
+            sensor_path = os.path.join(output_dir, f"sensor_readings_edge{edge_device_id}.csv")
+            # Chunks are appended so multi-million-reading files never sit in memory
+            for i, batch in enumerate(self.iter_reading_batches(edge_device_id, readings_per_device, chunk_size)):
+                batch.to_csv(sensor_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            
+            print(f"Generated {self.patients_per_device} patients and {readings_per_device} readings "
+                  f"for edge device {edge_device_id}")
+
+
+def main():
+    """Command line entry point: python -m src.workload_generator --output data/generated ..."""
+    parser = argparse.ArgumentParser(description="Generate synthetic patient and sensor workloads")
+    parser.add_argument('--output', default='data/generated', help="output directory")
+    parser.add_argument('--devices', type=int, default=2, help="number of edge devices")
+    parser.add_argument('--patients', type=int, default=100, help="patients per edge device")
+    parser.add_argument('--readings', type=int, default=10000, help="sensor readings per edge device")
+    parser.add_argument('--specific-ratio', type=float, default=0.5, help="fraction of 'specific' patients")
+    parser.add_argument('--arrival', choices=ARRIVAL_PROCESSES, default='steady', help="arrival process")
+    parser.add_argument('--rate', type=float, default=10.0, help="mean readings per second per device")
+    parser.add_argument('--anomaly-rate', type=float, default=0.05, help="fraction of anomalous readings")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="readings generated per chunk")
+    parser.add_argument('--seed', type=int, default=None, help="random seed")
+    args = parser.parse_args()
+    
+    generator = WorkloadGenerator(
+        num_edge_devices=args.devices,
+        patients_per_device=args.patients,
+        specific_ratio=args.specific_ratio,
+        arrival_process=args.arrival,
+        rate=args.rate,
+        anomaly_rate=args.anomaly_rate,
+        seed=args.seed
+    )
+    generator.write_dataset(args.output, args.readings, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
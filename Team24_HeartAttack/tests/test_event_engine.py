@@ -0,0 +1,33 @@
+from src.event_engine import DiscreteEventEngine
+
+
+def make_record(k_value: float, memory: float, processing_time: float = 1.0) -> dict:
+    return {'k_value': k_value, 'm_value': 1.0, 'processing_time': processing_time, 'memory': memory}
+
+
+def test_task_larger_than_device_memory_is_rejected_without_blocking_the_queue():
+    engine = DiscreteEventEngine()
+    engine.add_device('cloud', cpu_slots=1, memory_capacity=256)
+    oversize = make_record(k_value=1.9, memory=512)  # Highest priority, so it would be the head forever
+    fitting = [make_record(k_value=0.5, memory=128) for _ in range(3)]
+
+    assert not engine.submit('cloud', oversize, 0.0)
+    assert all(engine.submit('cloud', record, 0.0) for record in fitting)
+    completed = engine.drain()
+
+    assert engine.oversize_rejections == 1
+    assert len(completed) == 3
+    assert 'completion_time' not in oversize
+    assert engine.queues['cloud'].depth() == 0
+
+
+def test_tasks_that_fit_wait_for_memory_held_by_running_tasks():
+    engine = DiscreteEventEngine()
+    engine.add_device('edge', cpu_slots=2, memory_capacity=512)
+    first, second = make_record(1.0, 512), make_record(1.0, 512)
+
+    assert engine.submit('edge', first, 0.0) and engine.submit('edge', second, 0.0)
+    engine.drain()
+
+    assert first['completion_time'] == 1.0
+    assert second['start_time'] == 1.0  # Free core, but no memory until the first task completes
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.event_engine import DiscreteEventEngine
+from src.placement import PlacementEngine
+
+EDGES = {1: 'edge_device_1', 2: 'edge_device_2'}
+SETTINGS = {
+    'task_payload_kb': 1,
+    'edge_link_latency': 0.01,
+    'cloud_link_latency': 0.1,
+    'urgent_reserved_slots': 0
+}
+PROCESSING_TIMES = {True: 1.0, False: 2.0}  # Edge, cloud
+
+
+def make_placement(admission: str, discipline: str = 'priority') -> PlacementEngine:
+    engine = DiscreteEventEngine(discipline=discipline)
+    for name in [*EDGES.values(), 'cloud']:
+        engine.add_device(name, cpu_slots=1)
+    return PlacementEngine(engine, EDGES, 'cloud', lambda task, on_edge: PROCESSING_TIMES[on_edge],
+                           SETTINGS, edge_bandwidth=100, cloud_bandwidth=100, policy='static',
+                           admission=admission)
+
+
+def occupy(placement: PlacementEngine, name: str, tasks: int, deadline: float = 100.0):
+    """Queue `tasks` one-second tasks on `name` at t=0 and start the first"""
+    for _ in range(tasks):
+        record = {'k_value': 1.0, 'm_value': 1.0, 'processing_time': 1.0, 'deadline': deadline}
+        assert placement.scheduler.submit(name, record, 0.0)
+    placement.scheduler.advance(0.0)
+
+
+def urgent_task(timestamp: float = 0.0):
+    return SimpleNamespace(edge_device_id=1, k_value=1.5, timestamp=timestamp)
+
+
+@pytest.mark.parametrize('admission', ['offload', 'reject'])
+def test_task_that_meets_its_deadline_stays_on_the_policy_choice(admission):
+    placement = make_placement(admission)
+    target, processing_time, network_delay, decision = placement.place(urgent_task(), deadline=1.5)
+
+    assert (target, processing_time, network_delay, decision) == ('edge_device_1', 1.0, 0.0, 'admitted')
+
+
+@pytest.mark.parametrize('admission', ['offload', 'reject'])
+def test_late_task_is_offloaded_to_the_device_that_finishes_first(admission):
+    placement = make_placement(admission)
+    occupy(placement, 'edge_device_1', 4)  # About 4 s of backlog at home
+    target, processing_time, network_delay, decision = placement.place(urgent_task(), deadline=1.5)
+
+    assert (target, decision) == ('edge_device_2', 'offloaded')
+    assert processing_time == 1.0 and network_delay > 0
+    assert placement.offloaded == 1 and placement.rejected == 0
+
+
+def test_reject_mode_drops_tasks_no_device_can_finish_in_time():
+    placement = make_placement('reject')
+    occupy(placement, 'edge_device_1', 4)
+    assert placement.place(urgent_task(), deadline=0.5) == (None, 0.0, 0.0, 'rejected')
+    assert placement.rejected == 1
+
+
+def test_offload_mode_still_places_hopeless_tasks_on_the_best_device():
+    placement = make_placement('offload')
+    occupy(placement, 'edge_device_1', 4)
+    target, _, _, decision = placement.place(urgent_task(), deadline=0.5)
+
+    assert (target, decision) == ('edge_device_2', 'offloaded')
+    assert placement.rejected == 0
+
+
+def test_without_admission_deadlines_are_ignored():
+    placement = make_placement(None)
+    occupy(placement, 'edge_device_1', 4)
+    assert placement.place(urgent_task(), deadline=0.5)[::3] == ('edge_device_1', 'admitted')
+
+
+@pytest.mark.parametrize('discipline, expected', [
+    ('edf', ('edge_device_1', 'admitted')),         # Jumps the later-deadline backlog
+    ('priority', ('edge_device_2', 'offloaded')),   # Would wait behind all of it
+])
+def test_edf_admission_only_waits_for_work_due_first(discipline, expected):
+    placement = make_placement('reject', discipline)
+    occupy(placement, 'edge_device_1', 5, deadline=100.0)
+    assert placement.place(urgent_task(), deadline=2.5)[::3] == expected
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from src.priority_cache import PriorityCache
+from src.priority_calculator import PriorityCalculator
+
+# heart_rate, blood_pressure, glucose_level, age, height, weight, gender
+FEATURES = np.array([[85, 130, 150.0, 60, 170, 80, 1],
+                     [70, 110, 95.0, 45, 160, 60, 0]], dtype=float)
+
+
+class ConstantModel:
+    """Stand-in forest predicting one value, counting the rows it is asked about"""
+
+    def __init__(self, value: float):
+        self.value = value
+        self.rows = 0
+
+    def predict(self, features):
+        self.rows += len(features)
+        return np.full(len(features), self.value)
+
+
+@pytest.fixture
+def calculator():
+    calculator = PriorityCalculator()
+    calculator.swap_models(ConstantModel(0.5), ConstantModel(1.0))
+    return calculator
+
+
+def test_renewed_cache_is_empty_with_the_same_settings_and_counters():
+    cache = PriorityCache(max_entries=2, glucose_quantum=0.5)
+    cache.put('a', (1.0, 3.0))
+    cache.get('a')
+    cache.get('b')
+    renewed = cache.renewed()
+
+    assert len(renewed.entries) == 0
+    assert (renewed.max_entries, renewed.glucose_quantum) == (2, 0.5)
+    assert (renewed.hits, renewed.misses, renewed.evictions) == (1, 1, 0)
+    cache.put('c', (0.5, 1.0))  # Writes to the retired cache don't reach its replacement
+    assert renewed.get('c') is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PriorityCache(max_entries=2)
+    cache.put('a', (1.0, 3.0))
+    cache.put('b', (0.5, 2.0))
+    cache.get('a')
+    cache.put('c', (0.2, 1.0))
+
+    assert cache.get('b') is None
+    assert cache.get('a') == (1.0, 3.0)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_repeated_readings_are_served_from_the_cache(calculator):
+    calculator.calculate_specific_priority_batch(FEATURES)
+    k_values, m_values = calculator.calculate_specific_priority_batch(FEATURES + [0, 0, 0.03, 0, 0, 0, 0])
+
+    np.testing.assert_array_equal(k_values, 0.5)
+    assert calculator.ml_models[0].rows == len(FEATURES)  # Second pass falls in the same glucose buckets
+    assert calculator.priority_cache.stats()['hits'] == len(FEATURES)
+
+
+def test_hot_swap_never_serves_results_from_the_old_models(calculator):
+    calculator.calculate_specific_priority_batch(FEATURES)
+    old_cache = calculator.priority_cache
+    version, _ = calculator.swap_models(ConstantModel(1.5), ConstantModel(2.0))
+    k_values, m_values = calculator.calculate_specific_priority_batch(FEATURES)
+
+    assert version == 2
+    np.testing.assert_array_equal(k_values, 1.5)
+    np.testing.assert_array_equal(m_values, 2.0)
+    assert calculator.priority_cache is not old_cache
+    assert calculator.priority_cache.stats()['misses'] == 2 * len(FEATURES)  # Counters carry over
+
+
+def test_scorer_still_holding_the_old_cache_cannot_poison_the_new_one(calculator):
+    old_cache = calculator.priority_cache
+    calculator.swap_models(ConstantModel(1.5), ConstantModel(2.0))
+    key = old_cache.key(*FEATURES[0])
+    old_cache.put(key, (0.5, 1.0))  # A reading scored on the old models finishes after the swap
+
+    k_values, _ = calculator.calculate_specific_priority_batch(FEATURES[:1])
+    assert k_values[0] == 1.5
+
+
+def test_setting_a_model_clears_the_cache(calculator):
+    calculator.calculate_specific_priority_batch(FEATURES)
+    calculator.ml_model_k = ConstantModel(1.2)
+
+    assert len(calculator.priority_cache.entries) == 0
+    assert calculator.calculate_specific_priority_batch(FEATURES)[0][0] == 1.2
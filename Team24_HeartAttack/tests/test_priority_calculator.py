@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from src.models import HealthTask
+from src.priority_calculator import PriorityCalculator
+
+HR, BP, GLUCOSE = 3.0, 2.0, 1.0  # m-values of the most critical parameter
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    return PriorityCalculator()
+
+
+def general_task(heart_rate, blood_pressure, glucose_level) -> HealthTask:
+    return HealthTask('P1', heart_rate, blood_pressure, glucose_level, 'general')
+
+
+def assert_matches_reference(calculator, readings):
+    """Scalar and batch paths both agree with the direct formula for every reading"""
+    expected = [calculator.reference_general_priority(general_task(*reading)) for reading in readings]
+    for reading, (k_ref, m_ref) in zip(readings, expected):
+        k, m = calculator.calculate_general_priority(general_task(*reading))
+        assert k == pytest.approx(k_ref, abs=1e-12), reading
+        assert m == m_ref, reading
+    k_values, m_values = calculator.calculate_general_priority_batch(*np.array(readings, dtype=float).T)
+    np.testing.assert_allclose(k_values, [k for k, _ in expected], rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(m_values, [m for _, m in expected])
+    return expected
+
+
+@pytest.mark.parametrize('heart_rate, expected_k', [
+    (80, 0.0),    # Middle of the normal range
+    (60, 1.0),    # Range boundaries
+    (100, 1.0),
+    (59, 1.05),
+    (101, 1.05),
+    (40, 2.0),    # Cap is reached half a range-width outside the range
+    (120, 2.0),
+    (39, 2.0),
+    (121, 2.0),
+])
+def test_heart_rate_range_boundaries(calculator, heart_rate, expected_k):
+    (k, m), = assert_matches_reference(calculator, [(heart_rate, 105, 105)])
+    assert k == pytest.approx(expected_k)
+    assert m == HR
+
+
+@pytest.mark.parametrize('blood_pressure, glucose_level', [
+    (90, 105), (120, 105), (89, 105), (121, 105), (105, 70), (105, 140), (105, 69), (105, 141),
+])
+def test_blood_pressure_and_glucose_boundaries(calculator, blood_pressure, glucose_level):
+    assert_matches_reference(calculator, [(80, blood_pressure, glucose_level)])
+
+
+def test_urgency_is_capped_at_two(calculator):
+    readings = [(0, 105, 105), (400, 105, 105), (80, 0, 105), (80, 1000, 105), (80, 105, 5000)]
+    for k, _ in assert_matches_reference(calculator, readings):
+        assert k == 2.0
+
+
+@pytest.mark.parametrize('reading, expected_m', [
+    ((60, 90, 70), HR),       # All three at k=1.0
+    ((100, 120, 140), HR),
+    ((80, 90, 70), BP),       # BP and glucose tied, HR normal
+    ((80, 105, 140), GLUCOSE),
+    ((20, 200, 500), HR),     # All three capped at 2.0
+    ((80, 30, 500), BP),
+    ((56, 87, 105), HR),      # HR and BP tied at 1.2 outside the range
+])
+def test_ties_resolve_heart_rate_then_blood_pressure_then_glucose(calculator, reading, expected_m):
+    (_, m), = assert_matches_reference(calculator, [reading])
+    assert m == expected_m
+
+
+def test_fractional_glucose(calculator):
+    readings = [(80, 105, glucose) for glucose in (69.5, 70.25, 104.9, 139.99, 140.5, 35.5, 174.75)]
+    assert_matches_reference(calculator, readings)
+
+
+def test_values_outside_the_lookup_tables(calculator):
+    readings = [
+        (-10, 105, 105), (1000, 105, 105), (80, -50, 105), (80, 10000, 105),
+        (80, 105, -1), (80, 105, 1e6), (80, 105, 1e6 + 0.5), (0, 0, 0),
+    ]
+    assert_matches_reference(calculator, readings)
+
+
+def test_random_readings_match_reference(calculator):
+    rng = np.random.default_rng(0)
+    readings = list(zip(
+        rng.integers(20, 200, 2000).tolist(),
+        rng.integers(50, 200, 2000).tolist(),
+        np.round(rng.uniform(30, 300, 2000), 1).tolist()
+    ))
+    assert_matches_reference(calculator, readings)
+
+
+def test_urgency_table_that_misses_the_cap_is_rejected(monkeypatch):
+    monkeypatch.setattr(PriorityCalculator, '_calculate_parameter_urgency', lambda self, value, lb, ub: 1.0)
+    with pytest.raises(ValueError, match='does not reach the cap'):
+        PriorityCalculator()
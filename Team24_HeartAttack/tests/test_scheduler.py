@@ -0,0 +1,114 @@
+import math
+import random
+
+import pytest
+
+from src.scheduler import DeadlineWorkIndex, DeviceQueue
+
+
+def make_record(k_value: float, deadline: float = None, processing_time: float = 1.0) -> dict:
+    record = {'k_value': k_value, 'm_value': 1.0, 'processing_time': processing_time}
+    if deadline is not None:
+        record['deadline'] = deadline
+    return record
+
+
+def brute_force_due_by(live: list, deadline: float, resolution: float) -> float:
+    """Work due no later than `deadline`, counting its bucket in full like DeadlineWorkIndex"""
+    bucket = math.floor(deadline / resolution)
+    return sum(work for due, work in live if math.floor(due / resolution) <= bucket)
+
+
+def test_due_by_matches_brute_force_through_adds_removes_and_rebuilds():
+    index = DeadlineWorkIndex(resolution=0.01)
+    rng = random.Random(0)
+    live = []
+    clock = 0.0
+    for step in range(3000):
+        clock += rng.uniform(0, 0.05)
+        if live and rng.random() < 0.45:
+            due, work = live.pop(rng.randrange(len(live)))
+            index.remove(due, work)
+        else:
+            # Mostly near-term deadlines, with the odd far one forcing the tree to grow
+            due = clock + (rng.uniform(0, 2) if rng.random() < 0.95 else rng.uniform(50, 500))
+            work = rng.uniform(0.01, 1.0)
+            index.add(due, work)
+            live.append((due, work))
+        for query in (clock, clock + 0.5, clock + 1.0, clock + 1000.0, clock - 10.0):
+            assert index.due_by(query) == pytest.approx(brute_force_due_by(live, query, 0.01), abs=1e-9)
+
+
+def test_tasks_sharing_a_bucket_are_removed_one_at_a_time():
+    index = DeadlineWorkIndex(resolution=1.0)
+    index.add(5.2, 1.0)
+    index.add(5.7, 2.0)
+    index.add(9.0, 4.0)
+
+    assert index.due_by(5.0) == 3.0  # The whole bucket counts, even the part due after 5.0
+    index.remove(5.2, 1.0)
+    assert index.due_by(8.0) == 2.0
+    index.remove(5.7, 2.0)
+    assert index.due_by(8.0) == 0.0
+    assert index.due_by(9.0) == 4.0
+
+
+def test_empty_index_and_tasks_without_deadline():
+    index = DeadlineWorkIndex()
+    assert index.due_by(100.0) == 0.0
+    index.add(float('inf'), 5.0)
+    assert index.due_by(1e12) == 0.0
+    index.add(1.0, 2.0)
+    index.remove(1.0, 2.0)
+    assert index.base is None
+    assert index.due_by(100.0) == 0.0
+
+
+def test_edf_queue_runs_earliest_deadline_first():
+    queue = DeviceQueue('edge', cpu_slots=1, discipline='edf')
+    records = [
+        make_record(1.9, deadline=None),   # No deadline: last, however urgent
+        make_record(0.2, deadline=3.0),
+        make_record(0.5, deadline=2.0),
+        make_record(1.5, deadline=2.0),    # Same deadline: higher k first
+    ]
+    for seq, record in enumerate(records):
+        queue.reserve(record)
+        queue.enqueue(record, 0.0, seq)
+
+    order = []
+    now = 0.0
+    while (record := queue.start_next(now)) is not None:
+        order.append(record)
+        now = record['completion_time']
+        queue.finish(record, now)
+    assert order == [records[3], records[2], records[1], records[0]]
+    assert queue.queued_work == 0.0 and queue.due_work.due_by(1e9) == 0.0
+
+
+def test_priority_queue_ignores_deadlines():
+    queue = DeviceQueue('edge', cpu_slots=1)
+    early, urgent = make_record(0.2, deadline=1.0), make_record(1.5, deadline=50.0)
+    for seq, record in enumerate([early, urgent]):
+        queue.reserve(record)
+        queue.enqueue(record, 0.0, seq)
+
+    assert queue.start_next(0.0) is urgent
+
+
+def test_edf_wait_only_counts_ready_work_due_first():
+    queue = DeviceQueue('edge', cpu_slots=1, discipline='edf')
+    running = make_record(1.0, deadline=1.0, processing_time=2.0)
+    queue.reserve(running)
+    queue.enqueue(running, 0.0, 0)
+    queue.start_next(0.0)
+    for seq, deadline in enumerate([5.0, 10.0, 20.0], start=1):
+        record = make_record(1.0, deadline=deadline, processing_time=1.0)
+        queue.reserve(record)
+        queue.enqueue(record, 0.0, seq)
+    in_transit = make_record(1.0, deadline=30.0, processing_time=0.5)
+    queue.reserve(in_transit)
+
+    assert queue.estimated_wait(0.0, deadline=3.0) == pytest.approx(2.0 + 0.5)
+    assert queue.estimated_wait(0.0, deadline=12.0) == pytest.approx(2.0 + 2.0 + 0.5)
+    assert queue.estimated_wait(0.0) == pytest.approx(2.0 + 3.0 + 0.5)
@@ -0,0 +1,112 @@
+import gc
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.task_store import HAVE_PYARROW, TaskRecordStore
+
+SPILL_FORMATS = ['npy'] + (['parquet', 'feather'] if HAVE_PYARROW else [])
+
+
+def make_record(i: int, patient_prefix: str) -> dict:
+    return {
+        'patient_id': f"{patient_prefix}{i % 7}",
+        'task_type': 'general' if i % 2 else 'specific',
+        'scheduled_location': 'edge' if i % 3 else 'cloud',
+        'target_device': 'edge_device_1',
+        'edge_device': 1,
+        'k_value': i / 100,
+        'm_value': 3.0,
+        'timestamp': float(i),
+        'latency': 0.1
+    }
+
+
+@pytest.mark.parametrize('spill_format', SPILL_FORMATS)
+def test_stores_spilling_into_one_directory_keep_their_segments(tmp_path, spill_format):
+    first = TaskRecordStore(segment_size=50, spill_dir=str(tmp_path), spill_format=spill_format)
+    second = TaskRecordStore(segment_size=50, spill_dir=str(tmp_path), spill_format=spill_format)
+    # Interleave appends so both stores spill segments with the same index
+    for i in range(230):
+        first.append(make_record(i, 'A'))
+        second.append(make_record(1000 + i, 'B'))
+
+    assert len(first.segments) == len(second.segments) == 4
+    assert not set(first.segments) & set(second.segments)
+    np.testing.assert_array_equal(first.column('timestamp'), np.arange(230, dtype=float))
+    np.testing.assert_array_equal(second.column('timestamp'), np.arange(1000, 1230, dtype=float))
+    assert set(first.column('patient_id')) == {f"A{i}" for i in range(7)}
+    assert set(second.column('patient_id')) == {f"B{i}" for i in range(7)}
+
+
+def test_extend_into_store_sharing_spill_directory(tmp_path):
+    shard = TaskRecordStore(segment_size=40, spill_dir=str(tmp_path))
+    merged = TaskRecordStore(segment_size=40, spill_dir=str(tmp_path))
+    for i in range(100):
+        shard.append(make_record(i, 'P'))
+
+    merged.extend(shard)
+    merged.extend(shard)
+
+    assert len(merged) == 200
+    np.testing.assert_array_equal(shard.column('timestamp'), np.arange(100, dtype=float))
+    np.testing.assert_array_equal(merged.column('timestamp'), np.tile(np.arange(100, dtype=float), 2))
+
+
+@pytest.mark.parametrize('spill_format', SPILL_FORMATS)
+def test_spilled_segments_are_readable_without_the_store(tmp_path, spill_format):
+    store = TaskRecordStore(segment_size=20, spill_dir=str(tmp_path), spill_format=spill_format)
+    for i in range(45):
+        store.append(make_record(i, 'A'))
+    path = store.segments[1]
+
+    if spill_format == 'npy':
+        records = np.load(path)
+        with open(path[:-len('.npy')] + '.categories.json') as f:
+            categories = json.load(f)
+        patient_ids = [categories['patient_id'][code] for code in records['patient_id']]
+        locations = {categories['scheduled_location'][code] for code in records['scheduled_location']}
+    else:
+        frame = pd.read_feather(path) if spill_format == 'feather' else pd.read_parquet(path)
+        patient_ids = list(frame['patient_id'])
+        locations = set(frame['scheduled_location'])
+
+    assert patient_ids == [f"A{i % 7}" for i in range(20, 40)]
+    assert locations == {'edge', 'cloud'}
+
+
+@pytest.mark.parametrize('spill_format', SPILL_FORMATS)
+def test_close_and_release_delete_spilled_files(tmp_path, spill_format):
+    store = TaskRecordStore(segment_size=10, spill_dir=str(tmp_path), spill_format=spill_format)
+    for i in range(35):
+        store.append(make_record(i, 'A'))
+    assert os.listdir(tmp_path)
+
+    store.close()
+    assert os.listdir(tmp_path) == []
+    assert len(store) == 0
+
+    released = TaskRecordStore(segment_size=10, spill_dir=str(tmp_path), spill_format=spill_format)
+    for i in range(35):
+        released.append(make_record(i, 'B'))
+    del released
+    gc.collect()
+    assert os.listdir(tmp_path) == []
+
+
+def test_pickled_copy_takes_over_spilled_files(tmp_path):
+    store = TaskRecordStore(segment_size=10, spill_dir=str(tmp_path))
+    for i in range(35):
+        store.append(make_record(i, 'A'))
+    copy = pickle.loads(pickle.dumps(store))
+    # The writer going away, as a shard worker does, leaves the files to the copy
+    del store
+    gc.collect()
+
+    np.testing.assert_array_equal(copy.column('timestamp'), np.arange(35, dtype=float))
+    copy.close()
+    assert os.listdir(tmp_path) == []
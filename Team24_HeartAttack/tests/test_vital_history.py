@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from src.vital_history import VitalHistory
+
+
+def brute_force(readings, window: int) -> dict:
+    """Trend statistics computed directly from the patient's last `window` readings"""
+    recent = np.array(readings[-window:], dtype=float)
+    times, values = recent[:, 0], recent[:, 1:]
+    mean_t = times.mean()
+    var_t = ((times - mean_t) ** 2).mean()
+    if var_t > 1e-12:
+        slope = ((times - mean_t)[:, None] * (values - values.mean(axis=0))).mean(axis=0) / var_t
+    else:
+        slope = np.zeros(values.shape[1])
+    return {
+        'count': len(recent),
+        'mean': values.mean(axis=0),
+        'variance': values.var(axis=0),
+        'slope': slope,
+        'lag': times[-1] - mean_t
+    }
+
+
+def assert_matches(result, row: int, expected: dict):
+    assert result['count'][row] == expected['count']
+    np.testing.assert_allclose(result['mean'][row], expected['mean'], rtol=1e-9)
+    np.testing.assert_allclose(result['variance'][row], expected['variance'], rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(result['slope'][row], expected['slope'], rtol=1e-6, atol=1e-9)
+    assert result['lag'][row] == pytest.approx(expected['lag'], abs=1e-6)
+
+
+@pytest.mark.parametrize('start_time', [0.0, 1.7e9])  # Epoch timestamps stress the time origin
+def test_running_sums_match_brute_force_across_ring_wraps(start_time):
+    window = 8
+    history = VitalHistory(window=window, max_patients=4)
+    rng = np.random.default_rng(0)
+    patients = [f"P{i}" for i in range(3)]
+    readings = {patient_id: [] for patient_id in patients}
+
+    # Interleaved patients, each wrapping its ring several times, checked after every reading
+    clock = start_time
+    for step in range(10 * window * len(patients)):
+        patient_id = patients[rng.integers(len(patients))]
+        clock += rng.uniform(0.5, 5.0)
+        reading = (clock, rng.normal(80, 15), rng.normal(120, 20), rng.normal(100, 30))
+        readings[patient_id].append(reading)
+        result = history.observe_batch([patient_id], *([value] for value in reading))
+        assert_matches(result, 0, brute_force(readings[patient_id], window))
+
+    for patient_id in patients:
+        assert_matches(history.trend(patient_id), 0, brute_force(readings[patient_id], window))
+
+
+def test_batch_snapshots_are_taken_right_after_each_reading():
+    history = VitalHistory(window=4, max_patients=2)
+    timestamps = np.arange(10, dtype=float)
+    heart_rate = 60 + 2 * timestamps
+    result = history.observe_batch(['P1'] * 10, timestamps, heart_rate, np.full(10, 120.0), np.full(10, 90.0))
+
+    np.testing.assert_array_equal(result['count'], [1, 2, 3, 4, 4, 4, 4, 4, 4, 4])
+    np.testing.assert_allclose(result['slope'][1:, 0], 2.0)
+    np.testing.assert_allclose(result['slope'][:, 1:], 0.0, atol=1e-12)
+    np.testing.assert_allclose(result['mean'][-1], [60 + 2 * 7.5, 120.0, 90.0])
+
+
+def test_idle_patient_starts_a_fresh_window():
+    history = VitalHistory(window=4, max_patients=2, idle_timeout=60.0)
+    history.observe_batch(['P1'] * 3, [0.0, 1.0, 2.0], [70.0, 80.0, 90.0], [120.0] * 3, [90.0] * 3)
+    result = history.observe_batch(['P1'], [100.0], [150.0], [120.0], [90.0])
+
+    assert result['count'][0] == 1
+    assert result['mean'][0, 0] == 150.0
+
+
+def test_least_recently_updated_patient_is_evicted_when_full():
+    history = VitalHistory(window=4, max_patients=2)
+    for patient_id, timestamp in [('P1', 0.0), ('P2', 1.0), ('P1', 2.0), ('P3', 3.0)]:
+        history.update(patient_id, timestamp, 80.0, 120.0, 90.0)
+
+    assert history.trend('P2') is None
+    assert history.trend('P1')['count'][0] == 2
+    assert history.stats()['evictions'] == 1
@@ -0,0 +1,18 @@
+from src.workload_generator import WorkloadGenerator
+
+
+def test_patient_ids_are_unique_across_devices_beyond_the_padding_width():
+    generator = WorkloadGenerator(num_edge_devices=12, patients_per_device=100001, seed=0)
+    first = generator.patient_ids(1)
+    eleventh = generator.patient_ids(11)
+
+    assert len(set(first)) == len(first)
+    assert not set(first) & set(eleventh)  # Device 1 patient 100000 vs device 11 patient 0
+
+
+def test_generated_patients_and_readings_use_the_same_ids():
+    generator = WorkloadGenerator(patients_per_device=20, seed=1)
+    patients = generator.generate_patients(2)
+    readings = next(generator.iter_reading_batches(2, 200, 200))
+
+    assert set(readings['patient_id']) <= set(patients['patient_id'])